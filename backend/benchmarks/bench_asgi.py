@@ -0,0 +1,116 @@
+"""
+Concurrent-request load test: sync views behind WSGI worker threads vs.
+the async views (tasks/async_views.py) on one ASGI event loop.
+
+Both stacks run in-process through Django's test handlers, so the numbers
+compare request handling, not a particular web server. The WSGI side
+serves `concurrency` clients with a fixed number of worker threads, like a
+threaded gunicorn/uwsgi worker; the ASGI side accepts every client at once
+and offloads scoring to the bounded TASK_ASYNC_WORKERS pool.
+
+--client-latency-ms models time spent receiving a request from a slow
+client: a WSGI thread is held for it, the event loop is not. With it at 0
+the workload is purely CPU-bound and both stacks are limited by the GIL.
+
+    cd backend
+    python -m benchmarks.bench_asgi --tasks 200 --requests 400 --concurrency 8,64,256
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "task_analyzer.settings")
+django.setup()
+
+from django.test import AsyncClient, Client, override_settings  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+
+from .generate import generate_backlog  # noqa: E402
+from .run import percentile  # noqa: E402
+
+ENDPOINTS = ("analyze", "graph")
+
+
+def _summary(stack, endpoint, concurrency, latencies, elapsed):
+    return {
+        "stack": stack,
+        "endpoint": endpoint,
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "requests_per_s": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+def run_wsgi(endpoint, bodies, concurrency, threads, latency):
+    """`concurrency` clients; the server handles `threads` requests at a time, the rest queue."""
+    local = threading.local()
+    server = threading.BoundedSemaphore(threads)
+
+    def one(body):
+        client = getattr(local, "client", None) or Client()
+        local.client = client
+        t0 = time.perf_counter()
+        with server:
+            time.sleep(latency)
+            client.post(f"/api/tasks/{endpoint}/", body, content_type="application/json")
+        return time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(one, bodies))
+    return _summary(f"wsgi ({threads} threads)", endpoint, concurrency, latencies, time.perf_counter() - t0)
+
+
+async def _run_asgi(endpoint, bodies, concurrency, latency):
+    client = AsyncClient()
+    gate = asyncio.Semaphore(concurrency)
+
+    async def one(body):
+        async with gate:
+            t0 = time.perf_counter()
+            await asyncio.sleep(latency)
+            await client.post(f"/api/tasks/async/{endpoint}/", body, content_type="application/json")
+            return time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    latencies = await asyncio.gather(*(one(b) for b in bodies))
+    return _summary("asgi", endpoint, concurrency, latencies, time.perf_counter() - t0)
+
+
+def run_asgi(endpoint, bodies, concurrency, latency):
+    return asyncio.run(_run_asgi(endpoint, bodies, concurrency, latency))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=200, help="tasks per request")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", default="8,64", help="comma-separated concurrent client counts")
+    parser.add_argument("--wsgi-threads", type=int, default=4, help="WSGI worker threads")
+    parser.add_argument("--client-latency-ms", type=float, default=20.0, help="time to receive each request")
+    parser.add_argument("--endpoints", default=",".join(ENDPOINTS))
+    args = parser.parse_args()
+
+    setup_test_environment()
+    latency = args.client_latency_ms / 1000.0
+    # Distinct bodies so the result cache can't short-circuit anything
+    bodies = [json.dumps({"tasks": generate_backlog(args.tasks, seed=i)}) for i in range(args.requests)]
+    with override_settings(TASK_RESULT_CACHE={"BACKEND": "local", "MAX_ENTRIES": 0},
+                           TASK_ASYNC_WORKERS=args.wsgi_threads):
+        for endpoint in args.endpoints.split(","):
+            for concurrency in (int(c) for c in args.concurrency.split(",")):
+                print(json.dumps(run_wsgi(endpoint, bodies, concurrency, args.wsgi_threads, latency)))
+                print(json.dumps(run_asgi(endpoint, bodies, concurrency, latency)))
+
+
+if __name__ == "__main__":
+    main()
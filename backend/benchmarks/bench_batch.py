@@ -0,0 +1,59 @@
+"""
+Batch scoring throughput for tasks.batch.score_batches by worker count.
+
+Each job is an independent backlog; speedup is relative to one worker
+(inline, no process pool).
+
+    cd backend
+    python -m benchmarks.bench_batch --jobs 2000 --tasks 300 --workers 1,4,8,16,32
+"""
+import argparse
+import json
+import os
+import time
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "task_analyzer.settings")
+django.setup()
+
+from tasks.batch import DEFAULT_CHUNK_SIZE, score_batches  # noqa: E402
+
+from .generate import generate_backlog  # noqa: E402
+
+
+def make_jobs(count, tasks):
+    strategies = [None, "fastest", "impact", "deadline"]
+    return [{"id": str(i), "tasks": generate_backlog(tasks, seed=i), "strategy": strategies[i % 4],
+             "weights": {"urgency_weight": 1.0, "importance_weight": 1.0, "effort_weight": 1.0}}
+            for i in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=500)
+    parser.add_argument("--tasks", type=int, default=200, help="tasks per backlog")
+    parser.add_argument("--workers", default=f"1,{os.cpu_count() or 1}", help="comma-separated worker counts")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    jobs = make_jobs(args.jobs, args.tasks)
+    baseline = None
+    for workers in (int(w) for w in args.workers.split(",")):
+        t0 = time.perf_counter()
+        for _ in score_batches(jobs, workers=workers, chunk_size=args.chunk_size):
+            pass
+        elapsed = time.perf_counter() - t0
+        baseline = baseline or elapsed
+        print(json.dumps({
+            "workers": workers,
+            "jobs": args.jobs,
+            "tasks_per_job": args.tasks,
+            "seconds": round(elapsed, 4),
+            "jobs_per_second": round(args.jobs / elapsed, 1),
+            "speedup": round(baseline / elapsed, 2),
+        }))
+
+
+if __name__ == "__main__":
+    main()
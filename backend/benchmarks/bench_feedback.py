@@ -0,0 +1,73 @@
+"""
+Concurrent feedback throughput for tasks.weights.WeightStore.
+
+Spawns worker processes that each record feedback clicks against one
+shared weights file, then checks that no update was lost.
+
+    cd backend
+    python -m benchmarks.bench_feedback --workers 8 --clicks 500
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+
+from tasks.weights import WeightStore, WeightsProvider, read_weights_file
+
+
+def _worker(path, clicks, batch_size, start):
+    store = WeightStore(path, WeightsProvider(path), batch_size=batch_size, flush_interval=60)
+    start.wait()
+    for _ in range(clicks):
+        store.record_feedback(1, True)
+    store.flush()
+
+
+def run(workers, clicks, batch_size):
+    fd, path = tempfile.mkstemp(suffix=".json")
+    os.close(fd)
+    with open(path, "w") as f:
+        json.dump({"urgency_weight": 1.0, "importance_weight": 1.0, "effort_weight": 1.0}, f)
+
+    start = multiprocessing.Event()
+    procs = [multiprocessing.Process(target=_worker, args=(path, clicks, batch_size, start)) for _ in range(workers)]
+    for p in procs:
+        p.start()
+    t0 = time.perf_counter()
+    start.set()
+    for p in procs:
+        p.join()
+    elapsed = time.perf_counter() - t0
+
+    final = read_weights_file(path)
+    os.remove(path)
+    if os.path.exists(path + ".lock"):
+        os.remove(path + ".lock")
+
+    total = workers * clicks
+    expected = 1.0 + 0.02 * total
+    return {
+        "workers": workers,
+        "clicks": total,
+        "batch_size": batch_size,
+        "seconds": round(elapsed, 4),
+        "clicks_per_second": round(total / elapsed, 1),
+        "lost_updates": round((expected - final["urgency_weight"]) / 0.02),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--clicks", type=int, default=250, help="feedback clicks per worker")
+    parser.add_argument("--batch-sizes", default="1,32", help="comma-separated WeightStore batch sizes")
+    args = parser.parse_args()
+
+    for batch_size in (int(b) for b in args.batch_sizes.split(",")):
+        print(json.dumps(run(args.workers, args.clicks, batch_size)))
+
+
+if __name__ == "__main__":
+    main()
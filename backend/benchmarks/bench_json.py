@@ -0,0 +1,79 @@
+"""
+JSON encode / decode cost of analyze payloads: stock DRF vs tasks.renderers.
+
+Encodes a scored analyze response and decodes the matching request body
+with DRF's JSONRenderer / JSONParser and with FastJSONRenderer /
+FastJSONParser (orjson when installed), and reports gzip size savings.
+
+    cd backend
+    python -m benchmarks.bench_json --sizes 1000,10000,100000
+"""
+import argparse
+import gc
+import gzip
+import io
+import json
+import os
+import time
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "task_analyzer.settings")
+django.setup()
+
+from rest_framework.parsers import JSONParser  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from tasks.renderers import HAS_ORJSON, FastJSONParser, FastJSONRenderer  # noqa: E402
+from tasks.scoring import calculate_scores  # noqa: E402
+from tasks.serializers import validate_tasks  # noqa: E402
+
+from .generate import generate_backlog  # noqa: E402
+
+
+def best_of(fn, repeat):
+    # GC off while timing, as timeit does, so large decodes aren't dominated by collections
+    times = []
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - t0)
+    finally:
+        gc.enable()
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for n in (int(s) for s in args.sizes.split(",")):
+        backlog = generate_backlog(n, seed=n)
+        body = json.dumps({"tasks": backlog}).encode()
+        validated, _ = validate_tasks(backlog)
+        response = calculate_scores(validated, explain=True)
+        rendered = FastJSONRenderer().render(response)
+
+        timings = {}
+        for name, renderer, parser_ in (("stock", JSONRenderer(), JSONParser()),
+                                        ("fast", FastJSONRenderer(), FastJSONParser())):
+            timings[name] = (best_of(lambda: renderer.render(response), args.repeat),
+                             best_of(lambda: parser_.parse(io.BytesIO(body)), args.repeat))
+        print(json.dumps({
+            "tasks": n,
+            "orjson": HAS_ORJSON,
+            "encode_ms": {k: round(v[0] * 1000, 2) for k, v in timings.items()},
+            "decode_ms": {k: round(v[1] * 1000, 2) for k, v in timings.items()},
+            "encode_speedup": round(timings["stock"][0] / timings["fast"][0], 2),
+            "decode_speedup": round(timings["stock"][1] / timings["fast"][1], 2),
+            "response_bytes": len(rendered),
+            "gzip_bytes": len(gzip.compress(rendered, compresslevel=6)),
+        }))
+
+
+if __name__ == "__main__":
+    main()
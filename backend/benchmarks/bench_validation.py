@@ -0,0 +1,63 @@
+"""
+Bulk task validation: tasks.serializers.validate_tasks against the
+original one-TaskInputSerializer-per-task loop.
+
+    cd backend
+    python -m benchmarks.bench_validation --tasks 20000
+"""
+import argparse
+import json
+import os
+import time
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "task_analyzer.settings")
+django.setup()
+
+from tasks.serializers import TaskInputSerializer, validate_tasks  # noqa: E402
+
+from .generate import generate_backlog  # noqa: E402
+
+
+def serializer_loop(tasks):
+    validated = []
+    errors = []
+    for i, t in enumerate(tasks):
+        s = TaskInputSerializer(data=t)
+        if s.is_valid():
+            validated.append(s.validated_data)
+        else:
+            errors.append({"index": i, "errors": s.errors})
+    return validated, errors
+
+
+def best_of(fn, arg, repeat):
+    timings = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn(arg)
+        timings.append(time.perf_counter() - t0)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    tasks = generate_backlog(args.tasks)
+    old_s, old = best_of(serializer_loop, tasks, args.repeat)
+    new_s, new = best_of(validate_tasks, tasks, args.repeat)
+    print(json.dumps({
+        "tasks": args.tasks,
+        "serializer_loop_s": round(old_s, 4),
+        "validate_tasks_s": round(new_s, 4),
+        "speedup": round(old_s / new_s, 1),
+        "identical": [dict(v) for v in old[0]] == new[0] and old[1] == new[1],
+    }))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Synthetic backlog generator shared by the benchmark scripts.
+
+Everything is driven by a seeded random.Random, so the same arguments
+always produce the same backlog.
+"""
+import datetime
+import random
+
+
+def generate_backlog(n, dependency_density=0.3, max_dependencies=3, chain_depth=0,
+                     due_spread=120, overdue_ratio=0.1, undated_ratio=0.1, seed=0, today=None):
+    """
+    Return `n` JSON-ready task dicts.
+
+    dependency_density: share of tasks that depend on earlier tasks (DAG)
+    max_dependencies:   upper bound on dependencies for such a task
+    chain_depth:        if > 0, tasks also form chains of this length,
+                        each task depending on the one before it
+    due_spread:         due dates fall within this many days from today
+    overdue_ratio:      share of tasks due in the past
+    undated_ratio:      share of tasks without a due date
+    """
+    rng = random.Random(seed)
+    today = today or datetime.date.today()
+    tasks = []
+    for i in range(n):
+        roll = rng.random()
+        if roll < undated_ratio:
+            due = None
+        elif roll < undated_ratio + overdue_ratio:
+            due = (today - datetime.timedelta(days=rng.randint(1, 30))).isoformat()
+        else:
+            due = (today + datetime.timedelta(days=rng.randint(0, due_spread))).isoformat()
+
+        deps = set()
+        if chain_depth > 0 and i % chain_depth:
+            deps.add(str(i - 1))
+        if i and rng.random() < dependency_density:
+            for _ in range(rng.randint(1, max_dependencies)):
+                deps.add(str(rng.randrange(i)))
+
+        tasks.append({
+            "id": str(i),
+            "title": f"Task {i}",
+            "due_date": due,
+            "estimated_hours": rng.choice([0.5, 1, 2, 3, 5, 8, 13]),
+            "importance": rng.randint(1, 10),
+            "dependencies": sorted(deps),
+        })
+    return tasks
+
+
+def generate_holidays(count, seed=0, today=None, span_days=730):
+    """`count` distinct "YYYY-MM-DD" holidays within `span_days` around today."""
+    rng = random.Random(seed)
+    today = today or datetime.date.today()
+    days = rng.sample(range(-span_days // 2, span_days // 2), min(count, span_days))
+    return {(today + datetime.timedelta(days=d)).isoformat() for d in days}
@@ -0,0 +1,178 @@
+"""
+Benchmark suite for scoring, calendar math, cycle detection, validation
+and the analyze / suggest / graph views.
+
+Times each target over synthetic backlogs and records throughput,
+p50/p99 latency and peak memory (tracemalloc, measured in a separate
+run so it doesn't skew the timings) as JSON. With --compare, exits
+non-zero when any p50 regressed beyond --threshold.
+
+    cd backend
+    python -m benchmarks.run --sizes 10,1000,100000 --output bench.json
+    python -m benchmarks.run --sizes 10,1000,100000 --compare bench.json
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "task_analyzer.settings")
+django.setup()
+
+from django.test import Client, override_settings  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+
+from tasks import scoring  # noqa: E402
+from tasks.serializers import validate_tasks  # noqa: E402
+from tasks.vectorized import HAS_NUMPY  # noqa: E402
+
+from .generate import generate_backlog, generate_holidays  # noqa: E402
+
+TARGETS = ("scoring", "calendar", "cycles", "validation", "analyze", "suggest", "graph")
+VIEW_TARGETS = ("analyze", "suggest", "graph")
+WEIGHTS = {"urgency_weight": 1.0, "importance_weight": 1.0, "effort_weight": 1.0}
+
+
+def _calendar_case(tasks):
+    today = datetime.date.today()
+    dates = [datetime.date.fromisoformat(t["due_date"]) for t in tasks if t["due_date"]]
+    return lambda: [scoring.business_days_between(today, d) for d in dates]
+
+
+def make_case(target, tasks, client):
+    """Zero-argument callable that runs `target` once over `tasks`."""
+    if target == "scoring":
+        validated = validate_tasks(tasks)[0]
+        return lambda: scoring.calculate_scores(validated, weights=WEIGHTS)
+    if target == "calendar":
+        return _calendar_case(tasks)
+    if target == "cycles":
+        return lambda: scoring.detect_cycles(tasks)
+    if target == "validation":
+        return lambda: validate_tasks(tasks)
+    if target == "analyze":
+        body = json.dumps({"tasks": tasks, "weights": WEIGHTS})
+        return lambda: client.post("/api/tasks/analyze/", body, content_type="application/json")
+    if target == "suggest":
+        params = {"tasks": json.dumps(tasks), "weights": json.dumps(WEIGHTS)}
+        return lambda: client.get("/api/tasks/suggest/", params)
+    if target == "graph":
+        body = json.dumps({"tasks": tasks})
+        return lambda: client.post("/api/tasks/graph/", body, content_type="application/json")
+    raise ValueError(f"unknown target {target!r}")
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))]
+
+
+def measure(case, size, repeat, warmup=1):
+    for _ in range(warmup):
+        case()
+    timings = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        case()
+        timings.append(time.perf_counter() - t0)
+
+    tracemalloc.start()
+    case()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    p50 = statistics.median(timings)
+    return {
+        "runs": repeat,
+        "p50_ms": round(p50 * 1000, 3),
+        "p99_ms": round(percentile(timings, 99) * 1000, 3),
+        "mean_ms": round(statistics.fmean(timings) * 1000, 3),
+        "throughput_per_s": round(size / p50, 1) if p50 else None,
+        "peak_mem_kb": round(peak / 1024, 1),
+    }
+
+
+def compare(results, baseline, threshold):
+    """Print p50 ratios against a previous run; returns the regressions."""
+    previous = {(r["target"], r["size"]): r for r in baseline["results"]}
+    regressions = []
+    for r in results:
+        old = previous.get((r["target"], r["size"]))
+        if not old or not old["p50_ms"]:
+            continue
+        ratio = r["p50_ms"] / old["p50_ms"]
+        flag = "REGRESSION" if ratio > threshold else ""
+        print(f"{r['target']:>10} n={r['size']:<8} p50 {old['p50_ms']:>10.3f} -> {r['p50_ms']:>10.3f} ms  x{ratio:.2f} {flag}")
+        if flag:
+            regressions.append(r)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Smart Task Analyzer benchmark suite")
+    parser.add_argument("--sizes", default="10,100,1000,10000", help="comma-separated backlog sizes (up to 1000000)")
+    parser.add_argument("--targets", default=",".join(TARGETS))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--density", type=float, default=0.3, help="share of tasks with dependencies")
+    parser.add_argument("--max-deps", type=int, default=3)
+    parser.add_argument("--chain-depth", type=int, default=0, help="length of dependency chains (0 = none)")
+    parser.add_argument("--due-spread", type=int, default=120, help="days over which due dates are spread")
+    parser.add_argument("--holidays", type=int, default=None, help="replace HOLIDAYS with this many random dates")
+    parser.add_argument("--max-view-size", type=int, default=100000, help="skip view targets above this size")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write results JSON here")
+    parser.add_argument("--compare", help="baseline results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=1.2, help="p50 ratio counted as a regression")
+    args = parser.parse_args(argv)
+
+    setup_test_environment()
+    if args.holidays is not None:
+        scoring.HOLIDAYS.clear()
+        scoring.HOLIDAYS.update(generate_holidays(args.holidays, seed=args.seed))
+
+    client = Client()
+    targets = [t for t in args.targets.split(",") if t]
+    results = []
+    # Measure real work, not result-cache hits
+    with override_settings(TASK_RESULT_CACHE={"BACKEND": "local", "MAX_ENTRIES": 0}):
+        for size in (int(s) for s in args.sizes.split(",")):
+            tasks = generate_backlog(size, dependency_density=args.density, max_dependencies=args.max_deps,
+                                     chain_depth=args.chain_depth, due_spread=args.due_spread, seed=args.seed)
+            for target in targets:
+                if target in VIEW_TARGETS and size > args.max_view_size:
+                    continue
+                row = {"target": target, "size": size, **measure(make_case(target, tasks, client), size, args.repeat)}
+                print(json.dumps(row), file=sys.stderr)
+                results.append(row)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": HAS_NUMPY,
+            "args": vars(args),
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,7 @@
+import os
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'task_analyzer.settings')
+# Route analyze/suggest/graph/feedback to the async views (tasks/async_views.py)
+os.environ.setdefault('TASK_ASYNC_VIEWS', '1')
+application = get_asgi_application()
@@ -23,6 +23,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',   # ADD THIS AT TOP
+    'tasks.middleware.StreamingGZipMiddleware',   # GZip, except NDJSON streams
     'django.middleware.common.CommonMiddleware',
 
     'django.middleware.security.SecurityMiddleware',
@@ -31,6 +32,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'tasks.middleware.TimingMiddleware',
 ]
 
 
@@ -53,6 +55,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'task_analyzer.wsgi.application'
+ASGI_APPLICATION = 'task_analyzer.asgi.application'
 
 DATABASES = {
     'default': {
@@ -66,11 +69,91 @@ STATIC_URL = '/static/'
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [],
     'DEFAULT_PERMISSION_CLASSES': [],
+    # orjson-backed when installed, stdlib json otherwise (tasks/renderers.py)
     'DEFAULT_RENDERER_CLASSES': (
-        'rest_framework.renderers.JSONRenderer',
-    )
+        'tasks.renderers.FastJSONRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'tasks.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
 }
 
+# Memoized analyze/suggest responses: "local" in-process LRU,
+# or {"BACKEND": "django", "ALIAS": "default"} to share a Django cache
+TASK_RESULT_CACHE = {
+    'BACKEND': 'local',
+    'MAX_ENTRIES': 256,
+    'MAX_BYTES': 64 * 1024 * 1024,
+}
+
+# Uploaded backlogs for /suggest/?backlog=<handle>: "local" in-process LRU,
+# or {"BACKEND": "django", "ALIAS": "default", "TIMEOUT": 86400} to share
+# them between worker processes (needs a shared CACHES alias, e.g. Redis).
+# With several local workers a handle may 404 elsewhere; clients re-upload
+TASK_BACKLOGS = {
+    'BACKEND': 'local',
+    'MAX_BACKLOGS': 256,
+    'MAX_TASKS': 1_000_000,
+}
+
+# Per-tenant learned weights (tasks/tenants.py): requests with an
+# X-Tenant-ID header (or ?tenant=) score with, and give feedback to, that
+# tenant's weights; cached in a sharded LRU, written through to the
+# TenantWeights table, re-read after TTL seconds
+TASK_TENANT_WEIGHTS = {
+    'SHARDS': 16,
+    'MAX_TENANTS': 100_000,
+    'TTL': 30,
+}
+
+# Background precompute (tasks/precompute.py): opt-in (TASK_PRECOMPUTE=1) thread
+# per server process, started on its first request, that re-warms the result
+# cache and what-if sessions when the date, learned weights or holidays
+# change; the shared store is left to `manage.py precompute` unless REFRESH_STORE
+TASK_PRECOMPUTE = {
+    'ENABLED': os.environ.get('TASK_PRECOMPUTE') == '1',
+    'REFRESH_STORE': False,
+    'INTERVAL': 30,
+    'MAX_RECENT': 128,
+    'MAX_BYTES': 32 * 1024 * 1024,
+}
+
+# What-if sessions (tasks/whatif.py): backlogs kept scored in memory so
+# weight / strategy changes only re-rank them
+TASK_WHATIF_SESSIONS = {
+    'MAX_SESSIONS': 64,
+    'MAX_TASKS': 1_000_000,
+    'TIMEOUT': 30 * 60,
+}
+
+# Dependency graph sessions (tasks/dynamic_graph.py): graphs kept in memory
+# so edge edits update cycles and the topological order incrementally
+TASK_GRAPH_SESSIONS = {
+    'MAX_SESSIONS': 64,
+    'MAX_TASKS': 1_000_000,
+    'TIMEOUT': 30 * 60,
+}
+
+# Holiday calendar (tasks/holidays/<region>.json) used when a request
+# doesn't pass "calendar"
+TASK_DEFAULT_CALENDAR = 'IN'
+
+# Per-stage timings: Server-Timing header + /api/tasks/metrics/
+TASK_INSTRUMENTATION = True
+# Allow ?profile=1 / "X-Profile: 1" to dump a cProfile of the request to
+# TASK_PROFILE_DIR; any client can trigger it, so only with TASK_PROFILING=1
+TASK_PROFILING = os.environ.get('TASK_PROFILING') == '1'
+TASK_PROFILE_DIR = BASE_DIR / 'profiles'
+
+# ASGI (task_analyzer/asgi.py): serve analyze/suggest/graph/feedback from the
+# async views; CPU work runs on a pool of TASK_ASYNC_WORKERS threads with at
+# most TASK_ASYNC_MAX_PENDING requests queued on it per event loop
+TASK_ASYNC_VIEWS = os.environ.get('TASK_ASYNC_VIEWS') == '1'
+TASK_ASYNC_WORKERS = 4
+TASK_ASYNC_MAX_PENDING = 64
+
 CORS_ALLOWED_ORIGINS = [
     "http://127.0.0.1:3000",
     "http://localhost:3000",
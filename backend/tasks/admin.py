@@ -0,0 +1,19 @@
+from django.contrib import admin
+
+from .models import Task, TaskDependency, TenantWeights
+
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ("task_id", "title", "due_date", "importance", "score", "matrix")
+    list_filter = ("matrix",)
+    search_fields = ("task_id", "title")
+
+
+admin.site.register(TaskDependency)
+
+
+@admin.register(TenantWeights)
+class TenantWeightsAdmin(admin.ModelAdmin):
+    list_display = ("tenant_id", "urgency_weight", "importance_weight", "effort_weight", "updated_at")
+    search_fields = ("tenant_id",)
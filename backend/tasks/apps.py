@@ -3,3 +3,7 @@ from django.apps import AppConfig
 class TasksConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'tasks'
+
+    def ready(self):
+        # Connects the request_started hook that starts the precompute worker
+        from . import precompute  # noqa: F401
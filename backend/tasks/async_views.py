@@ -0,0 +1,142 @@
+"""
+Async versions of analyze, suggest, graph and feedback for ASGI deployments.
+
+The views themselves only read the request and build the response; all
+parsing, validation and scoring (tasks.services) runs on a bounded
+thread pool, so the event loop keeps accepting connections while a
+large backlog is being scored. A per-loop semaphore caps how many
+requests may be queued on that pool (settings.TASK_ASYNC_MAX_PENDING);
+further requests wait on the event loop instead of piling up threads.
+"""
+import asyncio
+import contextvars
+import functools
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.http import HttpResponse
+from rest_framework.exceptions import APIException, ParseError
+
+from . import renderers, services
+from .tenants import TENANT_HEADER
+
+_executor = None
+_executor_lock = threading.Lock()
+_semaphores = weakref.WeakKeyDictionary()   # event loop -> asyncio.Semaphore
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=getattr(settings, "TASK_ASYNC_WORKERS", 4),
+                                           thread_name_prefix="task-api")
+        return _executor
+
+
+def _semaphore():
+    loop = asyncio.get_running_loop()
+    sem = _semaphores.get(loop)
+    if sem is None:
+        sem = _semaphores[loop] = asyncio.Semaphore(getattr(settings, "TASK_ASYNC_MAX_PENDING", 64))
+    return sem
+
+
+@receiver(setting_changed)
+def _reset_executor(setting, **kwargs):
+    global _executor
+    if setting in ("TASK_ASYNC_WORKERS", "TASK_ASYNC_MAX_PENDING"):
+        with _executor_lock:
+            if _executor is not None:
+                _executor.shutdown(wait=False)
+            _executor = None
+        _semaphores.clear()
+
+
+async def offload(fn, *args):
+    """Run fn(*args) on the bounded pool, keeping this request's context (timings)."""
+    call = functools.partial(contextvars.copy_context().run, fn, *args)
+    async with _semaphore():
+        return await asyncio.get_running_loop().run_in_executor(get_executor(), call)
+
+
+def _json_body(request):
+    """Parser for the request body, run on the pool along with the rest of the work."""
+    def load():
+        if not request.body:
+            return {}
+        try:
+            return renderers.loads(request.body)
+        except ValueError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
+    return load
+
+
+def _tenant(request):
+    return services.resolve_tenant(request.headers.get(TENANT_HEADER), request.GET.get("tenant"))
+
+
+def _respond(body, code):
+    return HttpResponse(renderers.dumps(body), status=code, content_type="application/json")
+
+
+def api(*methods):
+    """Method check + csrf exemption + DRF-style error bodies for an async view."""
+    def decorate(view):
+        @functools.wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            if request.method not in methods:
+                return _respond({"detail": f'Method "{request.method}" not allowed.'}, 405)
+            try:
+                return await view(request, *args, **kwargs)
+            except APIException as exc:
+                return _respond({"detail": exc.detail}, exc.status_code)
+        wrapper.csrf_exempt = True
+        return wrapper
+    return decorate
+
+
+@api("POST")
+async def analyze(request):
+    """Async POST /api/tasks/analyze/ (same body and response as AnalyzeTasksView)."""
+    tenant, error = _tenant(request)
+    if error:
+        return _respond(*error)
+    view, error = services.resolve_view(request.GET)
+    if error:
+        return _respond(*error)
+    key_material = request.content_type.encode() + b'\n' + request.body
+    return _respond(*await offload(services.analyze, key_material, _json_body(request), tenant, view))
+
+
+@api("GET")
+async def suggest(request):
+    """Async GET /api/tasks/suggest/ (same params and response as suggest_tasks)."""
+    tenant, error = _tenant(request)
+    if error:
+        return _respond(*error)
+    body, code, etag = await offload(services.suggest, request.META.get('QUERY_STRING', ''), request.GET,
+                                     request.headers.get('If-None-Match'), tenant)
+    response = _respond(body, code) if body is not None else HttpResponse(status=code)
+    return services.conditional(response, etag)
+
+
+@api("POST")
+async def graph(request):
+    """Async POST /api/tasks/graph/ (same body and response as task_graph)."""
+    load = _json_body(request)
+    return _respond(*await offload(lambda: services.graph(load())))
+
+
+@api("POST")
+async def feedback(request):
+    """Async POST /api/tasks/feedback/ (same body and response as feedback)."""
+    tenant, error = _tenant(request)
+    if error:
+        return _respond(*error)
+    load = _json_body(request)
+    return _respond(*await offload(lambda: services.feedback(load(), tenant)))
@@ -0,0 +1,118 @@
+"""
+Uploaded backlogs, addressed by content.
+
+POST /api/tasks/backlogs/ validates a task list once and stores it under
+a handle, a blake2b digest of the validated tasks, so uploading the same
+backlog again yields the same handle. /suggest/?backlog=<handle> then
+scores the stored tasks instead of a task list packed into the URL.
+
+Configured by settings.TASK_BACKLOGS:
+    {"BACKEND": "local", "MAX_BACKLOGS": 256, "MAX_TASKS": 1_000_000}
+        in-process LRU (default)
+    {"BACKEND": "django", "ALIAS": "default", "TIMEOUT": 86400}
+        any Django cache, shared between worker processes
+A handle that has been evicted answers 404; clients upload again.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+from .renderers import dumps
+
+DEFAULT_CONFIG = {
+    "BACKEND": "local",
+    "MAX_BACKLOGS": 256,
+    "MAX_TASKS": 1_000_000,
+    "TIMEOUT": 24 * 60 * 60,
+}
+
+
+def backlog_handle(validated):
+    """Digest of validated tasks; equal backlogs get equal handles."""
+    return hashlib.blake2b(dumps(validated, sort_keys=True), digest_size=16).hexdigest()
+
+
+class LocalBacklogStore:
+    """In-process LRU bounded by backlog count and total tasks."""
+
+    def __init__(self, max_backlogs=256, max_tasks=1_000_000):
+        self.max_backlogs = max_backlogs
+        self.max_tasks = max_tasks
+        self._lock = threading.Lock()
+        self._backlogs = OrderedDict()  # handle -> validated tasks
+        self._tasks = 0
+
+    def get(self, handle):
+        with self._lock:
+            tasks = self._backlogs.get(handle)
+            if tasks is not None:
+                self._backlogs.move_to_end(handle)
+            return tasks
+
+    def put(self, handle, tasks):
+        """returns: False if the backlog is too large to keep"""
+        if len(tasks) > self.max_tasks:
+            return False
+        with self._lock:
+            if handle in self._backlogs:
+                self._backlogs.move_to_end(handle)
+                return True
+            self._backlogs[handle] = tasks
+            self._tasks += len(tasks)
+            while len(self._backlogs) > self.max_backlogs or self._tasks > self.max_tasks:
+                _, evicted = self._backlogs.popitem(last=False)
+                self._tasks -= len(evicted)
+        return True
+
+    def clear(self):
+        with self._lock:
+            self._backlogs.clear()
+            self._tasks = 0
+
+
+class DjangoBacklogStore:
+    """Adapter over a Django cache alias."""
+
+    def __init__(self, alias="default", timeout=DEFAULT_CONFIG["TIMEOUT"], max_tasks=1_000_000):
+        from django.core.cache import caches
+        self.cache = caches[alias]
+        self.timeout = timeout
+        self.max_tasks = max_tasks
+
+    def get(self, handle):
+        return self.cache.get(f"tasks:backlog:{handle}")
+
+    def put(self, handle, tasks):
+        if len(tasks) > self.max_tasks:
+            return False
+        self.cache.set(f"tasks:backlog:{handle}", tasks, timeout=self.timeout)
+        return True
+
+    def clear(self):
+        self.cache.clear()
+
+
+_backlog_store = None
+
+
+def get_backlog_store():
+    global _backlog_store
+    if _backlog_store is None:
+        config = {**DEFAULT_CONFIG, **getattr(settings, "TASK_BACKLOGS", {})}
+        if config["BACKEND"] == "django":
+            _backlog_store = DjangoBacklogStore(config.get("ALIAS", "default"), config["TIMEOUT"],
+                                                config["MAX_TASKS"])
+        else:
+            _backlog_store = LocalBacklogStore(config["MAX_BACKLOGS"], config["MAX_TASKS"])
+    return _backlog_store
+
+
+@receiver(setting_changed)
+def _reset_backlog_store(setting, **kwargs):
+    global _backlog_store
+    if setting == "TASK_BACKLOGS":
+        _backlog_store = None
@@ -0,0 +1,118 @@
+"""
+Parallel scoring of many independent backlogs.
+
+Jobs are {"id", "tasks", "weights", "strategy", "calendar", "explain"}
+dicts (all but "tasks" optional). They are grouped into chunks and fanned
+out over a ProcessPoolExecutor; every worker is initialised once with the parent's
+HOLIDAYS and learned weights, so no worker re-reads the weights file or
+rebuilds the calendar per job. Only a bounded window of chunks is in
+flight at a time, so `jobs` may be a lazy iterable (e.g. an NDJSON file).
+"""
+import os
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+
+from . import scoring
+from .scoring import UnknownCalendar, calculate_scores, get_calendar
+from .serializers import validate_tasks
+from .services import require_ids, weights_error
+from .weights import load_user_weights
+
+DEFAULT_CHUNK_SIZE = 16
+# Chunks queued per worker; keeps every core busy without reading all jobs up front
+IN_FLIGHT_PER_WORKER = 2
+
+_learned_weights = None
+
+
+def _init_worker(holidays, learned_weights, settings_module):
+    global _learned_weights
+    if settings_module:
+        # Spawned (not forked) workers start without Django configured
+        import django
+        from django.apps import apps
+        if not apps.ready:
+            os.environ.setdefault("DJANGO_SETTINGS_MODULE", settings_module)
+            django.setup()
+    scoring.HOLIDAYS.clear()
+    scoring.HOLIDAYS.update(holidays)
+    get_calendar()
+    _learned_weights = learned_weights
+
+
+def score_job(job, learned_weights=None):
+    """
+    Validate and score one backlog.
+    returns: {"id", "tasks", "cycles"} or {"id", "errors"}; a bad job
+    never raises, so it cannot abort the rest of the batch
+    """
+    tasks = job.get("tasks") or []
+    if not isinstance(tasks, list):
+        return {"id": job.get("id"), "errors": {"tasks": ["tasks must be a list"]}}
+    error = weights_error(job.get("weights"))
+    if error:
+        return {"id": job.get("id"), "errors": {"weights": [error[0]["detail"]]}}
+    validated, errors = validate_tasks(tasks)
+    if not errors:
+        errors = require_ids(validated)
+    if errors:
+        return {"id": job.get("id"), "errors": errors}
+    weights = job.get("weights") or learned_weights
+    try:
+        calendar = get_calendar(job.get("calendar"))
+    except UnknownCalendar:
+        return {"id": job.get("id"), "errors": {"calendar": [f"unknown calendar {job.get('calendar')!r}"]}}
+    result = calculate_scores(validated, weights=weights, strategy=job.get("strategy"), calendar=calendar,
+                              explain=bool(job.get("explain")))
+    return {"id": job.get("id"), **result}
+
+
+def _score_chunk(chunk):
+    return [score_job(job, _learned_weights) for job in chunk]
+
+
+def _chunks(jobs, size):
+    jobs = iter(jobs)
+    while True:
+        chunk = list(islice(jobs, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def score_batches(jobs, workers=None, chunk_size=DEFAULT_CHUNK_SIZE, ordered=True):
+    """
+    Yield one score_job result per job.
+
+    workers:    process count (default os.cpu_count()); 1 scores inline
+    chunk_size: jobs sent to a worker per task, amortising pickling overhead
+    ordered:    results in job order, else as soon as each chunk finishes
+    """
+    workers = workers or os.cpu_count() or 1
+    learned = load_user_weights()
+
+    if workers == 1:
+        for job in jobs:
+            yield score_job(job, learned)
+        return
+
+    settings_module = os.environ.get("DJANGO_SETTINGS_MODULE")
+    initargs = (set(scoring.HOLIDAYS), learned, settings_module)
+    window = workers * IN_FLIGHT_PER_WORKER
+    chunks = _chunks(jobs, chunk_size)
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=initargs) as pool:
+        pending = deque(pool.submit(_score_chunk, chunk) for chunk in islice(chunks, window))
+        while pending:
+            if ordered:
+                done = [pending.popleft()]
+            else:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                done = [f for f in pending if f in finished]
+                for f in done:
+                    pending.remove(f)
+            for future in done:
+                for chunk in islice(chunks, 1):
+                    pending.append(pool.submit(_score_chunk, chunk))
+                yield from future.result()
@@ -0,0 +1,184 @@
+"""
+Result cache for analyze / suggest.
+
+A response depends only on the request payload, the (tenant's) learned weights,
+HOLIDAYS and today's date, so it is memoized under a blake2b hash of
+exactly those. Repeated polls with the same payload cost a hash and a
+lookup instead of validate + score + sort.
+
+Configured by settings.TASK_RESULT_CACHE:
+    {"BACKEND": "local", "MAX_ENTRIES": 256, "MAX_BYTES": 64 * 1024 * 1024}
+        in-process LRU (default)
+    {"BACKEND": "django", "ALIAS": "default"}
+        any Django cache, entries expire at midnight
+"""
+import datetime
+import hashlib
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+from .calendars import data_fingerprint
+from .renderers import dumps
+from .scoring import get_calendar
+from .tenants import learned_weights
+
+DEFAULT_CONFIG = {
+    "BACKEND": "local",
+    "MAX_ENTRIES": 256,
+    "MAX_BYTES": 64 * 1024 * 1024,
+}
+
+
+def result_key(endpoint, payload, now=None, tenant=None):
+    """
+    Cache key for one request.
+    payload: the raw request bytes (body or query string); it already holds
+    any explicit weights, strategy and calendar; the tenant and its learned
+    weights (global ones without a tenant), the default calendar and the
+    holiday data files are mixed in.
+    """
+    now = now or datetime.date.today()
+    learned = learned_weights(tenant)
+    h = hashlib.blake2b(digest_size=20)
+    h.update(payload if isinstance(payload, bytes) else payload.encode())
+    h.update(repr((
+        endpoint,
+        tenant,
+        sorted(learned.items()),
+        get_calendar().fingerprint,
+        data_fingerprint(),
+        now.toordinal(),
+    )).encode())
+    return f"tasks:{endpoint}:{h.hexdigest()}"
+
+
+def seconds_until_midnight(now=None):
+    now = now or datetime.datetime.now()
+    midnight = datetime.datetime.combine(now.date() + datetime.timedelta(days=1), datetime.time())
+    return max(1, int((midnight - now).total_seconds()))
+
+
+# Tasks serialized to estimate the size of a large ranking
+SIZE_SAMPLE = 64
+
+
+def result_size(result):
+    """
+    Approximate serialized size of a cached response, in bytes. Large task
+    lists are estimated from an evenly spaced sample, so a 100k-task
+    ranking costs ~64 task encodes rather than a full dumps().
+    """
+    tasks = result.get("tasks") if isinstance(result, dict) else None
+    if not isinstance(tasks, list) or len(tasks) <= SIZE_SAMPLE:
+        return len(dumps(result))
+    sample = tasks[::len(tasks) // SIZE_SAMPLE]
+    rest = len(dumps({**result, "tasks": []}))
+    return rest + len(dumps(sample)) * len(tasks) // len(sample)
+
+
+class LocalResultCache:
+    """In-process LRU bounded by entry count and serialized result bytes; emptied when the date changes."""
+
+    def __init__(self, max_entries=256, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (value, size)
+        self._bytes = 0
+        self._day = datetime.date.today()
+
+    def _roll_day(self):
+        today = datetime.date.today()
+        if today != self._day:
+            self._entries.clear()
+            self._bytes = 0
+            self._day = today
+
+    def get(self, key):
+        with self._lock:
+            self._roll_day()
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key, value, size=0):
+        """size: approximate cost in bytes (callers pass result_size(value))."""
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._roll_day()
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries), "bytes": self._bytes}
+
+
+class DjangoResultCache:
+    """Adapter over a Django cache alias; entries expire at the next midnight."""
+
+    def __init__(self, alias="default"):
+        from django.core.cache import caches
+        self.cache = caches[alias]
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        value = self.cache.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key, value, size=0):
+        self.cache.set(key, value, timeout=seconds_until_midnight())
+
+    def clear(self):
+        self.cache.clear()
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses}
+
+
+_result_cache = None
+
+
+def get_result_cache():
+    global _result_cache
+    if _result_cache is None:
+        config = {**DEFAULT_CONFIG, **getattr(settings, "TASK_RESULT_CACHE", {})}
+        if config["BACKEND"] == "django":
+            _result_cache = DjangoResultCache(config.get("ALIAS", "default"))
+        else:
+            _result_cache = LocalResultCache(config["MAX_ENTRIES"], config["MAX_BYTES"])
+    return _result_cache
+
+
+@receiver(setting_changed)
+def _reset_result_cache(setting, **kwargs):
+    global _result_cache
+    if setting == "TASK_RESULT_CACHE":
+        _result_cache = None
@@ -0,0 +1,258 @@
+"""
+Holiday calendars: per-region definitions compiled into O(1) lookup tables.
+
+Each region is a JSON file in tasks/holidays/ (e.g. IN.json):
+
+    {
+      "name": "India",
+      "weekend": [5, 6],                       # weekday() numbers, Mon = 0
+      "rules": [
+        {"name": "Republic Day", "month": 1, "day": 26},
+        {"name": "Thanksgiving", "month": 11, "weekday": 3, "nth": 4},   # nth=-1: last
+        {"name": "Good Friday", "easter": -2},                           # days from Easter
+        {"name": "Christmas", "month": 12, "day": 25, "observed": "nearest"}
+      ],
+      "dates": {"2025": ["2025-03-14"]}        # one-off (e.g. lunar) holidays
+    }
+
+Rules may carry "from" / "until" years. "observed" moves a holiday that
+falls on the weekend: "nearest" (Sat -> Fri, Sun -> Mon) or "next_monday"
+(to the next free working day, as UK substitute days).
+
+Rules are expanded over a window of years around today (YEARS_BEHIND
+before, YEARS_AHEAD after) and compiled into a BusinessCalendar, which is
+cached per process, so any number of regions can be loaded without slowing
+down lookups. Outside that window only weekends are skipped: holidays of
+due dates more than YEARS_AHEAD years out are ignored.
+"""
+import datetime
+import hashlib
+import json
+import os
+import threading
+from array import array
+
+HOLIDAYS_DIR = os.path.join(os.path.dirname(__file__), "holidays")
+
+# Years compiled around the current year; holidays outside them are not counted
+YEARS_BEHIND = 5
+YEARS_AHEAD = 10
+
+DEFAULT_WEEKEND = (5, 6)
+
+
+class UnknownCalendar(ValueError):
+    pass
+
+
+def _weekday_table(weekend):
+    """table[r] = working weekdays among the first r days of a Monday-based week."""
+    table = [0]
+    for weekday in range(7):
+        table.append(table[-1] + (weekday not in weekend))
+    return tuple(table)
+
+
+class BusinessCalendar:
+    """
+    Compiled working-day index for a set of holidays and weekend days.
+
+    Holidays are stored as a bitmap over [base, base + span) date ordinals,
+    plus a prefix array counting holidays that fall on working weekdays.
+    Weekdays are counted in closed form from the ordinal (ordinal 1,
+    0001-01-01, is a Monday), so is_holiday, is_weekend and
+    business_days_between are all O(1). Outside the bitmap only weekends
+    are non-working.
+    """
+
+    def __init__(self, holidays, weekend=DEFAULT_WEEKEND, name="custom"):
+        self.name = name
+        self.weekend = frozenset(weekend)
+        self.week_table = _weekday_table(self.weekend)
+
+        ordinals = set()
+        for h in holidays:
+            if isinstance(h, datetime.date):
+                ordinals.add(h.toordinal())
+                continue
+            try:
+                d = datetime.date.fromisoformat(h)
+            except (TypeError, ValueError):
+                continue
+            # Only exact "YYYY-MM-DD" strings ever matched strftime() before
+            if d.isoformat() == h:
+                ordinals.add(d.toordinal())
+
+        self.base = min(ordinals) if ordinals else 0
+        self.span = max(ordinals) - self.base + 1 if ordinals else 0
+        self.holiday_bitmap = bytearray(self.span)
+        for o in ordinals:
+            self.holiday_bitmap[o - self.base] = 1
+        # holiday_prefix[k]: working-weekday holidays with ordinal < base + k
+        self.holiday_prefix = array("I", [0]) * (self.span + 1)
+        count = 0
+        for k in range(self.span):
+            if self.holiday_bitmap[k] and (self.base + k - 1) % 7 not in self.weekend:
+                count += 1
+            self.holiday_prefix[k + 1] = count
+
+        # Stable across processes, for cache keys and stored-score fingerprints
+        digest = hashlib.blake2b(digest_size=8)
+        digest.update(repr(sorted(self.weekend)).encode())
+        digest.update(array("q", sorted(ordinals)).tobytes())
+        self.fingerprint = digest.hexdigest()
+
+    def is_weekend(self, d: datetime.date) -> bool:
+        return d.weekday() in self.weekend
+
+    def is_holiday(self, d: datetime.date) -> bool:
+        k = d.toordinal() - self.base
+        return 0 <= k < self.span and self.holiday_bitmap[k] == 1
+
+    def is_working_day(self, d: datetime.date) -> bool:
+        return not (self.is_weekend(d) or self.is_holiday(d))
+
+    def working_days_through(self, ordinal: int) -> int:
+        """Working days with date ordinal in [1, ordinal]."""
+        weeks, rest = divmod(ordinal, 7)
+        k = min(max(ordinal - self.base + 1, 0), self.span)
+        return weeks * self.week_table[7] + self.week_table[rest] - self.holiday_prefix[k]
+
+    def business_days_between(self, start: datetime.date, end: datetime.date) -> int:
+        if end <= start:
+            return 0
+        return self.working_days_through(end.toordinal()) - self.working_days_through(start.toordinal())
+
+
+# --------------------------------------------------------------------
+# Region definitions
+# --------------------------------------------------------------------
+def available_regions():
+    return sorted(f[:-5] for f in os.listdir(HOLIDAYS_DIR) if f.endswith(".json"))
+
+
+_definitions = {}
+_definitions_lock = threading.Lock()
+
+
+def load_definition(region):
+    """Parsed tasks/holidays/<region>.json (cached per process)."""
+    with _definitions_lock:
+        if region not in _definitions:
+            if not isinstance(region, str) or region not in available_regions():
+                raise UnknownCalendar(region)
+            with open(os.path.join(HOLIDAYS_DIR, region + ".json"), encoding="utf-8") as f:
+                _definitions[region] = json.load(f)
+        return _definitions[region]
+
+
+def easter(year):
+    """Western (Gregorian) Easter Sunday, anonymous Gregorian algorithm."""
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7  # noqa: E741
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return datetime.date(year, month, day + 1)
+
+
+def _nth_weekday(year, month, weekday, nth):
+    if nth > 0:
+        first = datetime.date(year, month, 1)
+        return first + datetime.timedelta(days=(weekday - first.weekday()) % 7 + 7 * (nth - 1))
+    following = datetime.date(year + month // 12, month % 12 + 1, 1)
+    last = following - datetime.timedelta(days=1)
+    return last - datetime.timedelta(days=(last.weekday() - weekday) % 7 + 7 * (-nth - 1))
+
+
+def _rule_date(rule, year):
+    if "easter" in rule:
+        return easter(year) + datetime.timedelta(days=rule["easter"])
+    if "nth" in rule:
+        return _nth_weekday(year, rule["month"], rule["weekday"], rule["nth"])
+    return datetime.date(year, rule["month"], rule["day"])
+
+
+def holiday_dates(definition, year):
+    """All holidays of one definition in one year, observed-day rules applied."""
+    weekend = frozenset(definition.get("weekend", DEFAULT_WEEKEND))
+    dates = {datetime.date.fromisoformat(d) for d in definition.get("dates", {}).get(str(year), ())}
+    substitutes = []
+    for rule in definition.get("rules", ()):
+        if not rule.get("from", year) <= year <= rule.get("until", year):
+            continue
+        d = _rule_date(rule, year)
+        observed = rule.get("observed")
+        if d.weekday() in weekend and observed == "nearest":
+            d += datetime.timedelta(days=-1 if d.weekday() == 5 else 1)
+        elif d.weekday() in weekend and observed == "next_monday":
+            substitutes.append(d)
+            continue
+        dates.add(d)
+    # Substitute days go after all regular holidays are placed
+    for d in sorted(substitutes):
+        while d.weekday() in weekend or d in dates:
+            d += datetime.timedelta(days=1)
+        dates.add(d)
+    return dates
+
+
+def compile_region(region, first_year, last_year, extra=()):
+    definition = load_definition(region)
+    dates = set(extra)
+    for year in range(first_year, last_year + 1):
+        dates |= holiday_dates(definition, year)
+    return BusinessCalendar(dates, weekend=definition.get("weekend", DEFAULT_WEEKEND), name=region)
+
+
+_data_fingerprint = None
+
+
+def data_fingerprint():
+    """Digest of the region files, so cached results change along with the data."""
+    global _data_fingerprint
+    if _data_fingerprint is None:
+        digest = hashlib.blake2b(digest_size=8)
+        for region in available_regions():
+            with open(os.path.join(HOLIDAYS_DIR, region + ".json"), "rb") as f:
+                digest.update(region.encode() + b"\0" + f.read())
+        _data_fingerprint = digest.hexdigest()
+    return _data_fingerprint
+
+
+class CalendarRegistry:
+    """Compiled calendars by (region, window, extra holidays), built once per process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._compiled = {}
+
+    def get(self, region, extra=frozenset(), today=None):
+        year = (today or datetime.date.today()).year
+        key = (region, year, extra)
+        calendar = self._compiled.get(key)
+        if calendar is None:
+            calendar = compile_region(region, year - YEARS_BEHIND, year + YEARS_AHEAD, extra)
+            with self._lock:
+                # Drop calendars for older windows or superseded extra holidays
+                for stale in [k for k in self._compiled if k[0] == region]:
+                    del self._compiled[stale]
+                self._compiled[key] = calendar
+        return calendar
+
+    def clear(self):
+        """Forget compiled calendars and parsed region files (e.g. after editing them)."""
+        global _data_fingerprint
+        with self._lock:
+            self._compiled.clear()
+        with _definitions_lock:
+            _definitions.clear()
+        _data_fingerprint = None
+
+
+registry = CalendarRegistry()
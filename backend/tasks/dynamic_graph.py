@@ -0,0 +1,267 @@
+"""
+Dependency graph sessions: edit edges without re-running cycle detection.
+
+A DynamicGraph keeps the strongly connected components of a task graph
+(a cycle is a component with more than one task, or a self-dependency)
+and a topological order of those components, and updates both per edge
+with the Pearce-Kelly algorithm:
+
+- adding dep -> task when dep already comes first changes nothing;
+  otherwise only the components positioned between the two ends are
+  searched (forward from the task, backward from the dependency) and
+  reordered. If the search reaches the dependency, the edge closes a
+  cycle: in "reject" mode it is refused, in "flag" mode the components
+  on the new cycle are merged and the cycle reported.
+- removing an edge between components changes nothing; removing one
+  inside a cycle re-runs Tarjan on that component only, which may split
+  it.
+
+So an edit costs the size of the affected region, not V + E.
+Component positions are tuples, compared lexicographically: reordering
+permutes the existing positions, and a component that splits into k
+parts gives them its position extended by 0..k-1, which all sort where
+the component was.
+
+Sessions live in an in-process LRU like what-if sessions
+(settings.TASK_GRAPH_SESSIONS):
+    {"MAX_SESSIONS": 64, "MAX_TASKS": 1_000_000, "TIMEOUT": 1800}
+"""
+import threading
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+from .scoring import strongly_connected_components
+from .whatif import SessionRegistry
+
+MODES = ("reject", "flag")
+
+DEFAULT_CONFIG = {
+    "MAX_SESSIONS": 64,
+    "MAX_TASKS": 1_000_000,
+    "TIMEOUT": 30 * 60,
+}
+
+
+class DynamicGraph:
+    def __init__(self, tasks, mode="reject"):
+        """
+        tasks: validated task dicts with ids (first occurrence of an id wins);
+        dependencies on unknown ids are ignored, as in analyze_graph.
+        mode: "reject" or "flag" cycle-creating edges
+        """
+        if mode not in MODES:
+            raise ValueError(mode)
+        self.mode = mode
+        self.lock = threading.Lock()
+
+        index = {}
+        for t in tasks:
+            index.setdefault(t["id"], len(index))
+        self.ids = list(index)
+        self.index = index
+        n = len(self.ids)
+        self.succ = [set() for _ in range(n)]   # node -> dependents
+        self.pred = [set() for _ in range(n)]   # node -> dependencies
+        self.self_loops = set()
+        self.edges = 0
+        seen = set()
+        for t in tasks:
+            i = index[t["id"]]
+            if i in seen:
+                continue
+            seen.add(i)
+            for dep in t.get("dependencies") or ():
+                j = index.get(dep)
+                if j is not None and i not in self.succ[j]:
+                    self._link(j, i)
+
+        # Components: comp[node] is its representative; members only for
+        # components of more than one task; pos only for representatives.
+        self.comp = list(range(n))
+        self.members = {}
+        self.pos = [None] * n
+        self.cyclic = set()
+        components = strongly_connected_components(range(n), dict(enumerate(self.succ)))
+        for k, nodes in enumerate(reversed(components)):
+            self._set_component(nodes, (k,))
+
+    def __len__(self):
+        return len(self.ids)
+
+    # ----------------------------------------------------------------
+    # Helpers
+    # ----------------------------------------------------------------
+    def _link(self, u, v):
+        self.succ[u].add(v)
+        self.pred[v].add(u)
+        self.edges += 1
+        if u == v:
+            self.self_loops.add(u)
+
+    def _unlink(self, u, v):
+        self.succ[u].discard(v)
+        self.pred[v].discard(u)
+        self.edges -= 1
+        if u == v:
+            self.self_loops.discard(u)
+
+    def _members(self, c):
+        return self.members.get(c) or (c,)
+
+    def _set_component(self, nodes, position):
+        rep = nodes[0]
+        for m in nodes:
+            self.comp[m] = rep
+        if len(nodes) > 1:
+            self.members[rep] = nodes
+        self.pos[rep] = position
+        if len(nodes) > 1 or rep in self.self_loops:
+            self.cyclic.add(rep)
+        else:
+            self.cyclic.discard(rep)
+        return rep
+
+    def _reach(self, start, neighbours, keep):
+        """Components reachable from start through neighbours (succ or pred) whose position passes keep."""
+        comp, pos = self.comp, self.pos
+        seen = {start}
+        stack = [start]
+        while stack:
+            c = stack.pop()
+            for m in self._members(c):
+                for x in neighbours[m]:
+                    d = comp[x]
+                    if d not in seen and keep(pos[d]):
+                        seen.add(d)
+                        stack.append(d)
+        return seen
+
+    def _ids(self, nodes):
+        return [self.ids[m] for m in sorted(nodes)]
+
+    # ----------------------------------------------------------------
+    # Edits
+    # ----------------------------------------------------------------
+    def add_edge(self, dep, task):
+        """
+        Make task depend on dep.
+        returns: {"status": "added" | "exists" | "rejected" | "unknown",
+                  "cycle": ids (rejected, or the cycle the edge created in flag mode),
+                  "moved": components repositioned}
+        """
+        u, v = self.index.get(dep), self.index.get(task)
+        if u is None or v is None:
+            return {"status": "unknown"}
+        if v in self.succ[u]:
+            return {"status": "exists"}
+        cu, cv = self.comp[u], self.comp[v]
+
+        if u == v:
+            if self.mode == "reject":
+                return {"status": "rejected", "cycle": [dep]}
+            self._link(u, v)
+            if cu in self.cyclic:
+                return {"status": "added", "moved": 0}
+            self.cyclic.add(cu)
+            return {"status": "added", "cycle": [dep], "moved": 0}
+
+        lb, ub = self.pos[cv], self.pos[cu]
+        if cu == cv or ub < lb:
+            self._link(u, v)
+            return {"status": "added", "moved": 0}
+
+        # Affected region: components positioned in [lb, ub]
+        forward = self._reach(cv, self.succ, lambda p: p <= ub)
+        backward = self._reach(cu, self.pred, lambda p: p >= lb)
+        merged = forward & backward if cu in forward else set()
+        if merged and self.mode == "reject":
+            return {"status": "rejected",
+                    "cycle": self._ids(m for c in merged for m in self._members(c))}
+
+        self._link(u, v)
+        pos = self.pos
+        pool = sorted(pos[c] for c in forward | backward)
+        before = sorted(backward - merged, key=pos.__getitem__)
+        after = sorted(forward - merged, key=pos.__getitem__)
+        # Dependencies of the region take the lowest positions and its
+        # dependents the highest, so edges leaving the region stay ordered
+        for c, p in zip(before, pool):
+            pos[c] = p
+        for c, p in zip(after, pool[len(pool) - len(after):]):
+            pos[c] = p
+        if not merged:
+            return {"status": "added", "moved": len(pool)}
+
+        nodes = sorted(m for c in merged for m in self._members(c))
+        for c in merged:
+            self.members.pop(c, None)
+            self.cyclic.discard(c)
+        self._set_component(nodes, pool[len(before)])
+        return {"status": "added", "cycle": self._ids(nodes), "moved": len(pool)}
+
+    def remove_edge(self, dep, task):
+        """
+        Drop task's dependency on dep.
+        returns: {"status": "removed" | "missing" | "unknown", "split": components a cycle broke into}
+        """
+        u, v = self.index.get(dep), self.index.get(task)
+        if u is None or v is None:
+            return {"status": "unknown"}
+        if v not in self.succ[u]:
+            return {"status": "missing"}
+        self._unlink(u, v)
+        c = self.comp[u]
+        if c != self.comp[v]:
+            return {"status": "removed"}
+        if u == v:
+            if c not in self.members:
+                self.cyclic.discard(c)
+            return {"status": "removed"}
+
+        # The edge was inside a cycle: re-check that component alone
+        nodes = self.members[c]
+        inside = {m: [x for x in self.succ[m] if self.comp[x] == c] for m in nodes}
+        components = strongly_connected_components(nodes, inside)
+        if len(components) == 1:
+            return {"status": "removed"}
+        base = self.pos[c]
+        del self.members[c]
+        self.cyclic.discard(c)
+        for k, part in enumerate(reversed(components)):
+            self._set_component(sorted(part), base + (k,))
+        return {"status": "removed", "split": len(components)}
+
+    # ----------------------------------------------------------------
+    # State
+    # ----------------------------------------------------------------
+    def cycles(self):
+        """Each cycle (component) once, ids in task-list order, like analyze_dependencies."""
+        cycles = [sorted(self._members(c)) for c in self.cyclic]
+        cycles.sort()
+        return [[self.ids[m] for m in cycle] for cycle in cycles]
+
+    def order(self):
+        """Ids of tasks not on a cycle, dependencies before dependents."""
+        reps = [c for c, rep in enumerate(self.comp) if c == rep and c not in self.cyclic]
+        reps.sort(key=self.pos.__getitem__)
+        return [self.ids[c] for c in reps]
+
+
+_registry = None
+
+
+def get_registry():
+    global _registry
+    if _registry is None:
+        config = {**DEFAULT_CONFIG, **getattr(settings, "TASK_GRAPH_SESSIONS", {})}
+        _registry = SessionRegistry(config["MAX_SESSIONS"], config["MAX_TASKS"], config["TIMEOUT"])
+    return _registry
+
+
+@receiver(setting_changed)
+def _reset_registry(setting, **kwargs):
+    global _registry
+    if setting == "TASK_GRAPH_SESSIONS":
+        _registry = None
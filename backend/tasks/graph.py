@@ -0,0 +1,187 @@
+"""
+Critical-path and transitive-blocker analysis for the dependency graph.
+
+One forward and one backward pass over the topological order from
+analyze_dependencies give each task's earliest/latest finish (weighted by
+estimated_hours), its slack and the critical chain. Transitive dependent
+counts use bitsets for graphs up to EXACT_DESCENDANTS_LIMIT tasks and an
+upper bound beyond that. Tasks on a dependency cycle have no schedule and
+are left out of the path analysis.
+"""
+import math
+from collections import deque
+
+from .scoring import analyze_dependencies
+
+# Above this many tasks, descendant bitsets (V^2 bits) get too large and
+# transitive dependent counts fall back to an upper bound.
+EXACT_DESCENDANTS_LIMIT = 20000
+
+EPSILON = 1e-9
+
+
+def _hours(t):
+    return float(t.get("estimated_hours") or 1.0)
+
+
+def analyze_graph(tasks):
+    """
+    tasks: validated task dicts with ids (first occurrence of an id wins)
+    returns: {
+        "nodes": [{"id", "label", "hours", "earliest_finish", "latest_finish", "slack",
+                   "critical", "dependents", "blocker_hint"}] in input order,
+        "edges": [{"from", "to"}] between known tasks,
+        "critical_path": ids along the longest chain, first to last,
+        "project_hours": length of that chain,
+        "cycles": [...],
+        "missing_dependencies": {task id: [unknown dependency ids]},
+        "dependents_exact": False when dependent counts are upper bounds,
+    }
+    """
+    unique = {}
+    for t in tasks:
+        unique.setdefault(t["id"], t)
+    tasks = list(unique.values())
+    index = {tid: i for i, tid in enumerate(unique)}
+    n = len(tasks)
+
+    deps = [[] for _ in range(n)]
+    dependents = [[] for _ in range(n)]
+    edges = []
+    missing = {}
+    for i, t in enumerate(tasks):
+        for dep in dict.fromkeys(t.get("dependencies") or []):
+            j = index.get(dep)
+            if j is None:
+                missing.setdefault(t["id"], []).append(dep)
+                continue
+            deps[i].append(j)
+            dependents[j].append(i)
+            edges.append({"from": dep, "to": t["id"]})
+
+    analysis = analyze_dependencies(tasks)
+    order = [index[tid] for tid in analysis["order"]]
+    acyclic = [False] * n
+    for i in order:
+        acyclic[i] = True
+
+    hours = [_hours(t) for t in tasks]
+    earliest = [0.0] * n
+    for i in order:
+        start = max((earliest[j] for j in deps[i] if acyclic[j]), default=0.0)
+        earliest[i] = start + hours[i]
+    project = max((earliest[i] for i in order), default=0.0)
+
+    latest = [project] * n
+    for i in reversed(order):
+        for j in dependents[i]:
+            if acyclic[j] and latest[j] - hours[j] < latest[i]:
+                latest[i] = latest[j] - hours[j]
+
+    # Walk back from the latest-finishing task through the dependency
+    # that determined each earliest start.
+    path = []
+    if order:
+        i = max(order, key=earliest.__getitem__)
+        while i is not None:
+            path.append(tasks[i]["id"])
+            start = earliest[i] - hours[i]
+            i = next((j for j in deps[i] if acyclic[j] and abs(earliest[j] - start) < EPSILON), None)
+        path.reverse()
+
+    counts, exact = transitive_dependents(n, order, dependents, acyclic)
+    top = max(counts, default=0)
+
+    nodes = []
+    for i, t in enumerate(tasks):
+        node = {
+            "id": t["id"],
+            "label": t.get("title"),
+            "hours": hours[i],
+            "earliest_finish": None,
+            "latest_finish": None,
+            "slack": None,
+            "critical": False,
+            "dependents": counts[i],
+            "blocker_hint": blocker_hint(counts[i], top),
+        }
+        if acyclic[i]:
+            slack = latest[i] - earliest[i]
+            node.update(earliest_finish=earliest[i], latest_finish=latest[i],
+                        slack=round(slack, 6), critical=slack < EPSILON)
+        nodes.append(node)
+
+    return {
+        "nodes": nodes,
+        "edges": edges,
+        "critical_path": path,
+        "project_hours": project,
+        "cycles": analysis["cycles"],
+        "missing_dependencies": missing,
+        "dependents_exact": exact,
+    }
+
+
+def transitive_dependents(n, order, dependents, acyclic):
+    """
+    Number of tasks reachable through `dependents` from each acyclic task.
+    returns: (counts, exact)
+    """
+    counts = [0] * n
+    if n <= EXACT_DESCENDANTS_LIMIT:
+        reach = [0] * n
+        for i in reversed(order):
+            bits = 0
+            for j in dependents[i]:
+                if acyclic[j]:
+                    bits |= reach[j] | (1 << j)
+            reach[i] = bits
+            counts[i] = bits.bit_count()
+        return counts, True
+
+    # Counting each path separately over-counts shared descendants
+    for i in reversed(order):
+        counts[i] = min(n - 1, sum(counts[j] + 1 for j in dependents[i] if acyclic[j]))
+    return counts, False
+
+
+def blocker_hint(count, top):
+    """
+    0..1 rank hint: how much a task blocks relative to the biggest blocker,
+    growing with the log of the transitive dependent count. Informational
+    only; it is not added to any score.
+    """
+    if count <= 0 or top <= 0:
+        return 0.0
+    return round(math.log1p(count) / math.log1p(top), 3)
+
+
+def subgraph(graph, focus, depth):
+    """
+    Restrict an analyze_graph result to tasks within `depth` dependency hops
+    (either direction) of `focus`. Returns None when focus is unknown.
+    """
+    adjacent = {}
+    for e in graph["edges"]:
+        adjacent.setdefault(e["from"], []).append(e["to"])
+        adjacent.setdefault(e["to"], []).append(e["from"])
+
+    if not any(node["id"] == focus for node in graph["nodes"]):
+        return None
+
+    seen = {focus: 0}
+    queue = deque([focus])
+    while queue:
+        tid = queue.popleft()
+        if seen[tid] == depth:
+            continue
+        for other in adjacent.get(tid, ()):
+            if other not in seen:
+                seen[other] = seen[tid] + 1
+                queue.append(other)
+
+    return dict(
+        graph,
+        nodes=[node for node in graph["nodes"] if node["id"] in seen],
+        edges=[e for e in graph["edges"] if e["from"] in seen and e["to"] in seen],
+    )
@@ -0,0 +1,161 @@
+"""
+Filtered, cursor-paginated views of a ranked analyze result.
+
+A RankedIndex is built once per ranking (and cached next to it) and holds,
+per Eisenhower quadrant, the ranks of that quadrant's tasks and their
+negated scores, both ascending. Since the ranking is already sorted by
+score, a score range is two bisects, a quadrant is a lookup, and a page
+touches only the tasks it returns; the due window is checked on the
+candidates as they are taken. Only positions and scores are kept, so the
+index is small next to the result it points into.
+
+A cursor is the rank of the last task of the previous page, so the next
+page starts right after it in whatever view is being paged.
+"""
+import base64
+import datetime
+import math
+from array import array
+from bisect import bisect_left, bisect_right
+
+QUADRANTS = ("Do First", "Schedule", "Delegate", "Eliminate")
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 1000
+
+
+class InvalidView(ValueError):
+    pass
+
+
+def encode_cursor(rank):
+    return base64.urlsafe_b64encode(f"r{rank}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        text = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        if text[:1] != "r":
+            raise ValueError(cursor)
+        rank = int(text[1:])
+    except ValueError:
+        raise InvalidView("invalid cursor")
+    if rank < 0:
+        raise InvalidView("invalid cursor")
+    return rank
+
+
+def _number(params, name):
+    value = params.get(name)
+    if value in (None, ""):
+        return None
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        number = math.nan
+    if math.isnan(number):
+        raise InvalidView(f"{name} must be a number")
+    return number
+
+
+def _date(params, name):
+    value = params.get(name)
+    if value in (None, ""):
+        return None
+    try:
+        return datetime.date.fromisoformat(value).isoformat()
+    except (TypeError, ValueError):
+        raise InvalidView(f"{name} must be a YYYY-MM-DD date")
+
+
+class View:
+    """Filters and page of one request (all optional)."""
+    __slots__ = ("matrix", "min_score", "max_score", "due_after", "due_before", "after", "limit")
+
+    PARAMS = ("matrix", "min_score", "max_score", "due_after", "due_before", "cursor", "limit")
+
+    def __init__(self, matrix=None, min_score=None, max_score=None, due_after=None, due_before=None,
+                 after=-1, limit=DEFAULT_LIMIT):
+        self.matrix = matrix
+        self.min_score = min_score
+        self.max_score = max_score
+        self.due_after = due_after
+        self.due_before = due_before
+        self.after = after
+        self.limit = limit
+
+    @classmethod
+    def from_params(cls, params):
+        """
+        params: query parameters; returns None when none of PARAMS is given
+        (the plain, unpaginated response). Raises InvalidView.
+        """
+        if not any(params.get(name) not in (None, "") for name in cls.PARAMS):
+            return None
+        matrix = params.get("matrix") or None
+        if matrix is not None and matrix not in QUADRANTS:
+            raise InvalidView(f"matrix must be one of {', '.join(QUADRANTS)}")
+        try:
+            limit = int(params.get("limit") or DEFAULT_LIMIT)
+        except ValueError:
+            raise InvalidView("limit must be an integer")
+        if not 1 <= limit <= MAX_LIMIT:
+            raise InvalidView(f"limit must be between 1 and {MAX_LIMIT}")
+        min_score, max_score = _number(params, "min_score"), _number(params, "max_score")
+        if min_score is not None and max_score is not None and min_score > max_score:
+            raise InvalidView("min_score must not exceed max_score")
+        cursor = params.get("cursor")
+        return cls(matrix, min_score, max_score, _date(params, "due_after"), _date(params, "due_before"),
+                   decode_cursor(cursor) if cursor else -1, limit)
+
+
+class RankedIndex:
+    __slots__ = ("ranks", "neg_scores", "due_dates")
+
+    def __init__(self, tasks):
+        """tasks: TaskRecords or task dicts by descending score (an analyze ranking)"""
+        get = (lambda t, name: t[name]) if tasks and isinstance(tasks[0], dict) else getattr
+        self.ranks = {q: array("l") for q in (None, *QUADRANTS)}
+        self.neg_scores = {q: array("d") for q in (None, *QUADRANTS)}
+        due_dates = []
+        for rank, task in enumerate(tasks):
+            score = -get(task, "score")
+            for q in (None, get(task, "matrix")):
+                self.ranks[q].append(rank)
+                self.neg_scores[q].append(score)
+            due = get(task, "due_date")
+            due_dates.append(due.isoformat() if isinstance(due, datetime.date) else due)
+        self.due_dates = due_dates
+
+    def __len__(self):
+        return len(self.due_dates)
+
+    def page(self, view):
+        """
+        returns: (ranks of the page's tasks, cursor for the next page or None,
+        count of matching tasks, or None with a due window)
+        """
+        ranks = self.ranks[view.matrix]
+        neg_scores = self.neg_scores[view.matrix]
+        lo = 0 if view.max_score is None else bisect_left(neg_scores, -view.max_score)
+        hi = len(ranks) if view.min_score is None else bisect_right(neg_scores, -view.min_score)
+        start = max(lo, bisect_right(ranks, view.after, lo, hi))
+
+        windowed = view.due_after is not None or view.due_before is not None
+        if not windowed:
+            page = ranks[start:min(hi, start + view.limit)].tolist()
+            more = start + len(page) < hi
+            return page, encode_cursor(page[-1]) if more else None, max(0, hi - lo)
+
+        due_dates = self.due_dates
+        after, before = view.due_after, view.due_before
+        page = []
+        i = start
+        while i < hi and len(page) <= view.limit:
+            due = due_dates[ranks[i]]
+            if due is not None and (after is None or due >= after) and (before is None or due <= before):
+                page.append(ranks[i])
+            i += 1
+        more = len(page) > view.limit
+        del page[view.limit:]
+        return page, encode_cursor(page[-1]) if more else None, None
@@ -0,0 +1,170 @@
+"""
+Per-stage hot-path timings.
+
+Code on the request path wraps its phases in `with stage("validate"):`.
+TimingMiddleware installs a RequestTimings for the current request; when
+none is installed (instrumentation off, or code running outside a
+request) stage() hands back a shared no-op context manager, so the cost
+is a ContextVar lookup.
+
+Finished requests are folded into `metrics`, which renders Prometheus
+text for the /api/tasks/metrics/ endpoint.
+"""
+import contextvars
+import threading
+import time
+
+_current = contextvars.ContextVar("task_request_timings", default=None)
+
+
+class RequestTimings:
+    """Stage durations (seconds) and counters collected for one request."""
+
+    def __init__(self):
+        self.stages = {}
+        self.counts = {}
+
+    def add(self, name, seconds):
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def server_timing(self):
+        """Value for the Server-Timing response header (durations in ms)."""
+        return ", ".join(f"{name};dur={seconds * 1000:.2f}" for name, seconds in self.stages.items())
+
+
+class _Stage:
+    __slots__ = ("timings", "name", "start")
+
+    def __init__(self, timings, name):
+        self.timings = timings
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.timings.add(self.name, time.perf_counter() - self.start)
+
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return None
+
+
+NULL_STAGE = _NullStage()
+
+
+def stage(name):
+    """Context manager timing one phase of the current request."""
+    timings = _current.get()
+    if timings is None:
+        return NULL_STAGE
+    return _Stage(timings, name)
+
+
+def active():
+    """True when the current request is being instrumented (guards costly counting)."""
+    return _current.get() is not None
+
+
+def record_count(name, value):
+    timings = _current.get()
+    if timings is not None:
+        timings.counts[name] = value
+
+
+def begin():
+    """Install a fresh RequestTimings; returns (timings, token for end())."""
+    timings = RequestTimings()
+    return timings, _current.set(timings)
+
+
+def end(token):
+    _current.reset(token)
+
+
+# --------------------------------------------------------------------
+# Aggregated metrics (Prometheus text format)
+# --------------------------------------------------------------------
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    def __init__(self):
+        self.buckets = [0] * len(BUCKETS)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(BUCKETS):
+            if value <= bound:
+                self.buckets[i] += 1
+
+
+class MetricsRegistry:
+    """Process-wide stage histograms and request/task/edge counters."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stage_seconds = {}   # (endpoint, stage) -> Histogram
+        self.requests = {}        # (endpoint, status) -> int
+        self.items = {}           # (endpoint, name) -> int
+
+    def observe(self, endpoint, status, timings):
+        with self._lock:
+            self.requests[(endpoint, status)] = self.requests.get((endpoint, status), 0) + 1
+            for name, seconds in timings.stages.items():
+                self.stage_seconds.setdefault((endpoint, name), Histogram()).observe(seconds)
+            for name, value in timings.counts.items():
+                self.items[(endpoint, name)] = self.items.get((endpoint, name), 0) + value
+
+    def reset(self):
+        with self._lock:
+            self.stage_seconds.clear()
+            self.requests.clear()
+            self.items.clear()
+
+    def render(self, extra_counters=()):
+        """
+        Prometheus exposition text.
+        extra_counters: iterable of (metric name, help, value) appended as counters.
+        """
+        lines = [
+            "# HELP task_analyzer_stage_seconds Time spent in each request stage.",
+            "# TYPE task_analyzer_stage_seconds histogram",
+        ]
+        with self._lock:
+            for (endpoint, name), hist in sorted(self.stage_seconds.items()):
+                labels = f'endpoint="{endpoint}",stage="{name}"'
+                for bound, count in zip(BUCKETS, hist.buckets):
+                    lines.append(f'task_analyzer_stage_seconds_bucket{{{labels},le="{bound}"}} {count}')
+                lines.append(f'task_analyzer_stage_seconds_bucket{{{labels},le="+Inf"}} {hist.count}')
+                lines.append(f"task_analyzer_stage_seconds_sum{{{labels}}} {hist.sum:.6f}")
+                lines.append(f"task_analyzer_stage_seconds_count{{{labels}}} {hist.count}")
+
+            lines.append("# HELP task_analyzer_requests_total Instrumented requests.")
+            lines.append("# TYPE task_analyzer_requests_total counter")
+            for (endpoint, status), count in sorted(self.requests.items()):
+                lines.append(f'task_analyzer_requests_total{{endpoint="{endpoint}",status="{status}"}} {count}')
+
+            lines.append("# HELP task_analyzer_items_total Tasks and dependency edges processed.")
+            lines.append("# TYPE task_analyzer_items_total counter")
+            for (endpoint, name), count in sorted(self.items.items()):
+                lines.append(f'task_analyzer_items_total{{endpoint="{endpoint}",kind="{name}"}} {count}')
+
+        for name, help_text, value in extra_counters:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
@@ -0,0 +1,30 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from tasks.precompute import PrecomputeWorker, config, run_once
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-score the persistent task store whenever the date, learned weights or holidays change. "
+        "What-if sessions and cached results live in the server processes, whose own workers "
+        "(TASK_PRECOMPUTE) refresh them. Prints one JSON report per run."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="run once and exit")
+        parser.add_argument("--interval", type=float, default=None, help="seconds between checks")
+
+    def handle(self, *args, **options):
+        if options["once"]:
+            self._report(run_once(local=False))
+            return
+        worker = PrecomputeWorker(options["interval"] or config()["INTERVAL"], on_report=self._report, local=False)
+        try:
+            worker.run_forever()
+        except KeyboardInterrupt:
+            pass
+
+    def _report(self, report):
+        self.stdout.write(json.dumps(report))
@@ -0,0 +1,52 @@
+import json
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.batch import DEFAULT_CHUNK_SIZE, score_batches
+
+
+class Command(BaseCommand):
+    help = (
+        "Score many independent backlogs in parallel. Input is NDJSON, one job per line: "
+        '{"id": ..., "tasks": [...], "weights": {...}, "strategy": "..."}. '
+        "Writes one NDJSON result per job."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("input", help="NDJSON file of jobs, or - for stdin")
+        parser.add_argument("--output", default="-", help="NDJSON results file (default stdout)")
+        parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+        parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="jobs per worker round trip")
+        parser.add_argument("--unordered", action="store_true", help="emit results as they complete")
+
+    def handle(self, *args, **options):
+        source = sys.stdin if options["input"] == "-" else open(options["input"])
+        sink = sys.stdout if options["output"] == "-" else open(options["output"], "w")
+        try:
+            jobs = (self._parse(number, line) for number, line in enumerate(source, 1) if line.strip())
+            start = time.perf_counter()
+            count = 0
+            for result in score_batches(jobs, workers=options["workers"], chunk_size=options["chunk_size"],
+                                        ordered=not options["unordered"]):
+                sink.write(json.dumps(result) + "\n")
+                count += 1
+            elapsed = time.perf_counter() - start
+        finally:
+            if source is not sys.stdin:
+                source.close()
+            if sink is not sys.stdout:
+                sink.close()
+
+        rate = count / elapsed if elapsed else 0.0
+        self.stderr.write(f"Scored {count} backlogs in {elapsed:.2f}s ({rate:.1f}/s)")
+
+    def _parse(self, number, line):
+        try:
+            job = json.loads(line)
+        except ValueError:
+            raise CommandError(f"line {number}: invalid JSON")
+        if not isinstance(job, dict):
+            raise CommandError(f"line {number}: expected a JSON object")
+        return job
@@ -0,0 +1,124 @@
+import cProfile
+import os
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.middleware.gzip import GZipMiddleware
+
+from . import instrumentation
+
+
+class StreamingGZipMiddleware(GZipMiddleware):
+    """
+    GZipMiddleware that leaves NDJSON streams (analyze/stream/) alone: its
+    compressor buffers output, which would hold scored lines back.
+    """
+
+    UNCOMPRESSED_STREAMS = ("application/x-ndjson",)
+
+    def process_response(self, request, response):
+        content_type = response.get("Content-Type", "").split(";")[0].strip()
+        if response.streaming and content_type in self.UNCOMPRESSED_STREAMS:
+            return response
+        return super().process_response(request, response)
+
+
+class TimingMiddleware:
+    """
+    Times /api/tasks/ requests stage by stage (see tasks.instrumentation).
+
+    settings.TASK_INSTRUMENTATION  adds a Server-Timing header and feeds
+                                   the metrics endpoint
+    settings.TASK_PROFILING        lets a request opt into a cProfile dump
+                                   with ?profile=1 or an X-Profile: 1 header;
+                                   the .prof file goes to TASK_PROFILE_DIR and
+                                   its path is returned in X-Profile-Dump
+    With both off the middleware unloads itself at startup.
+    """
+
+    PREFIX = "/api/tasks/"
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, "TASK_INSTRUMENTATION", False)
+        self.profiling = getattr(settings, "TASK_PROFILING", False)
+        if not (self.enabled or self.profiling):
+            raise MiddlewareNotUsed()
+        # Under ASGI stay async so async views aren't pushed onto a thread
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not request.path.startswith(self.PREFIX):
+            return self.get_response(request)
+
+        profiler, timings, token, start = self._begin(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            self._end(profiler, token)
+        return self._finish(request, response, profiler, timings, start)
+
+    async def __acall__(self, request):
+        if not request.path.startswith(self.PREFIX):
+            return await self.get_response(request)
+
+        profiler, timings, token, start = self._begin(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            self._end(profiler, token)
+        return self._finish(request, response, profiler, timings, start)
+
+    def _begin(self, request):
+        profiler = None
+        if self.profiling and (request.GET.get("profile") == "1" or request.headers.get("X-Profile") == "1"):
+            profiler = cProfile.Profile()
+
+        timings, token = instrumentation.begin()
+        start = time.perf_counter()
+        if profiler is not None:
+            profiler.enable()
+        return profiler, timings, token, start
+
+    def _end(self, profiler, token):
+        try:
+            if profiler is not None:
+                profiler.disable()
+        finally:
+            instrumentation.end(token)
+
+    def _finish(self, request, response, profiler, timings, start):
+        timings.add("total", time.perf_counter() - start)
+
+        if self.enabled:
+            response["Server-Timing"] = timings.server_timing()
+            match = request.resolver_match
+            endpoint = match.url_name if match and match.url_name else "other"
+            instrumentation.metrics.observe(endpoint, response.status_code, timings)
+        if profiler is not None:
+            response["X-Profile-Dump"] = self._dump(profiler, request)
+        return response
+
+    def process_template_response(self, request, response):
+        """Time DRF rendering, which happens after the view returns."""
+        if instrumentation.active():
+            render = instrumentation.stage("render")
+            render.__enter__()
+            response.add_post_render_callback(lambda r: render.__exit__(None, None, None))
+        return response
+
+    def _dump(self, profiler, request):
+        directory = getattr(settings, "TASK_PROFILE_DIR", os.path.join(settings.BASE_DIR, "profiles"))
+        os.makedirs(directory, exist_ok=True)
+        slug = request.path.strip("/").replace("/", "-") or "root"
+        path = os.path.join(directory, f"{time.strftime('%Y%m%d-%H%M%S')}-{slug}-{os.getpid()}.prof")
+        profiler.dump_stats(path)
+        return path
@@ -0,0 +1,47 @@
+# Generated by Django 4.2.30 on 2026-10-16 23:12
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Task',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task_id', models.CharField(max_length=255, unique=True)),
+                ('title', models.CharField(max_length=500)),
+                ('due_date', models.DateField(blank=True, db_index=True, null=True)),
+                ('estimated_hours', models.FloatField(default=1.0)),
+                ('importance', models.IntegerField(default=5)),
+                ('input_hash', models.CharField(max_length=32)),
+                ('score', models.FloatField(db_index=True, default=0.0)),
+                ('matrix', models.CharField(blank=True, max_length=16)),
+                ('reason', models.TextField(blank=True)),
+                ('scored_with', models.CharField(blank=True, db_index=True, max_length=32)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='TaskDependency',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('depends_on', models.CharField(db_index=True, max_length=255)),
+                ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='dependency_edges', to='tasks.task')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['matrix', '-score'], name='tasks_task_matrix_score'),
+        ),
+        migrations.AddConstraint(
+            model_name='taskdependency',
+            constraint=models.UniqueConstraint(fields=('task', 'depends_on'), name='tasks_dependency_unique'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.30 on 2026-10-16 23:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TenantWeights',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tenant_id', models.CharField(max_length=255, unique=True)),
+                ('urgency_weight', models.FloatField(default=1.0)),
+                ('importance_weight', models.FloatField(default=1.0)),
+                ('effort_weight', models.FloatField(default=1.0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
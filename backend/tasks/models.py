@@ -0,0 +1,55 @@
+from django.db import models
+
+
+class Task(models.Model):
+    """
+    A task kept between requests, with its last computed score.
+    `input_hash` covers the scoring inputs and `scored_with` the scoring
+    context (weights, holidays, date), so only rows where either changed
+    need to be re-scored.
+    """
+    task_id = models.CharField(max_length=255, unique=True)
+    title = models.CharField(max_length=500)
+    due_date = models.DateField(null=True, blank=True, db_index=True)
+    estimated_hours = models.FloatField(default=1.0)
+    importance = models.IntegerField(default=5)
+    input_hash = models.CharField(max_length=32)
+
+    score = models.FloatField(default=0.0, db_index=True)
+    matrix = models.CharField(max_length=16, blank=True)
+    reason = models.TextField(blank=True)
+    scored_with = models.CharField(max_length=32, blank=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["matrix", "-score"], name="tasks_task_matrix_score"),
+        ]
+
+    def __str__(self):
+        return f"{self.task_id}: {self.title}"
+
+
+class TaskDependency(models.Model):
+    """Edge task -> depends_on. depends_on is a client id and may not be stored."""
+    task = models.ForeignKey(Task, related_name="dependency_edges", on_delete=models.CASCADE)
+    depends_on = models.CharField(max_length=255, db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["task", "depends_on"], name="tasks_dependency_unique"),
+        ]
+
+    def __str__(self):
+        return f"{self.task_id} -> {self.depends_on}"
+
+
+class TenantWeights(models.Model):
+    """Learned scoring weights of one tenant (or user); see tasks/tenants.py."""
+    tenant_id = models.CharField(max_length=255, unique=True)
+    urgency_weight = models.FloatField(default=1.0)
+    importance_weight = models.FloatField(default=1.0)
+    effort_weight = models.FloatField(default=1.0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.tenant_id}: {self.urgency_weight}/{self.importance_weight}/{self.effort_weight}"
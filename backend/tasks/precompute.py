@@ -0,0 +1,290 @@
+"""
+Background precomputation: refresh rankings before anyone asks for them.
+
+Scores depend on today's date, the (tenants') learned weights and the holiday
+calendars (default region + HOLIDAYS). When any of those changes, every
+cached result and stored score is stale and the next request for each
+backlog pays a full recompute. The PrecomputeWorker polls that context
+(every TASK_PRECOMPUTE["INTERVAL"] seconds, and just after midnight) and,
+when it changed:
+
+- re-scores the persistent task store (store.refresh_stale_scores),
+- recomputes open what-if sessions for the new day,
+- replays recently computed analyze / suggest requests (per tenant), so the result
+  cache already holds their answers under the new context.
+
+Each run produces a report with per-job counts and timings. With
+TASK_PRECOMPUTE["ENABLED"] on, each server process starts its own worker
+as a daemon thread on its first request (the default result cache and
+what-if sessions are per process), so pre-forking servers such as
+`gunicorn --preload` get one live thread per worker process. Those
+threads only act on changes, not at startup, and leave the shared
+persistent store to `python manage.py precompute` unless
+REFRESH_STORE is set. Requests are only remembered for replay while
+ENABLED is on. The management command runs in a process of its own, with
+no sessions or cached results to refresh, so it only re-scores the store.
+"""
+import datetime
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.signals import request_started
+from django.db import DatabaseError
+from django.dispatch import receiver
+from django.http import QueryDict
+
+from .calendars import data_fingerprint
+from .cache import seconds_until_midnight
+from .renderers import loads
+from .scoring import get_calendar
+from .tenants import get_tenant_store
+from .weights import load_user_weights
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONFIG = {
+    "ENABLED": False,                # in-process worker threads (opt-in)
+    "REFRESH_STORE": False,          # ... also re-score the shared persistent store
+    "INTERVAL": 30,                  # seconds between context checks
+    "MAX_RECENT": 128,               # requests remembered for replay
+    "MAX_BYTES": 32 * 1024 * 1024,   # ... and their total body size
+}
+
+# Run this long after midnight, so "today" has certainly changed everywhere
+MIDNIGHT_DELAY = 5
+
+
+def config():
+    return {**DEFAULT_CONFIG, **getattr(settings, "TASK_PRECOMPUTE", {})}
+
+
+def scoring_context():
+    """Everything a cached ranking depends on besides the request itself."""
+    return (
+        datetime.date.today(),
+        (tuple(sorted(load_user_weights().items())), get_tenant_store().version),
+        get_calendar().fingerprint,
+        data_fingerprint(),
+    )
+
+
+# --------------------------------------------------------------------
+# Recently computed requests
+# --------------------------------------------------------------------
+class RecentRequests:
+    """LRU of requests worth recomputing, bounded by count and body bytes."""
+
+    def __init__(self, max_entries=128, max_bytes=32 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # (endpoint, request bytes, tenant) -> size
+        self._bytes = 0
+
+    def remember(self, endpoint, request, tenant=None):
+        """request: analyze key material (content type + body) or suggest query string"""
+        size = len(request)
+        if size > self.max_bytes:
+            return
+        key = (endpoint, request, tenant)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return
+            self._entries[key] = size
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted
+
+    def snapshot(self):
+        """Most recently used first."""
+        with self._lock:
+            return list(reversed(self._entries))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+recent_requests = RecentRequests(config()["MAX_RECENT"], config()["MAX_BYTES"])
+
+
+def remember_request(endpoint, request, tenant=None):
+    """Remember a served request for replay, if this process runs a worker (ENABLED)."""
+    if config()["ENABLED"]:
+        recent_requests.remember(endpoint, request, tenant)
+
+
+def replay(endpoint, request, tenant=None):
+    """Recompute one remembered request through the normal service path (fills the result cache)."""
+    from . import services
+    if endpoint == "analyze":
+        content_type, _, body = request.partition(b"\n")
+        if content_type.split(b";")[0].strip() != b"application/json":
+            return None
+        return services.analyze(request, lambda: loads(body) if body else {}, tenant)[1]
+    return services.suggest(request, QueryDict(request), tenant=tenant)[1]
+
+
+# --------------------------------------------------------------------
+# Jobs
+# --------------------------------------------------------------------
+def _timed(report, job, fn):
+    start = time.perf_counter()
+    entry = {"job": job, "count": 0, "errors": 0}
+    try:
+        entry["count"], entry["errors"] = fn()
+    except DatabaseError as exc:   # e.g. store tables not migrated
+        entry["errors"] += 1
+        entry["detail"] = str(exc)
+    entry["seconds"] = round(time.perf_counter() - start, 4)
+    report["jobs"].append(entry)
+
+
+def _refresh_store():
+    from .store import refresh_stale_scores
+    return refresh_stale_scores(), 0
+
+
+def _refresh_sessions():
+    from .whatif import get_registry
+    sessions = get_registry().sessions()
+    for session in sessions:
+        session.refresh()
+    return len(sessions), 0
+
+
+def _warm(endpoint):
+    def run():
+        count = errors = 0
+        for name, request, tenant in recent_requests.snapshot():
+            if name != endpoint:
+                continue
+            status = replay(name, request, tenant)
+            count += 1
+            errors += status is None or status >= 400
+        return count, errors
+    return run
+
+
+def run_once(reason="manual", store=True, local=True):
+    """
+    Refresh everything once; returns the run's report.
+    store: re-score the persistent store
+    local: refresh this process's what-if sessions and warm its result cache
+    """
+    report = {"reason": reason, "day": datetime.date.today().isoformat(), "jobs": []}
+    start = time.perf_counter()
+    if store:
+        _timed(report, "store", _refresh_store)
+    if local:
+        _timed(report, "whatif", _refresh_sessions)
+        _timed(report, "analyze", _warm("analyze"))
+        _timed(report, "suggest", _warm("suggest"))
+    report["seconds"] = round(time.perf_counter() - start, 4)
+    return report
+
+
+# --------------------------------------------------------------------
+# Worker
+# --------------------------------------------------------------------
+def _changes(old, new):
+    names = ("date", "weights", "calendar", "holiday_data")
+    return [name for name, a, b in zip(names, old, new) if a != b]
+
+
+class PrecomputeWorker:
+    """Polls the scoring context and calls run_once() whenever it changes."""
+
+    def __init__(self, interval=DEFAULT_CONFIG["INTERVAL"], on_report=None, store=True, local=True,
+                 run_at_startup=True):
+        """
+        store, local: what run_once refreshes
+        run_at_startup: run on the first check; otherwise it only records the context
+        """
+        self.interval = interval
+        self.on_report = on_report
+        self.store = store
+        self.local = local
+        self.run_at_startup = run_at_startup
+        self.pid = None
+        self.runs = 0
+        self.seconds = 0.0
+        self.last_report = None
+        self._context = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def check(self):
+        """Run once if the context changed since the last check; returns the report or None."""
+        context = scoring_context()
+        if context == self._context:
+            return None
+        first = self._context is None
+        reason = ["startup"] if first else _changes(self._context, context)
+        self._context = context
+        if first and not self.run_at_startup:
+            return None
+        report = run_once(",".join(reason), self.store, self.local)
+        self.runs += 1
+        self.seconds += report["seconds"]
+        self.last_report = report
+        logger.info("precompute %s", report)
+        if self.on_report:
+            self.on_report(report)
+        return report
+
+    def _wait(self):
+        return min(self.interval, seconds_until_midnight() + MIDNIGHT_DELAY)
+
+    def run_forever(self):
+        while not self._stop.is_set():
+            try:
+                self.check()
+            except Exception:
+                logger.exception("precompute run failed")
+            self._stop.wait(self._wait())
+
+    def start(self):
+        self.pid = os.getpid()
+        self._thread = threading.Thread(target=self.run_forever, name="task-precompute", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+
+worker = None
+_worker_lock = threading.Lock()
+
+
+def start_background_worker():
+    """
+    Start this process's worker thread once (no-op when TASK_PRECOMPUTE["ENABLED"] is off).
+    A worker inherited through fork has no thread in the child, so it is replaced.
+    """
+    global worker
+    cfg = config()
+    if not cfg["ENABLED"]:
+        return None
+    pid = os.getpid()
+    if worker is not None and worker.pid == pid:
+        return worker
+    with _worker_lock:
+        if worker is None or worker.pid != pid:
+            worker = PrecomputeWorker(cfg["INTERVAL"], store=cfg["REFRESH_STORE"], run_at_startup=False).start()
+    return worker
+
+
+@receiver(request_started)
+def _start_on_first_request(**kwargs):
+    start_background_worker()
@@ -0,0 +1,68 @@
+"""
+Compact scored-task record used inside the scoring pipeline.
+
+calculate_scores, detect_cycles and the scheduler work on TaskRecord
+objects (fixed slots, interned ids) instead of one output dict per task;
+the JSON-ready dict, and the explanation string only when asked for, are
+built by to_dict() at the serialization boundary.
+"""
+import sys
+
+_intern = sys.intern
+
+
+def build_reason(urgency_score, importance, est_hours, effort_score, matrix, deps):
+    """Short human-readable explanation of a task's score."""
+    reason_parts = []
+    reason_parts.append(f"Urgency: {round(urgency_score,2)}")
+    reason_parts.append(f"Importance: {importance}")
+    reason_parts.append(f"Effort: {est_hours}h (quick-win={round(effort_score,2)})")
+    reason_parts.append(f"Matrix: {matrix}")
+    if deps:
+        reason_parts.append(f"Depends on: {', '.join(deps)}")
+    return " | ".join(reason_parts)
+
+
+class TaskRecord:
+    __slots__ = ("id", "title", "due_date", "estimated_hours", "importance",
+                 "dependencies", "score", "matrix", "urgency", "effort")
+
+    def __init__(self, id, title, due_date, estimated_hours, importance, dependencies,
+                 score, matrix, urgency, effort):
+        self.id = _intern(id) if type(id) is str else id
+        self.title = title
+        self.due_date = due_date
+        self.estimated_hours = estimated_hours
+        self.importance = importance
+        self.dependencies = dependencies
+        self.score = score
+        self.matrix = matrix
+        self.urgency = urgency
+        self.effort = effort
+
+    def reason(self):
+        return build_reason(self.urgency, self.importance, self.estimated_hours, self.effort,
+                            self.matrix, self.dependencies)
+
+    def to_dict(self, explain=True):
+        """The task as returned by the API; "reason" only with explain."""
+        out = {
+            "id": self.id,
+            "title": self.title,
+            "due_date": self.due_date,
+            "estimated_hours": self.estimated_hours,
+            "importance": self.importance,
+            "dependencies": self.dependencies,
+            "score": self.score,
+        }
+        if explain:
+            out["reason"] = self.reason()
+        out["matrix"] = self.matrix
+        return out
+
+    def __repr__(self):
+        return f"TaskRecord(id={self.id!r}, score={self.score!r})"
+
+
+def to_dicts(records, explain=True):
+    return [r.to_dict(explain) for r in records]
@@ -0,0 +1,74 @@
+"""
+JSON encoding and decoding for the task API.
+
+orjson, when installed, serializes a 100k-task analyze response several
+times faster than the stdlib encoder and writes UTF-8 bytes directly;
+without it everything falls back to the json module with the same
+output. FastJSONRenderer / FastJSONParser plug this into DRF (see
+REST_FRAMEWORK in settings); dumps / loads are used by the async views
+and the NDJSON streaming endpoint.
+"""
+import json
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; the stdlib json module is used instead
+    orjson = None
+
+HAS_ORJSON = orjson is not None
+
+_encoder = JSONEncoder()
+
+
+def _default(obj):
+    # Decimal, lazy translation strings, UUIDs, ... as DRF's encoder would
+    return _encoder.default(obj)
+
+
+def dumps(obj, sort_keys=False):
+    """Compact UTF-8 JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_SORT_KEYS if sort_keys else None)
+    return json.dumps(obj, cls=JSONEncoder, ensure_ascii=False, separators=(",", ":"),
+                      sort_keys=sort_keys).encode()
+
+
+def loads(data):
+    """Parse JSON from bytes or str; raises ValueError on malformed input."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer backed by orjson; pretty-printed requests (?indent) use the stock path."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if orjson is None or self.get_indent(accepted_media_type or "", renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        return orjson.dumps(data, default=_default)
+
+
+class FastJSONParser(JSONParser):
+    """JSONParser backed by orjson."""
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        try:
+            data = stream.read()
+            if encoding.lower().replace("-", "") != "utf8":
+                data = data.decode(encoding)
+            return orjson.loads(data)
+        except ValueError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
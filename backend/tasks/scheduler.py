@@ -0,0 +1,128 @@
+"""
+Dependency-aware, capacity-constrained scheduling.
+
+Tasks are scored with rank_tasks, then released in topological
+order: among the tasks whose dependencies are all done, the highest
+score (ties in ranking order) goes next. Each task's hours are packed
+into working days of `hours_per_day` (weekends and holidays of the
+chosen calendar skipped), spilling over into following days when needed.
+O((V + E) log V) overall, plus one step per planned day; a plan may
+span at most MAX_DAYS working days.
+"""
+import datetime
+import heapq
+
+from .instrumentation import stage
+from .scoring import get_calendar, rank_tasks
+
+MAX_DAYS = 5000   # about twenty years of working days
+
+
+class ScheduleTooLong(ValueError):
+    pass
+
+
+def next_working_day(d, calendar=None):
+    """d itself if it is a working day, else the first working day after it."""
+    calendar = calendar or get_calendar()
+    while not calendar.is_working_day(d):
+        d += datetime.timedelta(days=1)
+    return d
+
+
+def build_schedule(tasks, hours_per_day=8.0, start=None, weights=None, strategy=None, calendar=None):
+    """
+    tasks: validated task dicts, each with a unique id
+    returns: {
+        "days": [{"date", "hours", "tasks": [{"id", "hours"}]}],
+        "tasks": [{"id", "title", "score", "hours", "start", "end"}] in execution order,
+        "unscheduled": [{"id", "reason": "cycle" | "blocked"}],
+        "cycles": [...],
+        "missing_dependencies": {task id: [unknown dependency ids]},
+    }
+    Raises ScheduleTooLong when the plan would need more than MAX_DAYS
+    working days, or run past the last representable date.
+    """
+    calendar = get_calendar(calendar)
+    result = rank_tasks(tasks, weights=weights, strategy=strategy, calendar=calendar)
+    # Days are packed back to back, so the total fixes their number up front
+    hours = sum(t.estimated_hours for t in result["tasks"])
+    if not hours <= hours_per_day * MAX_DAYS:
+        raise ScheduleTooLong(f"tasks need more than {MAX_DAYS} working days at {hours_per_day:g} hours per day")
+    with stage("schedule"):
+        try:
+            return _plan(result, hours_per_day, start, calendar)
+        except OverflowError:
+            raise ScheduleTooLong("schedule runs past the last supported date")
+
+
+def _plan(result, hours_per_day, start, calendar):
+    ranked = result["tasks"]
+    rank = {t.id: i for i, t in enumerate(ranked)}
+    dependents = [[] for _ in ranked]
+    waiting = [0] * len(ranked)
+    missing = {}
+    get = rank.get
+    # A repeated dependency is counted (and later released) once per edge
+    for i, t in enumerate(ranked):
+        for dep in t.dependencies:
+            j = get(dep)
+            if j is None:
+                missing.setdefault(t.id, []).append(dep)
+                continue
+            dependents[j].append(i)
+            waiting[i] += 1
+
+    # Rank already encodes (score desc, ties in input order)
+    ready = [i for i, n in enumerate(waiting) if n == 0]
+    heapq.heapify(ready)
+
+    day = next_working_day(start or datetime.date.today(), calendar)
+    left = hours_per_day
+    days = [{"date": day.isoformat(), "hours": 0.0, "tasks": []}]
+    planned = []
+
+    while ready:
+        i = heapq.heappop(ready)
+        t = ranked[i]
+        remaining = t.estimated_hours
+        first_day = None
+        while True:
+            if left <= 0 and remaining > 0:
+                day = next_working_day(day + datetime.timedelta(days=1), calendar)
+                left = hours_per_day
+                days.append({"date": day.isoformat(), "hours": 0.0, "tasks": []})
+            chunk = min(remaining, left)
+            days[-1]["tasks"].append({"id": t.id, "hours": chunk})
+            days[-1]["hours"] += chunk
+            first_day = first_day or day
+            left -= chunk
+            remaining -= chunk
+            if remaining <= 0:
+                break
+        planned.append({
+            "id": t.id,
+            "title": t.title,
+            "score": t.score,
+            "hours": t.estimated_hours,
+            "start": first_day.isoformat(),
+            "end": day.isoformat(),
+        })
+        for j in dependents[i]:
+            waiting[j] -= 1
+            if waiting[j] == 0:
+                heapq.heappush(ready, j)
+
+    on_cycle = {tid for cycle in result["cycles"] for tid in cycle}
+    unscheduled = [
+        {"id": t.id, "reason": "cycle" if t.id in on_cycle else "blocked"}
+        for i, t in enumerate(ranked) if waiting[i] > 0
+    ]
+
+    return {
+        "days": [d for d in days if d["tasks"]],
+        "tasks": planned,
+        "unscheduled": unscheduled,
+        "cycles": result["cycles"],
+        "missing_dependencies": missing,
+    }
@@ -1,53 +1,63 @@
 import datetime
-import json
-import os
+import heapq
 from collections import defaultdict, deque
 
-# --------------------------------------------------------------------
-# Weights file for learning system
-# --------------------------------------------------------------------
-WEIGHTS_FILE = os.path.join(os.path.dirname(__file__), "user_weights.json")
-
-
-def load_user_weights():
-    """Load user-tuned weights, or fall back to defaults."""
-    if os.path.exists(WEIGHTS_FILE):
-        try:
-            with open(WEIGHTS_FILE, "r") as f:
-                data = json.load(f)
-                return {
-                    "urgency_weight": float(data.get("urgency_weight", 1.0)),
-                    "importance_weight": float(data.get("importance_weight", 1.0)),
-                    "effort_weight": float(data.get("effort_weight", 1.0)),
-                }
-        except Exception:
-            pass
-    return {
-        "urgency_weight": 1.0,
-        "importance_weight": 1.0,
-        "effort_weight": 1.0,
-    }
-
+from . import calendars
+from .calendars import BusinessCalendar, UnknownCalendar  # noqa: F401 (re-exported)
+from .instrumentation import stage
+from .records import TaskRecord, build_reason, to_dicts  # noqa: F401 (build_reason re-exported)
+from .weights import WEIGHTS_FILE, load_user_weights  # noqa: F401 (re-exported)
 
 # --------------------------------------------------------------------
-# Date intelligence: weekends + holidays
+# Date intelligence: weekends + holidays (tasks/calendars.py)
 # --------------------------------------------------------------------
-HOLIDAYS = {
-    # Example fixed holidays – adjust to your country as needed
-    "2025-01-01",  # New Year
-    "2025-01-26",  # Republic Day (India)
-    "2025-08-15",  # Independence Day
-    "2025-10-02",  # Gandhi Jayanti
-    "2025-12-25",  # Christmas
-}
+# Region whose calendar (tasks/holidays/<region>.json) is used when a
+# request doesn't name one; settings.TASK_DEFAULT_CALENDAR overrides it.
+DEFAULT_CALENDAR = "IN"
+
+# Extra one-off "YYYY-MM-DD" holidays added to the default calendar
+HOLIDAYS = set()
 
 
 def is_weekend(d: datetime.date) -> bool:
     return d.weekday() >= 5  # Saturday (5), Sunday (6)
 
 
+def default_region():
+    from django.conf import settings
+    if settings.configured:
+        return getattr(settings, "TASK_DEFAULT_CALENDAR", DEFAULT_CALENDAR)
+    return DEFAULT_CALENDAR
+
+
+_default = None   # (region, year, HOLIDAYS snapshot, calendar)
+
+
+def get_calendar(name=None) -> BusinessCalendar:
+    """
+    Compiled calendar for a region code (default: the default region plus
+    HOLIDAYS). A BusinessCalendar is returned as is.
+    Raises UnknownCalendar for regions without a data file.
+    """
+    global _default
+    if isinstance(name, BusinessCalendar):
+        return name
+    region = default_region()
+    if name is not None and name != region:
+        if not isinstance(name, str):
+            raise UnknownCalendar(name)
+        return calendars.registry.get(name)
+
+    year = datetime.date.today().year
+    cached = _default
+    if cached is None or cached[0] != region or cached[1] != year or cached[2] != HOLIDAYS:
+        extra = frozenset(HOLIDAYS)
+        cached = _default = (region, year, extra, calendars.registry.get(region, extra))
+    return cached[3]
+
+
 def is_holiday(d: datetime.date) -> bool:
-    return d.strftime("%Y-%m-%d") in HOLIDAYS
+    return get_calendar().is_holiday(d)
 
 
 def business_days_between(start: datetime.date, end: datetime.date) -> int:
@@ -55,15 +65,7 @@ def business_days_between(start: datetime.date, end: datetime.date) -> int:
     Count *working* days between start and end (exclusive of start, inclusive of end).
     Weekends and holidays are skipped.
     """
-    if end <= start:
-        return 0
-    days = 0
-    current = start + datetime.timedelta(days=1)
-    while current <= end:
-        if not is_weekend(current) and not is_holiday(current):
-            days += 1
-        current += datetime.timedelta(days=1)
-    return days
+    return get_calendar().business_days_between(start, end)
 
 
 # --------------------------------------------------------------------
@@ -90,65 +92,128 @@ def eisenhower_category(importance: int, urgency_score: float) -> str:
 # --------------------------------------------------------------------
 # Cycle detection in dependency graph
 # --------------------------------------------------------------------
-def detect_cycles(task_list):
+def strongly_connected_components(nodes, graph):
+    """
+    Iterative Tarjan SCC over `graph` (node -> list of successors), starting
+    from each of `nodes` in order. Runs in O(V+E) without recursion.
+    Components are returned in reverse topological order (sinks first).
     """
-    Detects cycles in dependency graph using DFS.
-    Returns list of cycles, each cycle is list of ids.
+    index = {}
+    low = {}
+    on_stack = set()
+    stack = []
+    components = []
+    counter = 0
+
+    for root in nodes:
+        if root in index:
+            continue
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(graph.get(root, ())))]
+
+        while work:
+            node, successors = work[-1]
+            for nei in successors:
+                if nei not in index:
+                    index[nei] = low[nei] = counter
+                    counter += 1
+                    stack.append(nei)
+                    on_stack.add(nei)
+                    work.append((nei, iter(graph.get(nei, ()))))
+                    break
+                if nei in on_stack and index[nei] < low[node]:
+                    low[node] = index[nei]
+            else:
+                # All successors done – pop the frame and propagate lowlink
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    if low[node] < low[parent]:
+                        low[parent] = low[node]
+                if low[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(component)
+
+    return components
+
+
+def analyze_dependencies(task_list):
+    """
+    Find dependency cycles and a schedulable order in one O(V+E) pass.
+    returns: {
+        "cycles": each cyclic SCC once, ids in task-list order,
+        "order": ids of tasks not on a cycle, dependencies before dependents,
+    }
+    task_list holds task dicts or TaskRecords. Dependency ids that are not
+    in task_list are ignored.
     """
     graph = defaultdict(list)
+    position = {}
+    self_loops = set()
     for t in task_list:
-        tid = t["id"]
-        for dep in t.get("dependencies", []):
+        if type(t) is TaskRecord:
+            tid, deps = t.id, t.dependencies
+        else:
+            tid, deps = t["id"], t.get("dependencies")
+        position.setdefault(tid, len(position))
+        for dep in deps or []:
             graph[dep].append(tid)
+            if dep == tid:
+                self_loops.add(tid)
+
+    components = strongly_connected_components(list(position), graph)
 
-    visited = set()
-    stack = set()
     cycles = []
+    order = []
+    # Tarjan emits dependents before their dependencies; walk it backwards
+    for component in reversed(components):
+        if len(component) > 1 or component[0] in self_loops:
+            component.sort(key=position.__getitem__)
+            cycles.append(component)
+        else:
+            order.append(component[0])
+    cycles.sort(key=lambda c: position[c[0]])
 
-    def dfs(node, path):
-        if node in stack:
-            # Found a cycle – take slice from first occurrence of node
-            if node in path:
-                idx = path.index(node)
-                cycles.append(path[idx:] + [node])
-            return
-        if node in visited:
-            return
-
-        visited.add(node)
-        stack.add(node)
-        for nei in graph.get(node, []):
-            dfs(nei, path + [nei])
-        stack.remove(node)
+    return {"cycles": cycles, "order": order}
 
-    for t in task_list:
-        tid = t["id"]
-        if tid not in visited:
-            dfs(tid, [tid])
 
-    # Deduplicate simple cycles
-    unique = []
-    seen = set()
-    for c in cycles:
-        key = tuple(c)
-        if key not in seen:
-            seen.add(key)
-            unique.append(c)
-    return unique
+def detect_cycles(task_list):
+    """
+    Detects cycles in dependency graph (Tarjan SCC, iterative).
+    Returns list of cycles, each cycle is the list of ids in one strongly
+    connected component, reported once.
+    """
+    return analyze_dependencies(task_list)["cycles"]
 
 
 # --------------------------------------------------------------------
 # Main scoring function
 # --------------------------------------------------------------------
-def calculate_scores(tasks, weights=None, strategy=None):
+# Task lists at least this long are scored by the NumPy batch engine
+# (tasks/vectorized.py) when NumPy is installed.
+VECTORIZE_THRESHOLD = 200
+
+
+def resolve_weights(weights=None, strategy=None):
     """
-    tasks: list of validated serializer data (dicts)
-    weights: optional override, else load from user_weights.json
-    strategy: "fastest" | "impact" | "deadline" | "smart" or None
-    returns: {"tasks": [...], "cycles": [...]}
+    Combine explicit (or learned) weights with the strategy bias.
+    returns: (urgency_weight, importance_weight, effort_weight)
     """
     # Use learned weights if not provided explicitly
-    base_weights = weights or load_user_weights()
+    if weights:
+        base_weights = weights
+    else:
+        with stage("weights"):
+            base_weights = load_user_weights()
 
     uw = base_weights.get("urgency_weight", 1.0)
     iw = base_weights.get("importance_weight", 1.0)
@@ -163,100 +228,174 @@ def calculate_scores(tasks, weights=None, strategy=None):
         uw *= 1.5
     # "smart" or None → keep as-is
 
-    now = datetime.date.today()
+    return uw, iw, ew
 
-    scored = []
-    for t in tasks:
-        tid = t["id"]
-        title = t["title"]
-        due_date = t.get("due_date")  # already a date or None (from serializer)
-        est_hours = float(t.get("estimated_hours") or 1.0)
-        importance = int(t.get("importance") or 5)
-        deps = t.get("dependencies") or []
-
-        # ----- Urgency with date intelligence -----
-        if due_date:
-            # assume serializer converted to date; if string, guard:
-            if isinstance(due_date, str):
-                due_date = datetime.date.fromisoformat(due_date)
-            if due_date < now:
-                # overdue
-                days_left = 0
-                overdue = True
-            else:
-                days_left = business_days_between(now, due_date)
-                overdue = False
 
-            # basic urgency: closer deadline → higher urgency
-            # 0 days → 1.0, 10 days → 0.0 approx (clamped)
-            urgency_score = max(0.0, min(1.0, 1.0 - (days_left / 10.0)))
+def task_components(t, now, calendar=None):
+    """
+    Parse one validated task and compute its weight-independent components
+    (calendar: a BusinessCalendar, default get_calendar()).
+    returns: (due_date, est_hours, importance, urgency_score, importance_score, effort_score)
+    """
+    calendar = calendar or get_calendar()
+    due_date = t.get("due_date")  # already a date or None (from serializer)
+    est_hours = float(t.get("estimated_hours") or 1.0)
+    importance = int(t.get("importance") or 5)
+
+    # ----- Urgency with date intelligence -----
+    if due_date:
+        # assume serializer converted to date; if string, guard:
+        if isinstance(due_date, str):
+            due_date = datetime.date.fromisoformat(due_date)
+        if due_date < now:
+            # overdue
+            days_left = 0
+            overdue = True
+        else:
+            days_left = calendar.business_days_between(now, due_date)
+            overdue = False
+
+        # basic urgency: closer deadline → higher urgency
+        # 0 days → 1.0, 10 days → 0.0 approx (clamped)
+        urgency_score = max(0.0, min(1.0, 1.0 - (days_left / 10.0)))
+
+        # weekend / holiday adjustments
+        if calendar.is_weekend(due_date):
+            urgency_score += 0.1  # weekend deadlines are trickier
+        if calendar.is_holiday(due_date):
+            urgency_score += 0.15  # holidays matter more
+
+        if overdue:
+            urgency_score = 1.0  # fully urgent if already past due
+    else:
+        urgency_score = 0.2  # no deadline → mild urgency
+
+    urgency_score = max(0.0, min(1.0, urgency_score))
+
+    # ----- Importance (normalize 1–10 → 0–1) -----
+    importance_score = max(1, min(10, importance)) / 10.0
+
+    # ----- Effort: quick wins priority (smaller hours → higher score) -----
+    # Cap at 12h; more than that is treated as "heavy"
+    capped = min(est_hours, 12.0)
+    effort_score = 1.0 - (capped / 12.0)  # 1h ~0.92, 12h ~0.0
+
+    return due_date, est_hours, importance, urgency_score, importance_score, effort_score
+
+
+def weighted_score(urgency_score, importance_score, effort_score, uw, iw, ew):
+    """Final score with weights, normalized and rounded to 3 places."""
+    score = (
+        uw * urgency_score +
+        iw * importance_score +
+        ew * effort_score
+    )
+
+    # Normalize roughly into 0–1
+    # (weights may increase above 1, so divide by sum of weights)
+    denom = uw + iw + ew if (uw + iw + ew) > 0 else 1.0
+    score = score / denom
+    return round(score, 3)
+
+
+def score_record(t, uw, iw, ew, now, calendar=None):
+    """Score a single validated task dict into a TaskRecord (no explanation built)."""
+    due_date, est_hours, importance, urgency_score, importance_score, effort_score = task_components(t, now, calendar)
+    return TaskRecord(
+        t["id"],
+        t["title"],
+        due_date.isoformat() if isinstance(due_date, datetime.date) else due_date,
+        est_hours,
+        importance,
+        t.get("dependencies") or [],
+        weighted_score(urgency_score, importance_score, effort_score, uw, iw, ew),
+        eisenhower_category(importance, urgency_score),
+        urgency_score,
+        effort_score,
+    )
+
+
+def score_task(t, uw, iw, ew, now, calendar=None):
+    """Score a single validated task dict against resolved weights and today's date."""
+    return score_record(t, uw, iw, ew, now, calendar).to_dict()
+
+
+def rank_tasks(tasks, weights=None, strategy=None, calendar=None):
+    """
+    Score, cycle-check and sort validated tasks, keeping them as TaskRecords.
+    returns: {"tasks": [TaskRecord] by descending score, "cycles": [...]}
+    """
+    calendar = get_calendar(calendar)
+    uw, iw, ew = resolve_weights(weights, strategy)
+    now = datetime.date.today()
 
-            # weekend / holiday adjustments
-            if is_weekend(due_date):
-                urgency_score += 0.1  # weekend deadlines are trickier
-            if is_holiday(due_date):
-                urgency_score += 0.15  # holidays matter more
+    from .vectorized import HAS_NUMPY, score_records_vectorized
 
-            if overdue:
-                urgency_score = 1.0  # fully urgent if already past due
+    with stage("score"):
+        if HAS_NUMPY and len(tasks) >= VECTORIZE_THRESHOLD:
+            records = score_records_vectorized(tasks, uw, iw, ew, now, calendar)
         else:
-            urgency_score = 0.2  # no deadline → mild urgency
-
-        urgency_score = max(0.0, min(1.0, urgency_score))
-
-        # ----- Importance (normalize 1–10 → 0–1) -----
-        importance_score = max(1, min(10, importance)) / 10.0
-
-        # ----- Effort: quick wins priority (smaller hours → higher score) -----
-        # Cap at 12h; more than that is treated as "heavy"
-        capped = min(est_hours, 12.0)
-        effort_score = 1.0 - (capped / 12.0)  # 1h ~0.92, 12h ~0.0
-
-        # ----- Final score with weights -----
-        score = (
-            uw * urgency_score +
-            iw * importance_score +
-            ew * effort_score
-        )
-
-        # Normalize roughly into 0–1
-        # (weights may increase above 1, so divide by sum of weights)
-        denom = uw + iw + ew if (uw + iw + ew) > 0 else 1.0
-        score = score / denom
-        score = round(score, 3)
-
-        # Eisenhower category
-        matrix = eisenhower_category(importance, urgency_score)
-
-        # Reason string (short explanation)
-        reason_parts = []
-        reason_parts.append(f"Urgency: {round(urgency_score,2)}")
-        reason_parts.append(f"Importance: {importance}")
-        reason_parts.append(f"Effort: {est_hours}h (quick-win={round(effort_score,2)})")
-        reason_parts.append(f"Matrix: {matrix}")
-        if deps:
-            reason_parts.append(f"Depends on: {', '.join(deps)}")
-        reason = " | ".join(reason_parts)
-
-        scored.append({
-            "id": tid,
-            "title": title,
-            "due_date": due_date.isoformat() if isinstance(due_date, datetime.date) else due_date,
-            "estimated_hours": est_hours,
-            "importance": importance,
-            "dependencies": deps,
-            "score": score,
-            "reason": reason,
-            "matrix": matrix,
-        })
+            records = [score_record(t, uw, iw, ew, now, calendar) for t in tasks]
 
     # Detect cycles
-    cycles = detect_cycles(scored)
+    with stage("cycles"):
+        cycles = detect_cycles(records)
 
     # Sort descending by score
-    scored.sort(key=lambda x: x["score"], reverse=True)
+    with stage("sort"):
+        records.sort(key=lambda r: r.score, reverse=True)
+
+    return {
+        "tasks": records,
+        "cycles": cycles,
+    }
+
+
+def calculate_scores(tasks, weights=None, strategy=None, calendar=None, explain=True):
+    """
+    tasks: list of validated serializer data (dicts)
+    weights: optional override, else load from user_weights.json
+    strategy: "fastest" | "impact" | "deadline" | "smart" or None
+    calendar: region code (see tasks/holidays/) or BusinessCalendar, else the default
+    explain: include the human-readable "reason" for each task
+    returns: {"tasks": [...], "cycles": [...]}
+
+    Large task lists go through the NumPy batch engine, which produces
+    exactly the same output as the per-task loop.
+    """
+    result = rank_tasks(tasks, weights=weights, strategy=strategy, calendar=calendar)
+    with stage("serialize"):
+        result["tasks"] = to_dicts(result["tasks"], explain)
+    return result
+
+
+def top_k_scores(tasks, k=3, weights=None, strategy=None, calendar=None):
+    """
+    The first `k` entries of calculate_scores(...)["tasks"], ties included,
+    without building an explanation for every task.
+    Scores are selected with a bounded heap (or a partial selection on the
+    NumPy score array for large lists); only the winners are fully scored.
+    returns: {"tasks": [...], "cycles": [...]}
+    """
+    calendar = get_calendar(calendar)
+    uw, iw, ew = resolve_weights(weights, strategy)
+    now = datetime.date.today()
+
+    from .vectorized import HAS_NUMPY, top_k_indices
+
+    with stage("score"):
+        if HAS_NUMPY and len(tasks) >= VECTORIZE_THRESHOLD:
+            winners = top_k_indices(tasks, k, uw, iw, ew, now, calendar)
+        else:
+            scores = [weighted_score(*task_components(t, now, calendar)[3:], uw, iw, ew) for t in tasks]
+            # nlargest is documented as sorted(..., reverse=True)[:k], so ties keep input order
+            winners = heapq.nlargest(k, range(len(tasks)), key=scores.__getitem__)
+        top = [score_task(tasks[i], uw, iw, ew, now, calendar) for i in winners]
+
+    with stage("cycles"):
+        cycles = detect_cycles(tasks)
 
     return {
-        "tasks": scored,
+        "tasks": top,
         "cycles": cycles,
     }
@@ -1,6 +1,7 @@
 from rest_framework import serializers
-from datetime import datetime
+from datetime import date, datetime
 from dateutil.parser import parse as parse_date
+from sys import intern
 
 class TaskInputSerializer(serializers.Serializer):
     id = serializers.CharField(required=False)  # optional client-provided id
@@ -32,3 +33,125 @@ class TaskInputSerializer(serializers.Serializer):
         if value <= 0:
             raise serializers.ValidationError("estimated_hours must be positive")
         return value
+
+
+###############################################################################
+# BULK VALIDATION
+###############################################################################
+
+def _clean_str(value):
+    """Stripped string if CharField would accept it as-is, else None."""
+    if type(value) is not str:
+        return None
+    value = value.strip()
+    if "\x00" in value:
+        return None
+    if not value.isascii():
+        try:
+            value.encode("utf-8")  # rejects surrogates, like the DRF validator
+        except UnicodeEncodeError:
+            return None
+    return value
+
+
+def _fast_validate(t):
+    """
+    Validate one task the way TaskInputSerializer would, for plain JSON input.
+    Returns the validated dict, or None when the task needs the full
+    serializer (unusual types, anything invalid, non-ISO dates).
+    """
+    if type(t) is not dict:
+        return None
+    out = {}
+
+    if "id" in t:
+        tid = _clean_str(t["id"])
+        if not tid:
+            return None
+        out["id"] = intern(tid)
+
+    title = _clean_str(t.get("title"))
+    if not title:
+        return None
+    out["title"] = title
+
+    if "due_date" in t:
+        value = t["due_date"]
+        if value is not None:
+            value = _clean_str(value)
+            if value is None:
+                return None
+            if value:
+                # Strict YYYY-MM-DD only; everything else goes through dateutil
+                if len(value) != 10 or value[4] != "-" or value[7] != "-":
+                    return None
+                try:
+                    date.fromisoformat(value)
+                except ValueError:
+                    return None
+        out["due_date"] = value or None
+
+    if "estimated_hours" in t:
+        hours = t["estimated_hours"]
+        if type(hours) is int:
+            try:
+                hours = float(hours)
+            except OverflowError:
+                return None
+        elif type(hours) is not float:
+            return None
+        if hours <= 0:
+            return None
+        out["estimated_hours"] = hours
+
+    if "importance" in t:
+        importance = t["importance"]
+        if type(importance) is not int or not (1 <= importance <= 10):
+            return None
+        out["importance"] = importance
+
+    if "dependencies" in t:
+        deps = t["dependencies"]
+        if type(deps) is not list:
+            return None
+        cleaned = []
+        for dep in deps:
+            dep = _clean_str(dep)
+            if not dep:
+                return None
+            cleaned.append(intern(dep))
+        out["dependencies"] = cleaned
+
+    return out
+
+
+def validate_task(t):
+    """
+    Validate one task: fast path first, TaskInputSerializer otherwise.
+    returns: (validated_data, None) or (None, errors)
+    """
+    data = _fast_validate(t)
+    if data is not None:
+        return data, None
+    s = TaskInputSerializer(data=t)
+    if s.is_valid():
+        return s.validated_data, None
+    return None, s.errors
+
+
+def validate_tasks(tasks):
+    """
+    Validate a whole task list in one pass.
+    Well-formed tasks take a fast path; any task it can't vouch for is run
+    through TaskInputSerializer, so error messages are unchanged.
+    returns: (validated, errors) with errors as [{"index": i, "errors": {...}}]
+    """
+    validated = []
+    errors = []
+    for i, t in enumerate(tasks):
+        data, task_errors = validate_task(t)
+        if task_errors is None:
+            validated.append(data)
+        else:
+            errors.append({'index': i, 'errors': task_errors})
+    return validated, errors
@@ -0,0 +1,609 @@
+"""
+Request handling shared by the sync (DRF) views and the async views.
+
+Each function takes already-extracted request data, does all the
+CPU-bound work (parsing, validation, scoring) and returns
+(body, status code), leaving only response construction to the view.
+"""
+import datetime
+
+from django.utils.http import parse_etags
+from rest_framework import status
+
+from .backlogs import backlog_handle, get_backlog_store
+from .cache import get_result_cache, result_key, result_size
+from .dynamic_graph import MODES as GRAPH_MODES
+from .dynamic_graph import DynamicGraph
+from .dynamic_graph import get_registry as get_graph_registry
+from .graph import analyze_graph, subgraph
+from .indexes import InvalidView, RankedIndex, View
+from .instrumentation import active, record_count, stage
+from .precompute import remember_request
+from .scoring import UnknownCalendar, calculate_scores, get_calendar, top_k_scores
+from .records import to_dicts
+from .renderers import loads
+from .scheduler import ScheduleTooLong, build_schedule
+from .serializers import validate_tasks
+from .store import ranked_tasks, sync_tasks
+from .tenants import InvalidTenant, clean_tenant, get_tenant_store, learned_weights
+from .weights import weight_store
+from .whatif import WhatIfSession
+from .whatif import get_registry as get_whatif_registry
+
+SUGGEST_DEFAULT_K = 3
+GRAPH_MAX_LIMIT = 2000
+STORE_MAX_LIMIT = 500
+
+
+def count_items(validated):
+    """Record task / dependency-edge counts for the current request's metrics."""
+    if active():
+        record_count("tasks", len(validated))
+        record_count("edges", sum(len(t.get("dependencies") or ()) for t in validated))
+
+
+def validation_error(errors):
+    return {'detail': 'validation_error', 'errors': errors}, status.HTTP_400_BAD_REQUEST
+
+
+def flag(value):
+    """Truthy JSON value or query parameter ("1", "true", "yes")."""
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes")
+    return bool(value)
+
+
+def weights_error(weights):
+    """Error response for a weights override that is not an object of numbers, else None."""
+    if weights is None:
+        return None
+    if not isinstance(weights, dict) or not all(
+            isinstance(v, (int, float)) and not isinstance(v, bool) for v in weights.values()):
+        return {"detail": "weights must be an object of numbers"}, status.HTTP_400_BAD_REQUEST
+    return None
+
+
+def resolve_calendar(name):
+    """returns: (BusinessCalendar, None) or (None, error response)"""
+    try:
+        return get_calendar(name), None
+    except UnknownCalendar:
+        return None, ({"detail": f"unknown calendar {name!r}"}, status.HTTP_400_BAD_REQUEST)
+
+
+def require_ids(validated):
+    """Errors for validated tasks that have no id (endpoints that key by id)."""
+    return [{'index': i, 'errors': {'id': ['This field is required.']}}
+            for i, t in enumerate(validated) if not t.get('id')]
+
+
+def duplicate_ids(validated):
+    """Errors for tasks repeating an earlier task's id (endpoints that need unique ids)."""
+    seen = set()
+    errors = []
+    for i, t in enumerate(validated):
+        if t['id'] in seen:
+            errors.append({'index': i, 'errors': {'id': ['Duplicate id.']}})
+        seen.add(t['id'])
+    return errors
+
+
+def resolve_tenant(header, param=None):
+    """returns: (tenant id or None, None) or (None, error response)"""
+    try:
+        return clean_tenant(header) or clean_tenant(param), None
+    except InvalidTenant:
+        return None, ({"detail": "invalid tenant"}, status.HTTP_400_BAD_REQUEST)
+
+
+def resolve_view(params):
+    """returns: (indexes.View or None, None) or (None, error response)"""
+    try:
+        return View.from_params(params), None
+    except InvalidView as exc:
+        return None, ({"detail": str(exc)}, status.HTTP_400_BAD_REQUEST)
+
+
+def ranked_page(cache, key, result, view):
+    """One filtered page of a ranking, through its cached RankedIndex."""
+    index_key = key + ':index'
+    with stage("cache"):
+        index = cache.get(index_key)
+    if index is None:
+        with stage("index"):
+            index = RankedIndex(result['tasks'])
+        cache.set(index_key, index, size=len(index) * 16)
+    with stage("page"):
+        ranks, next_cursor, count = index.page(view)
+        tasks = result['tasks']
+        return {**result, 'tasks': [tasks[r] for r in ranks], 'count': count, 'next_cursor': next_cursor}
+
+
+def analyze(key_material, load_payload, tenant=None, view=None):
+    """
+    key_material: bytes identifying the request body (content type + body)
+    load_payload: callable returning the parsed body
+    tenant: score with this tenant's learned weights (see tasks/tenants.py)
+    view: indexes.View filtering and paginating the ranking (see resolve_view)
+    """
+    # Identical payloads on the same day are served from the result cache;
+    # every page of one ranking shares its entry
+    cache = get_result_cache()
+    with stage("cache"):
+        key = result_key('analyze', key_material, tenant=tenant)
+        cached = cache.get(key)
+    if cached is not None:
+        remember_request('analyze', key_material, tenant)
+        if view is not None:
+            return ranked_page(cache, key, cached, view), status.HTTP_200_OK
+        return cached, status.HTTP_200_OK
+
+    with stage("parse"):
+        payload = load_payload() or {}
+    if not isinstance(payload, dict):
+        return {"detail": "body must be a JSON object"}, status.HTTP_400_BAD_REQUEST
+    tasks = payload.get('tasks') or []
+    strategy = payload.get('strategy')
+
+    if not isinstance(tasks, list):
+        return {"detail": "tasks must be a list"}, status.HTTP_400_BAD_REQUEST
+    calendar, error = resolve_calendar(payload.get('calendar'))
+    if error:
+        return error
+    error = weights_error(payload.get('weights'))
+    if error:
+        return error
+    weights = payload.get('weights') or (learned_weights(tenant) if tenant else None)
+
+    # Validate tasks
+    with stage("validate"):
+        validated, errors = validate_tasks(tasks)
+    count_items(validated)
+    if not errors:
+        errors = require_ids(validated)
+
+    if errors:
+        return validation_error(errors)
+
+    # Explanations are only built when the client asks for them
+    result = calculate_scores(validated, weights=weights, strategy=strategy, calendar=calendar,
+                              explain=flag(payload.get('explain')))
+
+    if result['cycles']:
+        result = {'warning': 'circular_dependencies_detected', **result}
+
+    cache.set(key, result, size=result_size(result))
+    # Recomputed in the background when the date or weights change
+    remember_request('analyze', key_material, tenant)
+    if view is not None:
+        return ranked_page(cache, key, result, view), status.HTTP_200_OK
+    return result, status.HTTP_200_OK
+
+
+def etag_matches(if_none_match, etag):
+    """Whether an If-None-Match header value covers etag."""
+    tags = parse_etags(if_none_match or "")
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+
+def conditional(response, etag):
+    """Attach suggest's ETag to a response; clients must revalidate before reuse."""
+    if etag:
+        response["ETag"] = etag
+        response["Cache-Control"] = "private, no-cache"
+    return response
+
+
+def upload_backlog(payload):
+    """Validate and store a backlog; returns its content-addressed handle."""
+    tasks = payload.get('tasks') if isinstance(payload, dict) else payload
+    if not isinstance(tasks, list):
+        return {"detail": "tasks must be a list"}, status.HTTP_400_BAD_REQUEST
+
+    with stage("validate"):
+        validated, errors = validate_tasks(tasks)
+    count_items(validated)
+    if not errors:
+        # suggest keys its results by id; reject now rather than on every query
+        errors = require_ids(validated)
+    if errors:
+        return validation_error(errors)
+
+    handle = backlog_handle(validated)
+    store = get_backlog_store()
+    existed = store.get(handle) is not None
+    if not existed and not store.put(handle, validated):
+        return {"detail": "too many tasks to store"}, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    return ({"backlog": handle, "count": len(validated)},
+            status.HTTP_200_OK if existed else status.HTTP_201_CREATED)
+
+
+def suggest(query, params, if_none_match=None, tenant=None):
+    """
+    query: raw query string (cache key and ETag)
+    params: mapping of query parameters
+    if_none_match: the request's If-None-Match header, if any
+    tenant: score with this tenant's learned weights
+    returns: (body, status, ETag or None)
+
+    Tasks come from `tasks` (JSON) or from an uploaded `backlog` handle.
+    The ETag covers everything the response depends on, so a matching
+    If-None-Match is answered 304 before anything is parsed or scored.
+    """
+    cache = get_result_cache()
+    with stage("cache"):
+        key = result_key('suggest', query, tenant=tenant)
+        etag = '"%s"' % key.rsplit(':', 1)[1]
+        if etag_matches(if_none_match, etag):
+            remember_request('suggest', query, tenant)
+            return None, status.HTTP_304_NOT_MODIFIED, etag
+        cached = cache.get(key)
+    if cached is not None:
+        remember_request('suggest', query, tenant)
+        return cached, status.HTTP_200_OK, etag
+
+    tasks_param = params.get('tasks')
+    handle = params.get('backlog')
+    strategy = params.get('strategy')
+    weights_param = params.get('weights')
+
+    try:
+        k = int(params.get('k', SUGGEST_DEFAULT_K))
+    except ValueError:
+        return {'detail': 'k must be an integer'}, status.HTTP_400_BAD_REQUEST, None
+    if k < 1:
+        return {'detail': 'k must be at least 1'}, status.HTTP_400_BAD_REQUEST, None
+    calendar, error = resolve_calendar(params.get('calendar'))
+    if error:
+        return (*error, None)
+
+    # Parse weights
+    try:
+        weights = loads(weights_param) if weights_param else None
+    except ValueError:
+        return {'detail': 'invalid weights JSON'}, status.HTTP_400_BAD_REQUEST, None
+    error = weights_error(weights)
+    if error:
+        return (*error, None)
+    weights = weights or (learned_weights(tenant) if tenant else None)
+
+    if handle:
+        # Uploaded backlogs were validated once, on upload
+        validated = get_backlog_store().get(handle)
+        if validated is None:
+            return {'detail': 'unknown backlog'}, status.HTTP_404_NOT_FOUND, None
+        count_items(validated)
+    else:
+        # Parse tasks
+        try:
+            with stage("parse"):
+                tasks = loads(tasks_param) if tasks_param else []
+        except Exception:
+            return {'detail': 'invalid tasks JSON'}, status.HTTP_400_BAD_REQUEST, None
+        if not isinstance(tasks, list):
+            return {'detail': 'tasks must be a list'}, status.HTTP_400_BAD_REQUEST, None
+
+        # Validate tasks
+        with stage("validate"):
+            validated, errors = validate_tasks(tasks)
+        count_items(validated)
+        if not errors:
+            errors = require_ids(validated)
+
+        if errors:
+            return (*validation_error(errors), None)
+
+    result = top_k_scores(validated, k=k, weights=weights, strategy=strategy, calendar=calendar)
+
+    suggestions = [{
+        'id': t['id'],
+        'title': t['title'],
+        'score': t['score'],
+        'explanation': t['reason'],
+    } for t in result['tasks']]
+
+    body = {
+        'suggestions': suggestions,
+        'cycles': result['cycles'],
+    }
+    cache.set(key, body, size=result_size(body))
+    remember_request('suggest', query, tenant)
+    return body, status.HTTP_200_OK, etag
+
+
+def schedule(payload):
+    """Day-by-day plan for validated tasks with unique ids (see scheduler.build_schedule)."""
+    payload = payload or {}
+    tasks = payload.get("tasks") or []
+    if not isinstance(tasks, list):
+        return {"detail": "tasks must be a list"}, status.HTTP_400_BAD_REQUEST
+
+    try:
+        hours_per_day = float(payload.get("hours_per_day", 8))
+        start = datetime.date.fromisoformat(payload["start_date"]) if payload.get("start_date") else None
+    except (TypeError, ValueError):
+        return {"detail": "invalid hours_per_day or start_date"}, status.HTTP_400_BAD_REQUEST
+    if not 0 < hours_per_day <= 24:
+        return {"detail": "hours_per_day must be between 0 and 24"}, status.HTTP_400_BAD_REQUEST
+    calendar, error = resolve_calendar(payload.get("calendar"))
+    if error:
+        return error
+    error = weights_error(payload.get("weights"))
+    if error:
+        return error
+
+    with stage("validate"):
+        validated, errors = validate_tasks(tasks)
+    if not errors:
+        errors = require_ids(validated) or duplicate_ids(validated)
+    count_items(validated)
+    if errors:
+        return validation_error(errors)
+
+    try:
+        plan = build_schedule(validated, hours_per_day=hours_per_day, start=start, weights=payload.get("weights"),
+                              strategy=payload.get("strategy"), calendar=calendar)
+    except ScheduleTooLong as exc:
+        return {"detail": str(exc)}, status.HTTP_400_BAD_REQUEST
+    return plan, status.HTTP_200_OK
+
+
+def graph(payload):
+    payload = payload or {}
+    tasks = payload.get("tasks") or []
+    if not isinstance(tasks, list):
+        return {"detail": "tasks must be a list"}, status.HTTP_400_BAD_REQUEST
+    try:
+        offset = max(0, int(payload.get("offset", 0)))
+        limit = min(GRAPH_MAX_LIMIT, max(1, int(payload.get("limit", GRAPH_MAX_LIMIT))))
+        depth = max(0, int(payload.get("depth", 2)))
+    except (TypeError, ValueError):
+        return {"detail": "invalid offset, limit or depth"}, status.HTTP_400_BAD_REQUEST
+
+    with stage("validate"):
+        validated, errors = validate_tasks(tasks)
+    if not errors:
+        errors = require_ids(validated)
+    count_items(validated)
+    if errors:
+        return validation_error(errors)
+
+    with stage("graph"):
+        result = analyze_graph(validated)
+    total = len(result["nodes"])
+
+    focus = payload.get("focus")
+    if focus is not None:
+        result = subgraph(result, str(focus), depth)
+        if result is None:
+            return {"detail": "unknown focus task"}, status.HTTP_404_NOT_FOUND
+    else:
+        nodes = result["nodes"][offset:offset + limit]
+        page = {node["id"] for node in nodes}
+        result["nodes"] = nodes
+        result["edges"] = [e for e in result["edges"] if e["to"] in page]
+        result.update(offset=offset, limit=limit)
+
+    result["total"] = total
+    return result, status.HTTP_200_OK
+
+
+def graph_session_open(payload):
+    """Build a DynamicGraph once; edges are then edited through graph_session_edit."""
+    payload = payload or {}
+    tasks = payload.get("tasks") or []
+    if not isinstance(tasks, list):
+        return {"detail": "tasks must be a list"}, status.HTTP_400_BAD_REQUEST
+    mode = payload.get("mode") or "reject"
+    if mode not in GRAPH_MODES:
+        return {"detail": f"mode must be one of {', '.join(GRAPH_MODES)}"}, status.HTTP_400_BAD_REQUEST
+
+    with stage("validate"):
+        validated, errors = validate_tasks(tasks)
+    if not errors:
+        errors = require_ids(validated)
+    count_items(validated)
+    if errors:
+        return validation_error(errors)
+
+    with stage("graph"):
+        graph = DynamicGraph(validated, mode)
+    token = get_graph_registry().add(graph)
+    if token is None:
+        return {"detail": "too many tasks for a graph session"}, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    return {
+        "session": token,
+        "mode": mode,
+        "tasks": len(graph),
+        "edges": graph.edges,
+        "cycles": graph.cycles(),
+    }, status.HTTP_200_OK
+
+
+def _edges(value):
+    """[{"from": dependency id, "to": task id}, ...] -> [(from, to)] or None if malformed"""
+    if not isinstance(value, list):
+        return None
+    edges = []
+    for edge in value:
+        if not isinstance(edge, dict) or not isinstance(edge.get("from"), str) or not isinstance(edge.get("to"), str):
+            return None
+        edges.append((edge["from"], edge["to"]))
+    return edges
+
+
+def graph_session_edit(token, payload):
+    """Apply edge removals, then additions, in order; each result says what happened."""
+    graph = get_graph_registry().get(token)
+    if graph is None:
+        return {"detail": "unknown or expired session"}, status.HTTP_404_NOT_FOUND
+    payload = payload or {}
+    remove, add = _edges(payload.get("remove", [])), _edges(payload.get("add", []))
+    if remove is None or add is None:
+        return {"detail": 'add and remove must be lists of {"from", "to"} task ids'}, status.HTTP_400_BAD_REQUEST
+
+    with stage("graph"), graph.lock:
+        results = [{"from": u, "to": v, **graph.remove_edge(u, v)} for u, v in remove]
+        results += [{"from": u, "to": v, **graph.add_edge(u, v)} for u, v in add]
+        cycles = graph.cycles()
+        edges = graph.edges
+    return {
+        "session": token,
+        "results": results,
+        "edges": edges,
+        "cycles": cycles,
+    }, status.HTTP_200_OK
+
+
+def graph_session_state(token):
+    """Current topological order and cycles."""
+    graph = get_graph_registry().get(token)
+    if graph is None:
+        return {"detail": "unknown or expired session"}, status.HTTP_404_NOT_FOUND
+    with stage("graph"), graph.lock:
+        return {
+            "session": token,
+            "mode": graph.mode,
+            "tasks": len(graph),
+            "edges": graph.edges,
+            "order": graph.order(),
+            "cycles": graph.cycles(),
+        }, status.HTTP_200_OK
+
+
+def graph_session_close(token):
+    if not get_graph_registry().discard(token):
+        return {"detail": "unknown or expired session"}, status.HTTP_404_NOT_FOUND
+    return None, status.HTTP_204_NO_CONTENT
+
+
+def _ranking(session, token, payload):
+    try:
+        offset = max(0, int(payload.get("offset", 0)))
+        limit = payload.get("limit")
+        limit = None if limit is None else max(1, int(limit))
+    except (TypeError, ValueError):
+        return {"detail": "invalid offset or limit"}, status.HTTP_400_BAD_REQUEST
+    weights = payload.get("weights")
+    error = weights_error(weights)
+    if error:
+        return error
+
+    records, total = session.rank(weights=weights, strategy=payload.get("strategy"), offset=offset, limit=limit)
+    with stage("serialize"):
+        tasks = to_dicts(records, flag(payload.get("explain")))
+    return {
+        "session": token,
+        "tasks": tasks,
+        "cycles": session.cycles,
+        "total": total,
+        "offset": offset,
+        "limit": limit,
+    }, status.HTTP_200_OK
+
+
+def whatif_open(payload):
+    """Validate and score a backlog once; later re-ranks go through whatif_rank."""
+    payload = payload or {}
+    tasks = payload.get("tasks") or []
+    if not isinstance(tasks, list):
+        return {"detail": "tasks must be a list"}, status.HTTP_400_BAD_REQUEST
+    calendar, error = resolve_calendar(payload.get("calendar"))
+    if error:
+        return error
+    # Checked before the session is registered, so a bad request opens none
+    error = weights_error(payload.get("weights"))
+    if error:
+        return error
+
+    with stage("validate"):
+        validated, errors = validate_tasks(tasks)
+    count_items(validated)
+    if not errors:
+        errors = require_ids(validated)
+    if errors:
+        return validation_error(errors)
+
+    session = WhatIfSession(validated, calendar)
+    token = get_whatif_registry().add(session)
+    if token is None:
+        return {"detail": "too many tasks for a what-if session"}, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    return _ranking(session, token, payload)
+
+
+def whatif_rank(token, payload):
+    """Re-rank an open session for new weights / strategy."""
+    session = get_whatif_registry().get(token)
+    if session is None:
+        return {"detail": "unknown or expired session"}, status.HTTP_404_NOT_FOUND
+    return _ranking(session, token, payload or {})
+
+
+def whatif_close(token):
+    if not get_whatif_registry().discard(token):
+        return {"detail": "unknown or expired session"}, status.HTTP_404_NOT_FOUND
+    return None, status.HTTP_204_NO_CONTENT
+
+
+def store_sync(payload):
+    """Upsert validated tasks with unique ids into the persistent store."""
+    payload = payload or {}
+    tasks = payload.get("tasks") or []
+    if not isinstance(tasks, list):
+        return {"detail": "tasks must be a list"}, status.HTTP_400_BAD_REQUEST
+
+    with stage("validate"):
+        validated, errors = validate_tasks(tasks)
+    if not errors:
+        errors = require_ids(validated) or duplicate_ids(validated)
+    count_items(validated)
+    if errors:
+        return validation_error(errors)
+
+    return sync_tasks(validated, replace=bool(payload.get("replace"))), status.HTTP_200_OK
+
+
+def store_tasks(params):
+    """One page of stored tasks by descending score, filtered by query parameters."""
+    try:
+        offset = max(0, int(params.get("offset", 0)))
+        limit = min(STORE_MAX_LIMIT, max(1, int(params.get("limit", 20))))
+        due_before = datetime.date.fromisoformat(params["due_before"]) if params.get("due_before") else None
+        due_after = datetime.date.fromisoformat(params["due_after"]) if params.get("due_after") else None
+    except ValueError:
+        return {"detail": "invalid query parameters"}, status.HTTP_400_BAD_REQUEST
+
+    page, total = ranked_tasks(matrix=params.get("matrix"), due_before=due_before,
+                               due_after=due_after, offset=offset, limit=limit)
+    return {"tasks": page, "total": total, "offset": offset, "limit": limit}, status.HTTP_200_OK
+
+
+def feedback(payload, tenant=None):
+    """tenant: X-Tenant-ID / ?tenant=; a "tenant" field in the body takes precedence"""
+    if not isinstance(payload, dict):
+        return {"detail": "body must be a JSON object"}, status.HTTP_400_BAD_REQUEST
+    selected = payload.get("selected") or []
+    if not isinstance(selected, list) or not all(
+            isinstance(tid, (str, int)) and not isinstance(tid, bool) for tid in selected):
+        return {"detail": "selected must be a list of task ids"}, status.HTTP_400_BAD_REQUEST
+    helpful = payload.get("helpful", True)
+    try:
+        tenant = clean_tenant(payload.get("tenant")) or tenant
+    except InvalidTenant:
+        return {"detail": "invalid tenant"}, status.HTTP_400_BAD_REQUEST
+
+    if tenant:
+        # Written through to the TenantWeights table; only this tenant's weights move
+        weights = get_tenant_store().record_feedback(tenant, len(selected), helpful)
+    else:
+        # Deltas are batched and written atomically by the weight store;
+        # the returned weights already include this click.
+        weights = weight_store.record_feedback(len(selected), helpful)
+
+    return {
+        "message": "Feedback applied",
+        "weights": weights,
+        "helpful": helpful,
+        "selected": selected,
+        "tenant": tenant,
+    }, status.HTTP_200_OK
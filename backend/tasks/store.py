@@ -0,0 +1,193 @@
+"""
+Persistent task store with incremental re-scoring.
+
+sync_tasks() diffs an incoming backlog against the stored one by content
+hash, upserts only what changed and re-scores only those rows plus any
+row scored under an outdated context (learned weights, HOLIDAYS, today).
+Ranked queries are then answered from the score / (matrix, score)
+indexes without running calculate_scores over the whole set.
+"""
+import datetime
+import hashlib
+import json
+
+from django.db import transaction
+
+from .models import Task, TaskDependency
+from .scoring import get_calendar, resolve_weights, score_task
+
+BATCH_SIZE = 500  # keeps IN (...) lists under SQLite's variable limit
+
+
+def _digest(obj):
+    return hashlib.blake2b(json.dumps(obj, sort_keys=True, default=str).encode(), digest_size=16).hexdigest()
+
+
+def input_hash(t):
+    return _digest([
+        t["title"],
+        t.get("due_date"),
+        t.get("estimated_hours"),
+        t.get("importance"),
+        t.get("dependencies") or [],
+    ])
+
+
+def scoring_context(now=None):
+    """Resolved weights + today + fingerprint of everything a stored score depends on."""
+    now = now or datetime.date.today()
+    weights = resolve_weights()
+    return weights, now, _digest([weights, now, get_calendar().fingerprint])
+
+
+def _task_dict(row, deps):
+    return {
+        "id": row.task_id,
+        "title": row.title,
+        "due_date": row.due_date,
+        "estimated_hours": row.estimated_hours,
+        "importance": row.importance,
+        "dependencies": deps,
+    }
+
+
+def _apply_score(row, deps, weights, now, fingerprint):
+    scored = score_task(_task_dict(row, deps), *weights, now)
+    row.score = scored["score"]
+    row.matrix = scored["matrix"]
+    row.reason = scored["reason"]
+    row.scored_with = fingerprint
+
+
+def _chunks(items, size=BATCH_SIZE):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def _dependencies_of(pks):
+    deps = {}
+    for chunk in _chunks(list(pks)):
+        for task_pk, dep in TaskDependency.objects.filter(task_id__in=chunk).values_list("task_id", "depends_on").order_by("pk"):
+            deps.setdefault(task_pk, []).append(dep)
+    return deps
+
+
+SCORE_FIELDS = ["score", "matrix", "reason", "scored_with"]
+INPUT_FIELDS = ["title", "due_date", "estimated_hours", "importance", "input_hash"]
+
+
+def refresh_stale_scores(context=None):
+    """Re-score rows scored under a different context; returns how many."""
+    weights, now, fingerprint = context or scoring_context()
+    stale = list(Task.objects.exclude(scored_with=fingerprint).values_list("pk", flat=True))
+    for chunk in _chunks(stale):
+        rows = list(Task.objects.filter(pk__in=chunk))
+        deps = _dependencies_of(chunk)
+        for row in rows:
+            _apply_score(row, deps.get(row.pk, []), weights, now, fingerprint)
+        Task.objects.bulk_update(rows, SCORE_FIELDS)
+    return len(stale)
+
+
+@transaction.atomic
+def sync_tasks(validated, replace=False):
+    """
+    Upsert validated tasks (each must carry an id; /store/sync/ also
+    rejects repeated ids).
+    replace=True also deletes stored tasks that are not in `validated`.
+    returns: {"created", "updated", "unchanged", "deleted", "rescored"}
+    """
+    weights, now, fingerprint = context = scoring_context()
+
+    incoming = {}
+    for t in validated:
+        incoming[t["id"]] = t  # last occurrence of a duplicate id wins
+
+    existing = {}
+    for chunk in _chunks(list(incoming)):
+        for row in Task.objects.filter(task_id__in=chunk):
+            existing[row.task_id] = row
+
+    created, updated = [], []
+    for tid, t in incoming.items():
+        h = input_hash(t)
+        row = existing.get(tid)
+        if row is not None and row.input_hash == h:
+            continue
+        if row is None:
+            row = Task(task_id=tid)
+            created.append(row)
+        else:
+            updated.append(row)
+        row.title = t["title"]
+        due_date = t.get("due_date") or None
+        row.due_date = datetime.date.fromisoformat(due_date) if isinstance(due_date, str) else due_date
+        row.estimated_hours = float(t.get("estimated_hours") or 1.0)
+        row.importance = int(t.get("importance") or 5)
+        row.input_hash = h
+        _apply_score(row, t.get("dependencies") or [], weights, now, fingerprint)
+
+    Task.objects.bulk_create(created, batch_size=BATCH_SIZE)
+    if created and created[0].pk is None:
+        # Backends that don't return primary keys from bulk_create
+        ids = [row.task_id for row in created]
+        pks = {}
+        for chunk in _chunks(ids):
+            pks.update(Task.objects.filter(task_id__in=chunk).values_list("task_id", "pk"))
+        for row in created:
+            row.pk = row.id = pks[row.task_id]
+    Task.objects.bulk_update(updated, INPUT_FIELDS + SCORE_FIELDS, batch_size=BATCH_SIZE)
+
+    for chunk in _chunks([row.pk for row in updated]):
+        TaskDependency.objects.filter(task_id__in=chunk).delete()
+    TaskDependency.objects.bulk_create([
+        TaskDependency(task_id=row.pk, depends_on=dep)
+        for row in created + updated
+        for dep in dict.fromkeys(incoming[row.task_id].get("dependencies") or [])
+    ], batch_size=BATCH_SIZE)
+
+    deleted = 0
+    if replace:
+        missing = [pk for pk, tid in Task.objects.values_list("pk", "task_id") if tid not in incoming]
+        for chunk in _chunks(missing):
+            deleted += Task.objects.filter(pk__in=chunk).delete()[1].get("tasks.Task", 0)
+
+    rescored = len(created) + len(updated) + refresh_stale_scores(context)
+    return {
+        "created": len(created),
+        "updated": len(updated),
+        "unchanged": len(incoming) - len(created) - len(updated),
+        "deleted": deleted,
+        "rescored": rescored,
+    }
+
+
+def ranked_tasks(matrix=None, due_before=None, due_after=None, offset=0, limit=20):
+    """
+    One page of stored tasks by descending score, straight from the index.
+    Stale rows are re-scored first (a no-op unless weights, HOLIDAYS or the
+    date changed since the last sync).
+    returns: (page as analyze-style dicts, total matching)
+    """
+    refresh_stale_scores()
+    qs = Task.objects.all()
+    if matrix:
+        qs = qs.filter(matrix=matrix)
+    if due_before:
+        qs = qs.filter(due_date__lte=due_before)
+    if due_after:
+        qs = qs.filter(due_date__gte=due_after)
+    total = qs.count()
+    page = list(qs.order_by("-score", "pk")[offset:offset + limit])
+    deps = _dependencies_of(row.pk for row in page)
+    return [{
+        "id": row.task_id,
+        "title": row.title,
+        "due_date": row.due_date.isoformat() if row.due_date else None,
+        "estimated_hours": row.estimated_hours,
+        "importance": row.importance,
+        "dependencies": deps.get(row.pk, []),
+        "score": row.score,
+        "reason": row.reason,
+        "matrix": row.matrix,
+    } for row in page], total
@@ -0,0 +1,81 @@
+"""
+Generator pipeline behind the NDJSON streaming analyze endpoint.
+
+Each stage consumes one task at a time, so only compact per-task state
+(id, score, dependencies) is kept for the final ranking and cycle check;
+the request body, validated tasks and scored output are never all in
+memory at once.
+"""
+import datetime
+
+from .renderers import dumps, loads
+from .scoring import analyze_dependencies, get_calendar, score_record
+from .serializers import validate_task
+
+
+def read_lines(stream):
+    """Yield (index, line) for every non-blank line of a binary stream."""
+    index = 0
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        yield index, line
+        index += 1
+
+
+def parse_tasks(lines):
+    """Decode each line; yields (index, task, errors)."""
+    for index, line in lines:
+        try:
+            yield index, loads(line), None
+        except ValueError:
+            yield index, None, {"non_field_errors": ["Invalid JSON."]}
+
+
+def validate(parsed):
+    for index, task, errors in parsed:
+        if errors is None:
+            task, errors = validate_task(task)
+        if errors is None and not task.get("id"):
+            # Ranking and cycle detection key by id
+            task, errors = None, {"id": ["This field is required."]}
+        yield index, task, errors
+
+
+def stream_scores(stream, uw, iw, ew, now=None, calendar=None, explain=False):
+    """
+    Full pipeline: yields NDJSON lines (bytes).
+
+    One {"type": "task", ...} or {"type": "error", ...} line per input line,
+    in input order, then a {"type": "summary", ...} trailer with the
+    ranking (ids by descending score, ties in input order) and cycles.
+    """
+    now = now or datetime.date.today()
+    calendar = get_calendar(calendar)
+    ranking = []   # (score, index, id)
+    graph = []     # {"id", "dependencies"} for cycle detection
+    errors = 0
+
+    for index, task, task_errors in validate(parse_tasks(read_lines(stream))):
+        if task_errors is not None:
+            errors += 1
+            yield _line({"type": "error", "index": index, "errors": task_errors})
+            continue
+        record = score_record(task, uw, iw, ew, now, calendar)
+        ranking.append((record.score, index, record.id))
+        graph.append({"id": record.id, "dependencies": record.dependencies})
+        yield _line({"type": "task", "index": index, "task": record.to_dict(explain)})
+
+    ranking.sort(key=lambda r: (-r[0], r[1]))
+    yield _line({
+        "type": "summary",
+        "count": len(ranking),
+        "errors": errors,
+        "ranking": [r[2] for r in ranking],
+        "cycles": analyze_dependencies(graph)["cycles"],
+    })
+
+
+def _line(obj):
+    return dumps(obj) + b"\n"
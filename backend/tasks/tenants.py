@@ -0,0 +1,158 @@
+"""
+Learned weights per tenant (or user).
+
+Requests that name a tenant (X-Tenant-ID header or `tenant` parameter)
+are scored with that tenant's weights, and their feedback only moves
+that tenant's weights; requests without one keep using the global
+user_weights.json.
+
+Weights are kept in a sharded in-memory LRU: a tenant id hashes to one
+of SHARDS shards, each an OrderedDict behind its own lock, so lookups
+are O(1) and tenants on different shards never contend. Cold tenants
+are evicted once MAX_TENANTS are cached. Every feedback click is written
+through to the TenantWeights table as a single atomic UPDATE, so
+concurrent workers never lose each other's updates; cached entries are
+re-read after TTL seconds to pick up other workers' writes.
+
+Configured by settings.TASK_TENANT_WEIGHTS:
+    {"SHARDS": 16, "MAX_TENANTS": 100_000, "TTL": 30}
+"""
+import itertools
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.dispatch import receiver
+
+from .weights import DEFAULT_WEIGHTS, WEIGHT_FLOOR, feedback_delta, load_user_weights
+
+DEFAULT_CONFIG = {
+    "SHARDS": 16,
+    "MAX_TENANTS": 100_000,
+    "TTL": 30,
+}
+
+TENANT_HEADER = "X-Tenant-ID"
+MAX_TENANT_LENGTH = 255
+
+FIELDS = tuple(DEFAULT_WEIGHTS)
+
+
+class InvalidTenant(ValueError):
+    pass
+
+
+def clean_tenant(value):
+    """A tenant id from a request, or None; raises InvalidTenant."""
+    if value is None or value == "":
+        return None
+    if not isinstance(value, str) or len(value) > MAX_TENANT_LENGTH:
+        raise InvalidTenant(value)
+    return value
+
+
+class _Shard:
+    __slots__ = ("lock", "entries", "hits", "misses")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()  # tenant -> (weights, loaded at)
+        self.hits = 0
+        self.misses = 0
+
+
+class TenantWeightStore:
+    def __init__(self, shards=16, max_tenants=100_000, ttl=30):
+        self._shards = [_Shard() for _ in range(shards)]
+        self.per_shard = max(1, max_tenants // shards)
+        self.ttl = ttl
+        self._versions = itertools.count(1)
+        self.version = 0   # bumped on every write, for anything caching derived results
+
+    def _shard(self, tenant):
+        return self._shards[hash(tenant) % len(self._shards)]
+
+    def _put(self, shard, tenant, weights, loaded):
+        with shard.lock:
+            shard.entries[tenant] = (weights, loaded)
+            shard.entries.move_to_end(tenant)
+            while len(shard.entries) > self.per_shard:
+                shard.entries.popitem(last=False)
+
+    def get(self, tenant):
+        """The tenant's weights; tenants without feedback yet get the defaults."""
+        shard = self._shard(tenant)
+        now = time.monotonic()
+        with shard.lock:
+            entry = shard.entries.get(tenant)
+            if entry is not None and now - entry[1] <= self.ttl:
+                shard.entries.move_to_end(tenant)
+                shard.hits += 1
+                return dict(entry[0])
+            shard.misses += 1
+
+        from .models import TenantWeights
+        row = TenantWeights.objects.filter(tenant_id=tenant).values(*FIELDS).first()
+        weights = row or dict(DEFAULT_WEIGHTS)
+        self._put(shard, tenant, weights, now)
+        return dict(weights)
+
+    def record_feedback(self, tenant, selected_count, helpful):
+        """Apply one feedback click (same rule as weights.apply_feedback); returns the new weights."""
+        from .models import TenantWeights
+        delta = feedback_delta(selected_count)
+        if helpful:
+            change = {f: F(f) + delta for f in ("urgency_weight", "importance_weight")}
+        else:
+            change = {f: Greatest(F(f) - delta, WEIGHT_FLOOR) for f in ("urgency_weight", "importance_weight")}
+
+        TenantWeights.objects.get_or_create(tenant_id=tenant, defaults=DEFAULT_WEIGHTS)
+        TenantWeights.objects.filter(tenant_id=tenant).update(**change)
+        weights = TenantWeights.objects.filter(tenant_id=tenant).values(*FIELDS).get()
+
+        self._put(self._shard(tenant), tenant, weights, time.monotonic())
+        self.version = next(self._versions)
+        return dict(weights)
+
+    def clear(self):
+        for shard in self._shards:
+            with shard.lock:
+                shard.entries.clear()
+
+    def stats(self):
+        hits = misses = entries = 0
+        for shard in self._shards:
+            with shard.lock:
+                hits += shard.hits
+                misses += shard.misses
+                entries += len(shard.entries)
+        return {"hits": hits, "misses": misses, "tenants": entries}
+
+
+_tenant_store = None
+
+
+def get_tenant_store():
+    global _tenant_store
+    if _tenant_store is None:
+        config = {**DEFAULT_CONFIG, **getattr(settings, "TASK_TENANT_WEIGHTS", {})}
+        _tenant_store = TenantWeightStore(config["SHARDS"], config["MAX_TENANTS"], config["TTL"])
+    return _tenant_store
+
+
+@receiver(setting_changed)
+def _reset_tenant_store(setting, **kwargs):
+    global _tenant_store
+    if setting == "TASK_TENANT_WEIGHTS":
+        _tenant_store = None
+
+
+def learned_weights(tenant=None):
+    """Weights a request is scored with when it passes none explicitly."""
+    if tenant is None:
+        return load_user_weights()
+    return get_tenant_store().get(tenant)
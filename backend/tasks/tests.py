@@ -1,8 +1,27 @@
-from django.test import TestCase
+from asgiref.sync import sync_to_async
+from django.test import TestCase, override_settings
 from django.urls import reverse
 from rest_framework.test import APIClient
-from .scoring import calculate_scores
+from . import scoring
+from .scoring import calculate_scores, business_days_between
+from .serializers import TaskInputSerializer, validate_tasks
+from .vectorized import HAS_NUMPY
+from .cache import LocalResultCache, get_result_cache
+from .weights import WeightStore, WeightsProvider, read_weights_file, weight_store
+import contextlib
 import datetime
+import decimal
+import gzip
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from unittest import mock
+import unittest
 
 
 class ScoringAlgorithmTests(TestCase):
@@ -51,10 +70,1025 @@ class ScoringAlgorithmTests(TestCase):
         t = calculate_scores(tasks)["tasks"][0]
         self.assertEqual(t["matrix"], "Do First")
 
+    def test_records_build_reason_only_when_explained(self):
+        tasks = make_tasks(50)
+        tasks[1]["dependencies"] = [tasks[0]["id"]]
+        ranked = scoring.rank_tasks(tasks)["tasks"]
+        self.assertFalse(hasattr(ranked[0], "__dict__"))
+        self.assertIs(ranked[0].id, sys.intern(str(ranked[0].id)))
+
+        explained = calculate_scores(tasks)["tasks"]
+        plain = calculate_scores(tasks, explain=False)["tasks"]
+        self.assertEqual(explained, [r.to_dict() for r in ranked])
+        self.assertEqual(plain, [{k: v for k, v in t.items() if k != "reason"} for t in explained])
+        dependent = next(t for t in explained if t["id"] == tasks[1]["id"])
+        self.assertIn(f"Depends on: {tasks[0]['id']}", dependent["reason"])
+
+
+class BusinessCalendarTests(TestCase):
+    def naive_business_days(self, start, end, holidays, weekend=(5, 6)):
+        days = 0
+        current = start + datetime.timedelta(days=1)
+        while current <= end:
+            if current.weekday() not in weekend and current not in holidays:
+                days += 1
+            current += datetime.timedelta(days=1)
+        return days
+
+    def region_holidays(self, region, years):
+        from .calendars import holiday_dates, load_definition
+        return set().union(*(holiday_dates(load_definition(region), y) for y in years))
+
+    def test_india_holidays_and_window(self):
+        from .calendars import YEARS_AHEAD
+        year = datetime.date.today().year + 1
+        self.assertEqual(sorted(self.region_holidays("IN", [year])),
+                         [datetime.date(year, m, d) for m, d in ((1, 1), (1, 26), (8, 15), (10, 2), (12, 25))])
+        calendar = scoring.get_calendar("IN")
+        self.assertTrue(calendar.is_holiday(datetime.date(year, 12, 25)))
+        # Past the compiled window only weekends count
+        self.assertFalse(calendar.is_holiday(datetime.date(year + YEARS_AHEAD, 12, 25)))
+
+    def test_matches_day_by_day_count(self):
+        start = datetime.date(2024, 12, 20)
+        holidays = self.region_holidays(scoring.DEFAULT_CALENDAR, range(2024, 2032))
+        for offset in range(0, 800, 7):
+            for span in (0, 1, 2, 5, 6, 7, 13, 400):
+                a = start + datetime.timedelta(days=offset % 9)
+                b = a + datetime.timedelta(days=span + offset)
+                self.assertEqual(business_days_between(a, b), self.naive_business_days(a, b, holidays))
+        self.assertEqual(business_days_between(start, start - datetime.timedelta(days=3)), 0)
+
+    def test_custom_weekend_and_range_edges(self):
+        from .calendars import BusinessCalendar
+        holidays = {datetime.date(2026, 2, 2), datetime.date(2026, 2, 6), datetime.date(2026, 3, 31)}
+        calendar = BusinessCalendar(holidays, weekend=(4, 5))   # Friday + Saturday
+        start = datetime.date(2025, 12, 1)
+        for offset in range(0, 200, 3):
+            for span in (0, 1, 6, 7, 45, 180):
+                a = start + datetime.timedelta(days=offset)
+                b = a + datetime.timedelta(days=span)
+                self.assertEqual(calendar.business_days_between(a, b),
+                                 self.naive_business_days(a, b, holidays, weekend=(4, 5)))
+        self.assertTrue(calendar.is_weekend(datetime.date(2026, 2, 6)))
+        self.assertTrue(calendar.is_holiday(datetime.date(2026, 2, 6)))
+        self.assertFalse(calendar.is_holiday(datetime.date(2030, 1, 1)))
+
+    def test_region_rules(self):
+        cal = {region: scoring.get_calendar(region) for region in ("IN", "US", "GB")}
+        d = datetime.date
+        self.assertTrue(cal["IN"].is_holiday(d(2031, 1, 26)))      # recurring, not just 2025
+        self.assertTrue(cal["US"].is_holiday(d(2025, 11, 27)))     # 4th Thursday of November
+        self.assertTrue(cal["US"].is_holiday(d(2026, 5, 25)))      # last Monday of May
+        self.assertTrue(cal["US"].is_holiday(d(2027, 6, 18)))      # Juneteenth (Sat) observed Friday
+        self.assertTrue(cal["GB"].is_holiday(d(2025, 4, 18)))      # Good Friday
+        self.assertTrue(cal["GB"].is_holiday(d(2025, 4, 21)))      # Easter Monday
+        # Christmas on Saturday, Boxing Day on Sunday: substitutes Mon 27 + Tue 28
+        self.assertTrue(cal["GB"].is_holiday(d(2027, 12, 27)))
+        self.assertTrue(cal["GB"].is_holiday(d(2027, 12, 28)))
+        self.assertFalse(cal["IN"].is_holiday(d(2025, 11, 27)))
+        with self.assertRaises(scoring.UnknownCalendar):
+            scoring.get_calendar("XX")
+
+    def test_per_request_calendar(self):
+        tasks = [{"id": "1", "title": "T", "due_date": "2030-11-28", "estimated_hours": 1}]
+        default = calculate_scores(tasks)["tasks"][0]
+        us = calculate_scores(tasks, calendar="US")["tasks"][0]
+        # Thanksgiving 2030 (Nov 28) is a US holiday only
+        self.assertGreater(us["score"], default["score"])
+        self.assertEqual(calculate_scores(tasks * 300, calendar="US")["tasks"][0], us)
+
+    def test_rebuilds_when_holidays_change(self):
+        start = datetime.date(2030, 3, 1)   # Friday
+        end = datetime.date(2030, 3, 8)     # Friday
+        self.assertEqual(business_days_between(start, end), 5)
+        scoring.HOLIDAYS.add("2030-03-05")
+        try:
+            self.assertEqual(business_days_between(start, end), 4)
+            self.assertTrue(scoring.is_holiday(datetime.date(2030, 3, 5)))
+        finally:
+            scoring.HOLIDAYS.discard("2030-03-05")
+        self.assertEqual(business_days_between(start, end), 5)
+
+
+class TopKTests(TestCase):
+    def test_scalar_top_k_matches_full_sort_with_ties(self):
+        tasks = make_tasks(120)
+        for t in tasks[::2]:
+            t.update(due_date=None, estimated_hours=3, importance=6)
+        full = calculate_scores(tasks)
+        for k in (1, 3, 10, 200):
+            top = scoring.top_k_scores(tasks, k=k)
+            self.assertEqual(top["tasks"], full["tasks"][:k])
+            self.assertEqual(top["cycles"], full["cycles"])
+
+
+class CycleDetectionTests(TestCase):
+    def chain(self, n):
+        return [{"id": str(i), "dependencies": [str(i - 1)] if i else []} for i in range(n)]
+
+    def test_long_chain_has_no_recursion_limit(self):
+        tasks = self.chain(20000)
+        result = scoring.analyze_dependencies(tasks)
+        self.assertEqual(result["cycles"], [])
+        self.assertEqual(result["order"], [str(i) for i in range(20000)])
+
+    def test_each_cycle_reported_once(self):
+        tasks = self.chain(5)
+        tasks[0]["dependencies"] = ["4"]          # 0 -> 1 -> 2 -> 3 -> 4 -> 0
+        tasks.append({"id": "5", "dependencies": ["5"]})
+        tasks.append({"id": "6", "dependencies": ["2", "missing"]})
+        result = scoring.analyze_dependencies(tasks)
+        self.assertEqual(result["cycles"], [["0", "1", "2", "3", "4"], ["5"]])
+        self.assertEqual(result["order"], ["6"])
+        self.assertEqual(scoring.detect_cycles(tasks), result["cycles"])
+
+    def test_order_puts_dependencies_first(self):
+        tasks = [
+            {"id": "c", "dependencies": ["a", "b"]},
+            {"id": "b", "dependencies": ["a"]},
+            {"id": "a", "dependencies": []},
+            {"id": "d", "dependencies": []},
+        ]
+        order = scoring.analyze_dependencies(tasks)["order"]
+        self.assertEqual(sorted(order), ["a", "b", "c", "d"])
+        for t in tasks:
+            for dep in t["dependencies"]:
+                self.assertLess(order.index(dep), order.index(t["id"]))
+
+
+class SchedulerTests(TestCase):
+    monday = datetime.date(2025, 1, 6)
+
+    def plan(self, tasks, **kwargs):
+        from .scheduler import build_schedule
+        return build_schedule(tasks, start=self.monday, **kwargs)
+
+    def test_blockers_scheduled_before_dependents(self):
+        tasks = [
+            {"id": "big", "title": "Big", "importance": 10, "estimated_hours": 1, "dependencies": ["small"]},
+            {"id": "small", "title": "Small", "importance": 1, "estimated_hours": 1},
+            {"id": "other", "title": "Other", "importance": 5, "estimated_hours": 1},
+        ]
+        order = [t["id"] for t in self.plan(tasks)["tasks"]]
+        self.assertLess(order.index("small"), order.index("big"))
+        self.assertEqual(len(order), 3)
+
+    def test_capacity_and_working_days(self):
+        tasks = [{"id": str(i), "title": str(i), "estimated_hours": 5} for i in range(5)]
+        with mock.patch.object(scoring, "HOLIDAYS", {"2025-01-07"}):
+            plan = self.plan(tasks, hours_per_day=8)
+        dates = [d["date"] for d in plan["days"]]
+        # Tuesday is a holiday; 25h over 8h days ends on the next Monday
+        self.assertEqual(dates, ["2025-01-06", "2025-01-08", "2025-01-09", "2025-01-10"])
+        self.assertTrue(all(d["hours"] <= 8 for d in plan["days"]))
+        self.assertEqual(sum(d["hours"] for d in plan["days"]), 25)
+        self.assertEqual(plan["tasks"][1]["start"], "2025-01-06")
+        self.assertEqual(plan["tasks"][1]["end"], "2025-01-08")
+
+    def test_cycles_and_missing_dependencies(self):
+        tasks = [
+            {"id": "a", "title": "A", "dependencies": ["b"]},
+            {"id": "b", "title": "B", "dependencies": ["a"]},
+            {"id": "c", "title": "C", "dependencies": ["a"]},
+            {"id": "d", "title": "D", "dependencies": ["ghost"]},
+        ]
+        plan = self.plan(tasks)
+        self.assertEqual([t["id"] for t in plan["tasks"]], ["d"])
+        self.assertEqual(sorted((u["id"], u["reason"]) for u in plan["unscheduled"]),
+                         [("a", "cycle"), ("b", "cycle"), ("c", "blocked")])
+        self.assertEqual(plan["missing_dependencies"], {"d": ["ghost"]})
+
+    def test_plan_length_is_bounded(self):
+        from .scheduler import MAX_DAYS, ScheduleTooLong, build_schedule
+        tasks = [{"id": "1", "title": "Huge", "estimated_hours": 1e6}]
+        for kwargs in ({"hours_per_day": 8}, {"hours_per_day": 0.01}):
+            with self.assertRaises(ScheduleTooLong):
+                self.plan(tasks, **kwargs)
+        tasks = [{"id": "1", "title": "Long", "estimated_hours": 8.0 * MAX_DAYS}]
+        self.assertEqual(len(self.plan(tasks, hours_per_day=8)["days"]), MAX_DAYS)
+        with self.assertRaises(ScheduleTooLong):
+            build_schedule(tasks, start=datetime.date(9999, 12, 1))
+
+    def test_large_backlog_is_topologically_ordered(self):
+        tasks = make_tasks(3000)
+        plan = self.plan(tasks)
+        position = {t["id"]: i for i, t in enumerate(plan["tasks"])}
+        self.assertEqual(len(position), 3000)
+        for t in tasks:
+            for dep in t["dependencies"]:
+                self.assertLess(position[dep], position[t["id"]])
+
+
+class GraphAnalysisTests(TestCase):
+    tasks = [
+        {"id": "design", "title": "Design", "estimated_hours": 4},
+        {"id": "api", "title": "API", "estimated_hours": 8, "dependencies": ["design"]},
+        {"id": "ui", "title": "UI", "estimated_hours": 2, "dependencies": ["design"]},
+        {"id": "ship", "title": "Ship", "estimated_hours": 1, "dependencies": ["api", "ui", "ghost"]},
+        {"id": "docs", "title": "Docs", "estimated_hours": 1},
+    ]
+
+    def test_critical_path_slack_and_dependents(self):
+        from .graph import analyze_graph
+        graph = analyze_graph(self.tasks)
+        nodes = {node["id"]: node for node in graph["nodes"]}
+        self.assertEqual(graph["critical_path"], ["design", "api", "ship"])
+        self.assertEqual(graph["project_hours"], 13)
+        self.assertEqual(nodes["ui"]["slack"], 6)
+        self.assertEqual(nodes["docs"]["slack"], 12)
+        self.assertTrue(nodes["api"]["critical"])
+        self.assertEqual(nodes["design"]["dependents"], 3)
+        self.assertEqual(nodes["design"]["blocker_hint"], 1.0)
+        self.assertEqual(nodes["docs"]["blocker_hint"], 0.0)
+        self.assertEqual(graph["missing_dependencies"], {"ship": ["ghost"]})
+        self.assertEqual(len(graph["edges"]), 4)
+
+    def test_bounded_counts_above_exact_limit(self):
+        from . import graph
+        tasks = make_tasks(300)
+        exact = graph.analyze_graph(tasks)
+        with mock.patch.object(graph, "EXACT_DESCENDANTS_LIMIT", 10):
+            bounded = graph.analyze_graph(tasks)
+        self.assertTrue(exact["dependents_exact"])
+        self.assertFalse(bounded["dependents_exact"])
+        for a, b in zip(exact["nodes"], bounded["nodes"]):
+            self.assertLessEqual(a["dependents"], b["dependents"])
+
+    def test_subgraph_around_focus(self):
+        from .graph import analyze_graph, subgraph
+        graph = analyze_graph(self.tasks)
+        sub = subgraph(graph, "ui", 1)
+        self.assertEqual([node["id"] for node in sub["nodes"]], ["design", "ui", "ship"])
+        self.assertIsNone(subgraph(graph, "nope", 1))
+
+
+def make_tasks(n, seed=7):
+    rng = random.Random(seed)
+    today = datetime.date.today()
+    tasks = []
+    for i in range(n):
+        due = None
+        if rng.random() > 0.1:
+            due = today + datetime.timedelta(days=rng.randint(-20, 400))
+            if rng.random() < 0.5:
+                due = due.isoformat()
+        tasks.append({
+            "id": str(i),
+            "title": f"Task {i}",
+            "due_date": due,
+            "estimated_hours": rng.choice([0.5, 1, 2, 3.3, 12, 20, rng.random() * 15]),
+            "importance": rng.randint(1, 10),
+            "dependencies": [str(rng.randrange(i))] if i and rng.random() < 0.3 else [],
+        })
+    return tasks
+
+
+@unittest.skipUnless(HAS_NUMPY, "NumPy not installed")
+class DynamicGraphTests(TestCase):
+    def assert_consistent(self, graph, deps):
+        from .scoring import analyze_dependencies
+        truth = analyze_dependencies([{"id": tid, "dependencies": sorted(d)} for tid, d in deps.items()])
+        self.assertEqual(graph.cycles(), truth["cycles"])
+        position = {tid: i for i, tid in enumerate(graph.order())}
+        self.assertEqual(set(position), set(truth["order"]))
+        for tid, d in deps.items():
+            for dep in d:
+                if tid in position and dep in position:
+                    self.assertLess(position[dep], position[tid])
+
+    def test_random_edits_match_full_detection(self):
+        from .dynamic_graph import DynamicGraph
+        rng = random.Random(3)
+        for mode in ("reject", "flag"):
+            for _ in range(40):
+                n = rng.randint(2, 30)
+                deps = {f"t{i}": {f"t{j}" for j in range(n) if rng.random() < 0.05} for i in range(n)}
+                graph = DynamicGraph([{"id": tid, "dependencies": sorted(d)} for tid, d in deps.items()], mode)
+                self.assert_consistent(graph, deps)
+                for _ in range(40):
+                    dep, tid = f"t{rng.randrange(n)}", f"t{rng.randrange(n)}"
+                    if rng.random() < 0.6:
+                        result = graph.add_edge(dep, tid)
+                        if result["status"] == "added":
+                            deps[tid].add(dep)
+                        elif result["status"] == "rejected":
+                            self.assertIn(dep, result["cycle"])
+                    elif graph.remove_edge(dep, tid)["status"] == "removed":
+                        deps[tid].discard(dep)
+                    self.assert_consistent(graph, deps)
+
+    def test_reject_and_flag(self):
+        from .dynamic_graph import DynamicGraph
+        tasks = [{"id": "a"}, {"id": "b", "dependencies": ["a"]}, {"id": "c", "dependencies": ["b"]},
+                 {"id": "d"}]
+        graph = DynamicGraph(tasks, "reject")
+        self.assertEqual(graph.add_edge("c", "a"), {"status": "rejected", "cycle": ["a", "b", "c"]})
+        self.assertEqual(graph.add_edge("a", "a")["status"], "rejected")
+        self.assertEqual(graph.cycles(), [])
+        self.assertEqual(graph.add_edge("d", "a"), {"status": "added", "moved": 0})
+        self.assertEqual(graph.add_edge("c", "d")["status"], "rejected")
+        self.assertEqual(graph.add_edge("x", "a")["status"], "unknown")
+
+        graph = DynamicGraph(tasks, "flag")
+        self.assertEqual(graph.add_edge("c", "a")["cycle"], ["a", "b", "c"])
+        self.assertEqual(graph.order(), ["d"])
+        self.assertEqual(graph.remove_edge("b", "c"), {"status": "removed", "split": 3})
+        self.assertEqual(graph.cycles(), [])
+        self.assertEqual([tid for tid in graph.order() if tid != "d"], ["c", "a", "b"])
+        self.assertEqual(graph.remove_edge("b", "c")["status"], "missing")
+
+
+class VectorizedScoringTests(TestCase):
+    def test_matches_scalar_path(self):
+        from .vectorized import score_tasks_vectorized
+        today = datetime.date.today()
+        tasks = make_tasks(3000)
+        for weights in [(1.0, 1.0, 1.0), (1.68, 1.0, 1.0), (0.3, 2.7, 1.9)]:
+            scalar = [scoring.score_task(t, *weights, today) for t in tasks]
+            batch = score_tasks_vectorized(tasks, *weights, today)
+            self.assertEqual(scalar, batch)
+            self.assertEqual([t["score"].hex() for t in scalar], [t["score"].hex() for t in batch])
+
+    def test_top_k_matches_full_sort(self):
+        tasks = make_tasks(2500)
+        for t in tasks[::3]:
+            t.update(due_date=None, estimated_hours=2, importance=7)   # lots of exact ties
+        full = calculate_scores(tasks, weights={"urgency_weight": 1.0})["tasks"]
+        for k in (1, 3, 50, 5000):
+            top = scoring.top_k_scores(tasks, k=k, weights={"urgency_weight": 1.0})
+            self.assertEqual(top["tasks"], full[:k])
+
+    def test_calculate_scores_picks_path_by_size(self):
+        tasks = make_tasks(scoring.VECTORIZE_THRESHOLD + 5)
+        batch = calculate_scores(tasks, weights={"urgency_weight": 1.2})
+        scoring.VECTORIZE_THRESHOLD, saved = len(tasks) + 1, scoring.VECTORIZE_THRESHOLD
+        try:
+            scalar = calculate_scores(tasks, weights={"urgency_weight": 1.2})
+        finally:
+            scoring.VECTORIZE_THRESHOLD = saved
+        self.assertEqual(scalar, batch)
+
+
+class RankedIndexTests(TestCase):
+    def test_pages_match_filtered_ranking(self):
+        from .indexes import InvalidView, RankedIndex, View
+        ranked = calculate_scores(make_tasks(700), explain=False)["tasks"]
+        index = RankedIndex(ranked)
+        soon = (datetime.date.today() + datetime.timedelta(days=60)).isoformat()
+        views = [
+            {},
+            {"matrix": "Do First"},
+            {"matrix": "Eliminate", "min_score": 0.2, "max_score": 0.5},
+            {"min_score": 0.4, "due_before": soon},
+            {"matrix": "Schedule", "due_after": datetime.date.today().isoformat()},
+        ]
+        for params in views:
+            expected = [t for t in ranked
+                        if params.get("matrix") in (None, t["matrix"])
+                        and params.get("min_score", -1) <= t["score"] <= params.get("max_score", 99)
+                        and ("due_after" not in params or (t["due_date"] or "") >= params["due_after"])
+                        and ("due_before" not in params or (t["due_date"] or "9") <= params["due_before"])]
+            pages, cursor = [], None
+            while True:
+                view = View.from_params({**params, "limit": "37", "cursor": cursor})
+                ranks, cursor, count = index.page(view)
+                self.assertLessEqual(len(ranks), 37)
+                pages += [ranked[r] for r in ranks]
+                if cursor is None:
+                    break
+            self.assertEqual(pages, expected, params)
+            if "due_after" not in params and "due_before" not in params:
+                self.assertEqual(count, len(expected))
+
+        with self.assertRaises(InvalidView):
+            View.from_params({"min_score": "0.6", "max_score": "0.4"})
+        self.assertEqual(index.page(View(min_score=0.6, max_score=0.4)), ([], None, 0))
+
+    def test_invalid_views(self):
+        from .indexes import InvalidView, View
+        self.assertIsNone(View.from_params({"tenant": "acme"}))
+        for params in ({"matrix": "Later"}, {"limit": "0"}, {"limit": "x"}, {"min_score": "nan"},
+                       {"due_after": "tomorrow"}, {"cursor": "!!"}):
+            with self.assertRaises(InvalidView):
+                View.from_params(params)
+
+
+class WhatIfTests(TestCase):
+    def test_rank_matches_calculate_scores(self):
+        from .whatif import WhatIfSession
+        tasks = make_tasks(600)
+        tasks[5]["dependencies"] = ["5"]
+        for numpy in (True, False):
+            with mock.patch("tasks.whatif.HAS_NUMPY", numpy and HAS_NUMPY):
+                session = WhatIfSession(tasks, calendar="US")
+            for weights, strategy in (({"urgency_weight": 1.0}, None), ({"urgency_weight": 0.2}, "impact"),
+                                      ({"importance_weight": 3.1, "effort_weight": 0.7}, "fastest")):
+                expected = calculate_scores(tasks, weights=weights, strategy=strategy, calendar="US")
+                records, total = session.rank(weights, strategy)
+                self.assertEqual([r.to_dict() for r in records], expected["tasks"])
+                self.assertEqual(session.cycles, expected["cycles"])
+                page, _ = session.rank(weights, strategy, offset=10, limit=5)
+                self.assertEqual([r.to_dict() for r in page], expected["tasks"][10:15])
+                self.assertEqual(total, 600)
+
+    def test_components_recomputed_on_new_day(self):
+        from .whatif import WhatIfSession
+        session = WhatIfSession(make_tasks(20))
+        session.columns.day -= datetime.timedelta(days=1)
+        session.rank({"urgency_weight": 1.0})
+        self.assertEqual(session.columns.day, datetime.date.today())
+
+    def test_registry_bounds(self):
+        from .whatif import SessionRegistry, WhatIfSession
+        registry = SessionRegistry(max_sessions=2, max_tasks=25, timeout=60)
+        small, large = WhatIfSession(make_tasks(5)), WhatIfSession(make_tasks(20))
+        first, second = registry.add(small), registry.add(small)
+        registry.get(first)
+        third = registry.add(small)
+        self.assertIsNone(registry.get(second))          # least recently used
+        self.assertIs(registry.get(first), small)
+        registry.add(large)                              # 5 + 5 + 20 tasks > 25
+        self.assertEqual(registry.stats(), {"sessions": 2, "tasks": 25})
+        self.assertIsNone(registry.get(third))
+        self.assertIsNone(registry.add(WhatIfSession(make_tasks(30))))
+        with mock.patch("tasks.whatif.time.monotonic", return_value=time.monotonic() + 61):
+            self.assertIsNone(registry.get(first))
+        self.assertEqual(registry.stats(), {"sessions": 0, "tasks": 0})
+
+
+class PrecomputeTests(TestCase):
+    def setUp(self):
+        from .precompute import recent_requests
+        self.recent = recent_requests
+        recent_requests.clear()
+        get_result_cache().clear()
+        self.addCleanup(recent_requests.clear)
+
+    def test_recent_requests_bounds(self):
+        from .precompute import RecentRequests
+        recent = RecentRequests(max_entries=3, max_bytes=10)
+        for request in ("aaaa", "bbbb", "aaaa", "cc", "dddddd"):
+            recent.remember("suggest", request)
+        recent.remember("suggest", "cc", "acme")   # same request, other tenant
+        self.assertEqual(recent.snapshot(), [("suggest", "cc", "acme"), ("suggest", "dddddd", None),
+                                             ("suggest", "cc", None)])
+        recent.remember("suggest", "x" * 11)
+        self.assertEqual(len(recent.snapshot()), 3)
+
+    def test_worker_warms_recent_requests_when_context_changes(self):
+        from .precompute import PrecomputeWorker, scoring_context
+        client = APIClient()
+        tasks = [{"id": str(i), "title": f"T{i}", "due_date": "2030-01-01"} for i in range(20)]
+        client.post(reverse("analyze"), {"tasks": tasks}, format="json")
+        client.get(reverse("suggest"), {"tasks": json.dumps(tasks), "k": 2})
+        client.get(reverse("suggest"), {"tasks": "[{}]"})           # errors are not replayed
+        self.assertEqual(self.recent.snapshot(), [])                 # nothing kept while disabled
+        with override_settings(TASK_PRECOMPUTE={"ENABLED": True}), \
+                mock.patch("tasks.precompute.start_background_worker"):
+            client.post(reverse("analyze"), {"tasks": tasks}, format="json")
+            client.get(reverse("suggest"), {"tasks": json.dumps(tasks), "k": 2})
+            client.get(reverse("suggest"), {"tasks": "[{}]"})
+        self.assertEqual(len(self.recent.snapshot()), 2)
+
+        reports = []
+        worker = PrecomputeWorker(on_report=reports.append)
+        self.assertEqual(worker.check()["reason"], "startup")
+        self.assertIsNone(worker.check())
+
+        get_result_cache().clear()
+        day, *rest = scoring_context()
+        with mock.patch("tasks.precompute.scoring_context", return_value=(day + datetime.timedelta(days=1), *rest)):
+            report = worker.check()
+        self.assertEqual(report["reason"], "date")
+        jobs = {job["job"]: job for job in report["jobs"]}
+        self.assertEqual((jobs["analyze"]["count"], jobs["suggest"]["count"]), (1, 1))
+        self.assertEqual(jobs["analyze"]["errors"] + jobs["suggest"]["errors"], 0)
+        self.assertEqual((worker.runs, reports[-1]), (2, report))
+
+        hits = get_result_cache().stats()["hits"]
+        client.post(reverse("analyze"), {"tasks": tasks}, format="json")
+        client.get(reverse("suggest"), {"tasks": json.dumps(tasks), "k": 2})
+        self.assertEqual(get_result_cache().stats()["hits"], hits + 2)
+
+    def test_background_worker_is_opt_in_and_per_process(self):
+        from . import precompute
+        self.addCleanup(setattr, precompute, "worker", None)
+        APIClient().get(reverse("metrics"))
+        self.assertIsNone(precompute.worker)   # off by default
+
+        with override_settings(TASK_PRECOMPUTE={"ENABLED": True, "INTERVAL": 3600}), \
+                mock.patch.object(precompute.PrecomputeWorker, "start", lambda w: setattr(w, "pid", os.getpid()) or w):
+            APIClient().get(reverse("metrics"))   # started by the first request
+            first = precompute.worker
+            self.assertEqual((first.store, first.run_at_startup), (False, False))
+            self.assertIs(precompute.start_background_worker(), first)
+            with mock.patch("tasks.precompute.os.getpid", return_value=os.getpid() + 1):   # forked child
+                self.assertIsNot(precompute.start_background_worker(), first)
+        self.assertIsNone(precompute.PrecomputeWorker(run_at_startup=False).check())
+
+    def test_store_and_sessions_are_refreshed(self):
+        from .precompute import run_once
+        from .store import sync_tasks
+        from .whatif import WhatIfSession, get_registry
+        sync_tasks([{"id": "1", "title": "A", "dependencies": []}])
+        session = WhatIfSession(make_tasks(10))
+        get_registry().add(session)
+        self.addCleanup(get_registry().clear)
+        session.columns.day -= datetime.timedelta(days=1)
+        with mock.patch("tasks.store.scoring_context", return_value=((1.0, 1.0, 1.0), datetime.date.today(), "x")):
+            jobs = {job["job"]: job for job in run_once()["jobs"]}
+        self.assertEqual(jobs["store"]["count"], 1)
+        self.assertEqual(jobs["whatif"]["count"], 1)
+        self.assertEqual(session.columns.day, datetime.date.today())
+
+        from django.core.management import call_command
+        out = io.StringIO()
+        call_command("precompute", "--once", stdout=out)
+        self.assertEqual([job["job"] for job in json.loads(out.getvalue())["jobs"]], ["store"])
+
+
+class BatchScoringTests(TestCase):
+    def jobs(self):
+        strategies = [None, "fastest", "impact", "deadline"]
+        jobs = [{"id": f"user-{i}", "tasks": make_tasks(20 + i, seed=i), "strategy": strategies[i % 4],
+                 "weights": {"urgency_weight": 1.0 + i / 10}, "explain": i % 2 == 0} for i in range(9)]
+        for job in jobs:
+            for t in job["tasks"]:
+                if isinstance(t["due_date"], datetime.date):
+                    t["due_date"] = t["due_date"].isoformat()
+        jobs.append({"id": "bad", "tasks": [{"id": "x"}]})
+        jobs.append({"id": "no-id", "tasks": [{"title": "No id"}]})
+        jobs.append({"id": "bad-weights", "tasks": [{"id": "x", "title": "X"}], "weights": [1]})
+        return jobs
+
+    def expected(self, job):
+        if job["id"] == "bad-weights":
+            return {"id": job["id"], "errors": {"weights": ["weights must be an object of numbers"]}}
+        validated, errors = validate_tasks(job["tasks"])
+        if errors:
+            return {"id": job["id"], "errors": errors}
+        if job["id"] == "no-id":
+            return {"id": job["id"], "errors": [{"index": 0, "errors": {"id": ["This field is required."]}}]}
+        return {"id": job["id"], **calculate_scores(validated, weights=job["weights"], strategy=job["strategy"],
+                                                     explain=job["explain"])}
+
+    def test_pool_matches_sequential_scoring(self):
+        from .batch import score_batches
+        jobs = self.jobs()
+        expected = json.loads(json.dumps([self.expected(job) for job in jobs]))
+        for workers in (1, 2):
+            results = list(score_batches(jobs, workers=workers, chunk_size=3))
+            self.assertEqual(json.loads(json.dumps(results)), expected)
+
+        unordered = list(score_batches(jobs, workers=2, chunk_size=1, ordered=False))
+        self.assertEqual(sorted(r["id"] for r in unordered), sorted(job["id"] for job in jobs))
+
+    def test_score_batch_command(self):
+        from django.core.management import call_command
+        with tempfile.TemporaryDirectory() as tmp:
+            source, target = os.path.join(tmp, "jobs.ndjson"), os.path.join(tmp, "out.ndjson")
+            with open(source, "w") as f:
+                for job in self.jobs()[:3]:
+                    f.write(json.dumps(job) + "\n")
+            call_command("score_batch", source, output=target, workers=2, stderr=io.StringIO())
+            with open(target) as f:
+                results = [json.loads(line) for line in f]
+        self.assertEqual([r["id"] for r in results], ["user-0", "user-1", "user-2"])
+        self.assertTrue(all(r["tasks"] for r in results))
+
+
+class WeightsProviderTests(TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".json")
+        os.close(fd)
+        self.addCleanup(os.remove, self.path)
+        self.write({"urgency_weight": 1.5})
+
+    def write(self, data, mtime_ns=None):
+        with open(self.path, "w") as f:
+            json.dump(data, f)
+        if mtime_ns is not None:
+            os.utime(self.path, ns=(mtime_ns, mtime_ns))
+
+    def test_reads_file_once_until_it_changes(self):
+        provider = WeightsProvider(self.path)
+        for _ in range(5):
+            self.assertEqual(provider.get()["urgency_weight"], 1.5)
+        self.assertEqual(provider.stats(), {"hits": 4, "misses": 1})
+
+        self.write({"urgency_weight": 2.5}, mtime_ns=os.stat(self.path).st_mtime_ns + 10**9)
+        self.assertEqual(provider.get()["urgency_weight"], 2.5)
+        self.assertEqual(provider.stats(), {"hits": 4, "misses": 2})
+
+    def test_invalidate_and_returned_copies(self):
+        provider = WeightsProvider(self.path)
+        provider.get()["urgency_weight"] = 99
+        self.assertEqual(provider.get()["urgency_weight"], 1.5)
+        provider.invalidate()
+        provider.get()
+        self.assertEqual(provider.stats()["misses"], 2)
+
+    def test_missing_file_uses_defaults(self):
+        provider = WeightsProvider(self.path + ".missing")
+        self.assertEqual(provider.get()["effort_weight"], 1.0)
+        provider.get()
+        self.assertEqual(provider.stats(), {"hits": 1, "misses": 1})
+
+
+class WeightStoreTests(TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".json")
+        os.close(fd)
+        os.remove(self.path)
+        self.addCleanup(lambda: [os.remove(p) for p in (self.path, self.path + ".lock") if os.path.exists(p)])
+
+    def test_batches_deltas_until_flush(self):
+        store = WeightStore(self.path, WeightsProvider(self.path), batch_size=3, flush_interval=60)
+        projected = store.record_feedback(2, True)
+        self.assertAlmostEqual(projected["urgency_weight"], 1.04)
+        store.record_feedback(0, False)
+        self.assertFalse(os.path.exists(self.path))
+
+        projected = store.record_feedback(1, True)   # third delta triggers a flush
+        self.assertEqual(store.flushes, 1)
+        self.assertEqual(read_weights_file(self.path), projected)
+        self.assertAlmostEqual(projected["importance_weight"], 1.04)
+
+    def test_concurrent_feedback_loses_nothing(self):
+        stores = [WeightStore(self.path, WeightsProvider(self.path), batch_size=4, flush_interval=60) for _ in range(4)]
+
+        def click(store):
+            for _ in range(25):
+                store.record_feedback(1, True)
+            store.flush()
+
+        threads = [threading.Thread(target=click, args=(s,)) for s in stores]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertAlmostEqual(read_weights_file(self.path)["urgency_weight"], 1.0 + 0.02 * 100)
+
+
+class TenantWeightStoreTests(TestCase):
+    def setUp(self):
+        from .tenants import TenantWeightStore
+        self.store = TenantWeightStore(shards=4, max_tenants=8, ttl=30)
+
+    def test_feedback_moves_only_that_tenant(self):
+        from .models import TenantWeights
+        from .tenants import learned_weights
+        before = learned_weights()
+        weights = self.store.record_feedback("acme", 2, True)
+        self.assertAlmostEqual(weights["urgency_weight"], 1.04)
+        self.assertEqual(self.store.get("acme"), weights)
+        self.assertEqual(self.store.get("globex"), {"urgency_weight": 1.0, "importance_weight": 1.0, "effort_weight": 1.0})
+        self.assertEqual(learned_weights(), before)
+        self.assertEqual(TenantWeights.objects.get(tenant_id="acme").urgency_weight, weights["urgency_weight"])
+
+        for _ in range(100):
+            weights = self.store.record_feedback("acme", 0, False)
+        self.assertAlmostEqual(weights["importance_weight"], 0.1)   # floor
+        self.assertEqual(self.store.version, 101)
+
+    def test_sharded_lru_and_ttl(self):
+        from .models import TenantWeights
+        for i in range(40):
+            self.store.get(f"t{i}")
+        self.assertLessEqual(self.store.stats()["tenants"], 8)
+
+        self.store.record_feedback("acme", 1, True)
+        TenantWeights.objects.filter(tenant_id="acme").update(effort_weight=3.0)   # another worker's write
+        self.assertEqual(self.store.get("acme")["effort_weight"], 1.0)
+        with mock.patch("tasks.tenants.time.monotonic", return_value=time.monotonic() + 31):
+            self.assertEqual(self.store.get("acme")["effort_weight"], 3.0)
+
+    def test_clean_tenant(self):
+        from .tenants import InvalidTenant, clean_tenant
+        self.assertIsNone(clean_tenant(""))
+        self.assertEqual(clean_tenant("acme"), "acme")
+        for value in ("x" * 256, 42):
+            with self.assertRaises(InvalidTenant):
+                clean_tenant(value)
+
+
+class BulkValidationTests(TestCase):
+    def serializer_loop(self, tasks):
+        validated, errors = [], []
+        for i, t in enumerate(tasks):
+            s = TaskInputSerializer(data=t)
+            if s.is_valid():
+                validated.append(dict(s.validated_data))
+            else:
+                errors.append({"index": i, "errors": s.errors})
+        return validated, errors
+
+    def test_matches_serializer(self):
+        tasks = [
+            {"id": "1", "title": "Plain", "due_date": "2025-03-04", "estimated_hours": 2,
+             "importance": 7, "dependencies": ["a", " b "]},
+            {"title": "  padded  ", "due_date": "", "importance": 10},
+            {"id": 5, "title": "Numeric id", "due_date": None, "estimated_hours": "3.5"},
+            {"title": "Fuzzy date", "due_date": "March 4 2025"},
+            {"title": "Compact date", "due_date": "20250304"},
+            {"title": "Bad date", "due_date": "2025-02-30"},
+            {"title": "", "importance": 11},
+            {"title": "Bool hours", "estimated_hours": True, "importance": False},
+            {"title": "Zero hours", "estimated_hours": 0},
+            {"title": "Null importance", "importance": None},
+            {"title": "Bad deps", "dependencies": "a,b"},
+            {"title": "Blank dep", "dependencies": ["a", " "]},
+            {"title": "Nul\x00char"},
+            {"title": "Lone \ud800 surrogate"},
+            {"title": "Unicode ✓", "id": "ü"},
+            ["not", "a", "dict"],
+        ]
+        validated, errors = validate_tasks(tasks)
+        expected_validated, expected_errors = self.serializer_loop(tasks)
+        self.assertEqual([dict(v) for v in validated], expected_validated)
+        self.assertEqual(errors, expected_errors)
+        self.assertEqual([e["index"] for e in errors], [5, 6, 7, 8, 9, 10, 11, 12, 13, 15])
+
+    def test_generated_backlog_matches_serializer(self):
+        tasks = make_tasks(300)
+        for t in tasks:
+            if isinstance(t["due_date"], datetime.date):
+                t["due_date"] = t["due_date"].isoformat()
+        validated, errors = validate_tasks(tasks)
+        self.assertEqual(([dict(v) for v in validated], errors), self.serializer_loop(tasks))
+
+
+class TaskStoreTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.tasks = make_tasks(60)
+        for t in self.tasks:
+            if isinstance(t["due_date"], datetime.date):
+                t["due_date"] = t["due_date"].isoformat()
+        patcher = mock.patch.object(weight_store.provider, "get", return_value={"urgency_weight": 1.3})
+        self.get_weights = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def sync(self, tasks, **extra):
+        res = self.client.post(reverse("store-sync"), {"tasks": tasks, **extra}, format="json")
+        self.assertEqual(res.status_code, 200, res.data)
+        return res.data
+
+    def test_only_changed_tasks_are_rescored(self):
+        self.assertEqual(self.sync(self.tasks)["created"], 60)
+        again = self.sync(self.tasks)
+        self.assertEqual((again["unchanged"], again["rescored"]), (60, 0))
+
+        self.tasks[5]["importance"] = 1 if self.tasks[5]["importance"] != 1 else 2
+        changed = self.sync(self.tasks[:10], replace=True)
+        self.assertEqual((changed["updated"], changed["rescored"], changed["deleted"]), (1, 1, 50))
+
+        self.get_weights.return_value = {"urgency_weight": 2.0}
+        self.assertEqual(self.sync(self.tasks[:10])["rescored"], 10)
+
+    def test_ranked_queries_match_calculate_scores(self):
+        self.sync(self.tasks)
+        expected = calculate_scores(validate_tasks(self.tasks)[0])["tasks"]
+
+        res = self.client.get(reverse("store-tasks"), {"limit": 20})
+        self.assertEqual(res.data["total"], 60)
+        self.assertEqual(res.data["tasks"], expected[:20])
+
+        res = self.client.get(reverse("store-tasks"), {"matrix": "Do First", "limit": 500})
+        self.assertEqual(res.data["tasks"], [t for t in expected if t["matrix"] == "Do First"])
+
+    def test_sync_requires_ids(self):
+        res = self.client.post(reverse("store-sync"), {"tasks": [{"title": "No id"}]}, format="json")
+        self.assertEqual(res.status_code, 400)
+        self.assertEqual(res.data["errors"][0]["index"], 0)
+        res = self.client.post(reverse("store-sync"), {"tasks": self.tasks[:2] + self.tasks[1:2]}, format="json")
+        self.assertEqual(res.status_code, 400)
+        self.assertEqual(res.data["errors"], [{"index": 2, "errors": {"id": ["Duplicate id."]}}])
+        res = self.client.get(reverse("store-tasks"), {"due_before": "someday"})
+        self.assertEqual(res.status_code, 400)
+
+
+class ResultCacheTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        get_result_cache().clear()
+        self.addCleanup(get_result_cache().clear)
+        self.payload = {"tasks": [
+            {"id": "1", "title": "A", "due_date": None, "importance": 8},
+            {"id": "2", "title": "B", "due_date": None, "importance": 3},
+        ]}
+
+    def test_repeated_analyze_is_served_from_cache(self):
+        url = reverse("analyze")
+        before = get_result_cache().stats()
+        with mock.patch("tasks.services.calculate_scores", wraps=calculate_scores) as scorer:
+            first = self.client.post(url, self.payload, format="json")
+            second = self.client.post(url, self.payload, format="json")
+            self.assertEqual(scorer.call_count, 1)
+            self.assertEqual(first.json(), second.json())
+
+            with mock.patch.object(weight_store.provider, "get", return_value={"urgency_weight": 3.0}):
+                self.client.post(url, self.payload, format="json")
+            self.assertEqual(scorer.call_count, 2)
+
+        stats = get_result_cache().stats()
+        self.assertEqual((stats["hits"] - before["hits"], stats["misses"] - before["misses"]), (1, 2))
+
+    def test_errors_are_not_cached(self):
+        url = reverse("analyze")
+        bad = {"tasks": [{"title": ""}]}
+        self.assertEqual(self.client.post(url, bad, format="json").status_code, 400)
+        self.assertEqual(self.client.post(url, bad, format="json").status_code, 400)
+        self.assertEqual(get_result_cache().stats()["entries"], 0)
+
+    def test_lru_respects_entry_and_byte_limits(self):
+        cache = LocalResultCache(max_entries=3, max_bytes=100)
+        for i in range(4):
+            cache.set(i, f"v{i}", size=10)
+        self.assertIsNone(cache.get(0))
+        self.assertEqual(cache.get(1), "v1")
+        cache.set("big", "x", size=85)   # evicts least recently used until under 100 bytes
+        self.assertEqual([cache.get(k) for k in (2, 3, 1, "big")], [None, None, "v1", "x"])
+        cache.set("huge", "y", size=101)
+        self.assertIsNone(cache.get("huge"))
+
+    def test_entries_are_sized_by_result(self):
+        from .cache import result_size
+        from .renderers import dumps
+        result = calculate_scores(make_tasks(2000), explain=True)
+        actual = len(dumps(result))
+        self.assertAlmostEqual(result_size(result), actual, delta=actual * 0.1)
+        self.assertEqual(result_size({"suggestions": []}), len(dumps({"suggestions": []})))
+
+        body = self.client.post(reverse("analyze"), {"tasks": make_tasks(50), "explain": True}, format="json").json()
+        self.assertEqual(get_result_cache().stats()["bytes"], len(dumps(body)))
+
+    @override_settings(TASK_RESULT_CACHE={"BACKEND": "django", "ALIAS": "default"})
+    def test_django_cache_backend(self):
+        url = reverse("suggest")
+        params = {"tasks": json.dumps(self.payload["tasks"])}
+        first = self.client.get(url, params)
+        second = self.client.get(url, params)
+        self.assertEqual(first.json(), second.json())
+        self.assertEqual(get_result_cache().stats(), {"hits": 1, "misses": 1})
+
+
+class InstrumentationTests(TestCase):
+    def setUp(self):
+        get_result_cache().clear()
+        self.addCleanup(get_result_cache().clear)
+        self.payload = {"tasks": [{"id": "1", "title": "A", "dependencies": ["2"]},
+                                  {"id": "2", "title": "B"}],
+                        "weights": {"urgency_weight": 1.0}}
+
+    def test_server_timing_and_metrics(self):
+        client = APIClient()
+        res = client.post(reverse("analyze"), self.payload, format="json")
+        stages = {part.split(";")[0] for part in res["Server-Timing"].split(", ")}
+        self.assertTrue({"cache", "parse", "validate", "score", "cycles", "render", "total"} <= stages)
+
+        text = client.get(reverse("metrics")).content.decode()
+        self.assertIn('task_analyzer_stage_seconds_count{endpoint="analyze",stage="score"}', text)
+        self.assertIn('task_analyzer_items_total{endpoint="analyze",kind="edges"}', text)
+        self.assertIn("task_analyzer_result_cache_misses_total", text)
+
+    def test_stage_is_a_noop_outside_requests(self):
+        from .instrumentation import NULL_STAGE, stage
+        self.assertIs(stage("score"), NULL_STAGE)
+
+    def test_profile_dump_on_request(self):
+        with tempfile.TemporaryDirectory() as tmp, \
+                override_settings(TASK_INSTRUMENTATION=False, TASK_PROFILING=True, TASK_PROFILE_DIR=tmp):
+            client = APIClient()
+            plain = client.post(reverse("analyze"), self.payload, format="json")
+            self.assertNotIn("X-Profile-Dump", plain)
+            self.assertNotIn("Server-Timing", plain)
+            res = client.post(reverse("analyze") + "?profile=1", self.payload, format="json")
+            self.assertTrue(os.path.exists(res["X-Profile-Dump"]))
+
+
+class RendererTests(TestCase):
+    data = {"tasks": [{"id": "1", "title": "Caf\u00e9 \u2603", "score": 0.125, "due_date": datetime.date(2030, 1, 2),
+                       "hours": decimal.Decimal("1.5"), "dependencies": []}], "cycles": [], "count": 2 ** 40}
+
+    def test_matches_stock_renderer(self):
+        from rest_framework.renderers import JSONRenderer
+        from .renderers import FastJSONRenderer, dumps
+        expected = json.loads(JSONRenderer().render(self.data))
+        self.assertEqual(json.loads(FastJSONRenderer().render(self.data)), expected)
+        self.assertEqual(json.loads(dumps(self.data)), expected)
+        with mock.patch("tasks.renderers.orjson", None):
+            self.assertEqual(FastJSONRenderer().render(self.data), JSONRenderer().render(self.data))
+            self.assertEqual(json.loads(dumps(self.data)), expected)
+        self.assertEqual(FastJSONRenderer().render(None), b"")
+
+    def test_parser(self):
+        from rest_framework.exceptions import ParseError
+        from .renderers import FastJSONParser
+        body = json.dumps({"tasks": [{"title": "\u00e9"}]}).encode()
+        for fallback in (False, True):
+            with mock.patch("tasks.renderers.orjson", None) if fallback else contextlib.nullcontext():
+                self.assertEqual(FastJSONParser().parse(io.BytesIO(body)), json.loads(body))
+                with self.assertRaises(ParseError):
+                    FastJSONParser().parse(io.BytesIO(b"{oops"))
+
 
 class APITests(TestCase):
     def setUp(self):
         self.client = APIClient()
+        fd, path = tempfile.mkstemp(suffix=".json")
+        os.close(fd)
+        os.remove(path)
+        self.addCleanup(lambda: [os.remove(p) for p in (path, path + ".lock") if os.path.exists(p)])
+        for patcher in (mock.patch.object(weight_store, "path", path),
+                        mock.patch.object(weight_store.provider, "path", path)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(weight_store.provider.invalidate)
+        self.addCleanup(weight_store.flush)
+
+    def test_schedule_endpoint(self):
+        payload = {
+            "tasks": [
+                {"id": "1", "title": "A", "estimated_hours": 6, "dependencies": ["2"]},
+                {"id": "2", "title": "B", "estimated_hours": 4},
+            ],
+            "hours_per_day": 6,
+            "start_date": "2025-01-04",
+        }
+        res = self.client.post(reverse("schedule"), payload, format="json")
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual([t["id"] for t in res.data["tasks"]], ["2", "1"])
+        self.assertEqual(res.data["days"][0]["date"], "2025-01-06")
+
+        payload["hours_per_day"] = 0
+        res = self.client.post(reverse("schedule"), payload, format="json")
+        self.assertEqual(res.status_code, 400)
+
+        payload["hours_per_day"] = 6
+        for bad in ({"tasks": [{"id": "1", "title": "Huge", "estimated_hours": 1e6}], "hours_per_day": 0.01},
+                    {"tasks": [{"title": "No id"}]},
+                    {"tasks": payload["tasks"] + [{"id": "2", "title": "Again"}]},
+                    {"weights": [1]}, {"weights": {"urgency_weight": "x"}}):
+            res = self.client.post(reverse("schedule"), {**payload, **bad}, format="json")
+            self.assertEqual(res.status_code, 400, bad)
+        self.assertEqual(res.data["detail"], "weights must be an object of numbers")
+
+    def test_graph_endpoint_pages_nodes(self):
+        tasks = [{"id": str(i), "title": f"T{i}", "dependencies": [str(i - 1)] if i else []} for i in range(5)]
+        res = self.client.post(reverse("graph"), {"tasks": tasks, "offset": 1, "limit": 2}, format="json")
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual([n["id"] for n in res.data["nodes"]], ["1", "2"])
+        self.assertEqual(res.data["edges"], [{"from": "0", "to": "1"}, {"from": "1", "to": "2"}])
+        self.assertEqual(res.data["total"], 5)
+        self.assertEqual(res.data["critical_path"], ["0", "1", "2", "3", "4"])
+
+        res = self.client.post(reverse("graph"), {"tasks": tasks, "focus": "9"}, format="json")
+        self.assertEqual(res.status_code, 404)
+
+    async def test_async_views_match_sync_views(self):
+        from django.test import AsyncClient
+        get_result_cache().clear()
+        tasks = [{"id": "1", "title": "A", "due_date": "2030-01-01", "dependencies": ["2"]},
+                 {"id": "2", "title": "B", "estimated_hours": 3, "dependencies": ["1"]}]
+        client = AsyncClient()
+        for name, body in (("analyze", {"tasks": tasks}), ("graph", {"tasks": tasks})):
+            res = await client.post(reverse(f"async-{name}"), body, content_type="application/json")
+            self.assertEqual(res.status_code, 200)
+            self.assertIn("validate", res["Server-Timing"])
+            get_result_cache().clear()
+            sync = await sync_to_async(self.client.post)(reverse(name), body, format="json")
+            self.assertEqual(res.json(), sync.json())
+
+        res = await client.get(reverse("async-suggest"), {"tasks": json.dumps(tasks), "k": "1"})
+        self.assertEqual(len(res.json()["suggestions"]), 1)
+        res = await client.get(reverse("async-suggest"), {"tasks": json.dumps(tasks), "k": "1"},
+                               headers={"If-None-Match": res["ETag"]})
+        self.assertEqual(res.status_code, 304)
+        res = await client.get(reverse("async-suggest"), {"k": "x"})
+        self.assertEqual(res.status_code, 400)
+
+        res = await client.post(reverse("async-feedback"), {"selected": ["1"], "helpful": True},
+                                content_type="application/json")
+        self.assertEqual(res.json()["message"], "Feedback applied")
+
+        res = await client.post(reverse("async-analyze"), "{oops", content_type="application/json")
+        self.assertEqual(res.status_code, 400)
+        for bad in ({"tasks": tasks, "weights": [1]}, {"tasks": [{"title": "No id"}]}, tasks):
+            res = await client.post(reverse("async-analyze"), bad, content_type="application/json")
+            self.assertEqual(res.status_code, 400, bad)
+        res = await client.get(reverse("async-analyze"))
+        self.assertEqual(res.status_code, 405)
+
+    def test_calendar_param(self):
+        tasks = [{"id": "1", "title": "A", "due_date": "2030-11-28"}]
+        res = self.client.post(reverse("analyze"), {"tasks": tasks, "calendar": "US"}, format="json")
+        self.assertEqual(res.status_code, 200)
+        res = self.client.post(reverse("analyze"), {"tasks": tasks, "calendar": "XX"}, format="json")
+        self.assertEqual(res.status_code, 400)
+        res = self.client.get(reverse("suggest"), {"tasks": json.dumps(tasks), "calendar": ["1"]})
+        self.assertEqual(res.status_code, 400)
 
     def test_analyze_endpoint(self):
         url = reverse("analyze")
@@ -74,6 +1108,15 @@ class APITests(TestCase):
         res = self.client.post(url, payload, format="json")
         self.assertEqual(res.status_code, 200)
         self.assertIn("tasks", res.data)
+        self.assertNotIn("reason", res.data["tasks"][0])
+
+        res = self.client.post(url, {**payload, "explain": True}, format="json")
+        self.assertIn("Importance: 8", res.data["tasks"][0]["reason"])
+
+        for bad in ({**payload, "weights": [1]}, {**payload, "weights": {"urgency_weight": "x"}},
+                    {"tasks": [{"title": "No id"}]}, payload["tasks"]):
+            res = self.client.post(url, bad, format="json")
+            self.assertEqual(res.status_code, 400, bad)
 
     def test_suggest_endpoint(self):
         url = reverse("suggest")
@@ -104,6 +1147,196 @@ class APITests(TestCase):
         self.assertIn("suggestions", res.data)
         self.assertLessEqual(len(res.data["suggestions"]), 3)
 
+        res = self.client.get(url, {"tasks": json.dumps(tasks), "k": 1})
+        self.assertEqual([s["id"] for s in res.data["suggestions"]], ["1"])
+        res = self.client.get(url, {"tasks": json.dumps(tasks), "k": "zero"})
+        self.assertEqual(res.status_code, 400)
+
+    def test_analyze_filtered_pages(self):
+        tasks = make_tasks(120)
+        url = reverse("analyze")
+        full = self.client.post(url, {"tasks": tasks}, format="json").data["tasks"]
+        schedule = [t for t in full if t["matrix"] == "Schedule"]
+
+        res = self.client.post(url + "?matrix=Schedule&limit=5", {"tasks": tasks}, format="json")
+        self.assertEqual(res.data["tasks"], schedule[:5])
+        self.assertEqual(res.data["count"], len(schedule))
+        self.assertIn("cycles", res.data)
+        res = self.client.post(f"{url}?matrix=Schedule&limit=5&cursor={res.data['next_cursor']}",
+                               {"tasks": tasks}, format="json")
+        self.assertEqual(res.data["tasks"], schedule[5:10])
+
+        res = self.client.post(url + "?min_score=0.5&limit=1000", {"tasks": tasks}, format="json")
+        self.assertEqual(res.data["tasks"], [t for t in full if t["score"] >= 0.5])
+        self.assertIsNone(res.data["next_cursor"])
+        self.assertEqual(self.client.post(url + "?matrix=Someday", {"tasks": tasks}, format="json").status_code, 400)
+        res = self.client.post(url + "?min_score=0.6&max_score=0.4", {"tasks": tasks}, format="json")
+        self.assertEqual(res.status_code, 400)
+
+    def test_analyze_stream_endpoint(self):
+        tasks = make_tasks(40)
+        for t in tasks:
+            if isinstance(t["due_date"], datetime.date):
+                t["due_date"] = t["due_date"].isoformat()
+        tasks[3]["dependencies"] = ["4"]
+        tasks[4]["dependencies"] = ["3"]
+        lines = [json.dumps(t) for t in tasks]
+        lines[10] = "{not json"
+        lines[12] = json.dumps({"title": "No id"})
+        lines.insert(5, "")
+        res = self.client.post(reverse("analyze-stream") + "?strategy=impact",
+                               data="\n".join(lines), content_type="application/x-ndjson")
+        self.assertEqual(res.status_code, 200)
+        records = [json.loads(line) for line in b"".join(res.streaming_content).splitlines()]
+
+        summary = records.pop()
+        self.assertEqual(summary["type"], "summary")
+        self.assertEqual([r["index"] for r in records], list(range(40)))
+        self.assertEqual([r["type"] for r in records].count("error"), 2)
+        self.assertEqual(records[12]["errors"], {"id": ["This field is required."]})
+
+        valid = [t for i, t in enumerate(tasks) if i not in (10, 12)]
+        expected = calculate_scores(validate_tasks(valid)[0], strategy="impact")
+        self.assertEqual(summary["ranking"], [t["id"] for t in expected["tasks"]])
+        self.assertEqual(summary["cycles"], expected["cycles"])
+        self.assertEqual(summary["count"], 38)
+        self.assertNotIn("reason", records[0]["task"])
+
+        res = self.client.post(reverse("analyze-stream") + "?explain=1",
+                               data=lines[0], content_type="application/x-ndjson", HTTP_ACCEPT_ENCODING="gzip")
+        self.assertFalse(res.has_header("Content-Encoding"))   # not buffered by GZipMiddleware
+        self.assertIn("reason", json.loads(b"".join(res.streaming_content).splitlines()[0])["task"])
+        for weights in ("[1]", '{"urgency_weight": "x"}', "{oops"):
+            res = self.client.post(reverse("analyze-stream") + "?weights=" + weights,
+                                   data=lines[0], content_type="application/x-ndjson")
+            self.assertEqual(res.status_code, 400)
+
+    def test_analyze_cycles_and_gzip(self):
+        tasks = [{"id": str(i), "title": f"T{i}", "dependencies": [str(1 - i)]} for i in range(2)]
+        tasks += [{"id": str(i), "title": f"T{i}"} for i in range(2, 200)]
+        res = self.client.post(reverse("analyze"), {"tasks": tasks}, format="json")
+        self.assertEqual(set(res.json()), {"warning", "cycles", "tasks"})
+        self.assertEqual(res.json()["cycles"], [["0", "1"]])
+
+        res = self.client.post(reverse("analyze"), {"tasks": tasks}, format="json", HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(res["Content-Encoding"], "gzip")
+        self.assertEqual(len(json.loads(gzip.decompress(res.content))["tasks"]), 200)
+
+    def test_backlog_handle_and_conditional_suggest(self):
+        get_result_cache().clear()
+        tasks = [{"id": str(i), "title": f"T{i}", "importance": i % 10 + 1} for i in range(500)]
+        res = self.client.post(reverse("backlogs"), {"tasks": tasks}, format="json")
+        self.assertEqual(res.status_code, 201)
+        handle = res.data["backlog"]
+        reordered = [{k: t[k] for k in reversed(list(t))} for t in tasks]
+        res = self.client.post(reverse("backlogs"), reordered, format="json")
+        self.assertEqual((res.status_code, res.data["backlog"], res.data["count"]), (200, handle, 500))
+
+        params = {"backlog": handle, "k": 2, "strategy": "impact"}
+        res = self.client.get(reverse("suggest"), params)
+        self.assertEqual([s["id"] for s in res.data["suggestions"]], ["9", "19"])
+        etag = res["ETag"]
+        with mock.patch("tasks.services.top_k_scores") as scored, \
+                mock.patch("tasks.services.get_backlog_store") as store:
+            res = self.client.get(reverse("suggest"), params, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(res.status_code, 304)
+            self.assertEqual(res.content, b"")
+            res = self.client.get(reverse("suggest"), params, HTTP_IF_NONE_MATCH=f'"other", W/{etag}')
+            self.assertEqual(res.status_code, 304)
+        scored.assert_not_called()
+        store.assert_not_called()
+
+        res = self.client.get(reverse("suggest"), {**params, "k": 3}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, 200)
+        self.assertNotEqual(res["ETag"], etag)
+        res = self.client.get(reverse("suggest"), {"backlog": "0" * 32})
+        self.assertEqual(res.status_code, 404)
+        res = self.client.post(reverse("backlogs"), {"tasks": [{"id": "1"}]}, format="json")
+        self.assertEqual(res.status_code, 400)
+        res = self.client.post(reverse("backlogs"), {"tasks": [{"title": "No id"}]}, format="json")
+        self.assertEqual(res.status_code, 400)
+        self.assertEqual(res.data["errors"][0]["errors"], {"id": ["This field is required."]})
+        for tasks in ('[{"title": "No id"}]', "5", '{"id": "1"}'):
+            res = self.client.get(reverse("suggest"), {"tasks": tasks})
+            self.assertEqual(res.status_code, 400, tasks)
+
+    def test_suggest_rejects_bad_weights(self):
+        for weights in ("{oops", "[1, 2]", '{"urgency_weight": "x"}'):
+            res = self.client.get(reverse("suggest"), {"tasks": "[]", "weights": weights})
+            self.assertEqual(res.status_code, 400)
+
+    def test_graph_session(self):
+        tasks = [{"id": "a", "title": "A"}, {"id": "b", "title": "B", "dependencies": ["a"]},
+                 {"id": "c", "title": "C", "dependencies": ["b"]}]
+        res = self.client.post(reverse("graph-sessions"), {"tasks": tasks, "mode": "flag"}, format="json")
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual((res.data["edges"], res.data["cycles"]), (2, []))
+        url = reverse("graph-session", args=[res.data["session"]])
+
+        res = self.client.post(url, {"add": [{"from": "c", "to": "a"}]}, format="json")
+        self.assertEqual(res.data["results"][0]["cycle"], ["a", "b", "c"])
+        self.assertEqual(res.data["cycles"], [["a", "b", "c"]])
+        res = self.client.post(url, {"remove": [{"from": "c", "to": "a"}], "add": [{"from": "c", "to": "zz"}]},
+                               format="json")
+        self.assertEqual([r["status"] for r in res.data["results"]], ["removed", "unknown"])
+        self.assertEqual(self.client.get(url).data["order"], ["a", "b", "c"])
+
+        self.assertEqual(self.client.post(url, {"add": [["a", "b"]]}, format="json").status_code, 400)
+        self.assertEqual(self.client.post(reverse("graph-sessions"), {"tasks": tasks, "mode": "x"},
+                                          format="json").status_code, 400)
+        self.assertEqual(self.client.delete(url).status_code, 204)
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_whatif_session(self):
+        tasks = [{"id": str(i), "title": f"T{i}", "importance": i % 10 + 1, "estimated_hours": 12 - i % 12}
+                 for i in range(30)]
+        res = self.client.post(reverse("whatif"), {"tasks": tasks, "limit": 3}, format="json")
+        self.assertEqual(res.status_code, 200)
+        session = res.data["session"]
+        self.assertEqual((len(res.data["tasks"]), res.data["total"]), (3, 30))
+
+        url = reverse("whatif-session", args=[session])
+        for strategy in ("fastest", "impact"):
+            res = self.client.post(url, {"strategy": strategy, "explain": True}, format="json")
+            analyzed = self.client.post(reverse("analyze"), {"tasks": tasks, "strategy": strategy, "explain": True},
+                                        format="json")
+            self.assertEqual(res.data["tasks"], analyzed.data["tasks"])
+        for weights in ([1], {"urgency_weight": "x"}):
+            self.assertEqual(self.client.post(url, {"weights": weights}, format="json").status_code, 400)
+
+        self.assertEqual(self.client.delete(url).status_code, 204)
+        self.assertEqual(self.client.post(url, {}, format="json").status_code, 404)
+        res = self.client.post(reverse("whatif"), {"tasks": [{"id": "1"}]}, format="json")
+        self.assertEqual(res.status_code, 400)
+        res = self.client.post(reverse("whatif"), {"tasks": [{"title": "No id"}]}, format="json")
+        self.assertEqual(res.data["errors"][0]["errors"], {"id": ["This field is required."]})
+        with mock.patch("tasks.services.get_whatif_registry") as registry:
+            res = self.client.post(reverse("whatif"), {"tasks": tasks, "weights": {"urgency_weight": "x"}},
+                                   format="json")
+        self.assertEqual(res.status_code, 400)
+        registry.assert_not_called()
+
+    @override_settings(TASK_TENANT_WEIGHTS={"SHARDS": 2, "MAX_TENANTS": 100, "TTL": 30})
+    def test_tenant_weights(self):
+        tasks = [{"id": "slow", "title": "Big", "due_date": None, "estimated_hours": 40, "importance": 10},
+                 {"id": "quick", "title": "Small", "due_date": None, "estimated_hours": 1, "importance": 2}]
+        url = reverse("analyze")
+        plain = self.client.post(url, {"tasks": tasks}, format="json").data
+        for _ in range(40):
+            res = self.client.post(reverse("feedback"), {"selected": ["slow"], "helpful": True, "tenant": "acme"},
+                                   format="json")
+        self.assertEqual(res.data["tenant"], "acme")
+        self.assertGreater(res.data["weights"]["importance_weight"], 1.5)
+
+        tenant = self.client.post(url, {"tasks": tasks}, format="json", headers={"X-Tenant-ID": "acme"}).data
+        self.assertGreater(tenant["tasks"][0]["score"], plain["tasks"][0]["score"])
+        self.assertEqual(self.client.post(url, {"tasks": tasks}, format="json").data, plain)
+        res = self.client.get(reverse("suggest"), {"tasks": json.dumps(tasks), "tenant": "acme"})
+        self.assertEqual(res.data["suggestions"][0]["score"], tenant["tasks"][0]["score"])
+
+        res = self.client.post(url, {"tasks": tasks}, format="json", headers={"X-Tenant-ID": "x" * 300})
+        self.assertEqual(res.status_code, 400)
+
     def test_feedback_endpoint(self):
         url = reverse("feedback")
         res = self.client.post(
@@ -113,3 +1346,7 @@ class APITests(TestCase):
         )
         self.assertEqual(res.status_code, 200)
         self.assertIn("weights", res.data)
+
+        for bad in ({"selected": 5}, {"selected": "12"}, {"selected": [{"id": "1"}]}, ["1"]):
+            res = self.client.post(url, bad, format="json")
+            self.assertEqual(res.status_code, 400, bad)
@@ -1,16 +1,52 @@
+from django.conf import settings
 from django.urls import path
+from . import async_views
 from .views import (
     AnalyzeTasksView,
+    analyze_stream,
     suggest_tasks,
+    upload_backlog,
+    schedule_tasks,
+    store_sync,
+    store_tasks,
+    whatif_session,
+    whatif_sessions,
     task_graph,       # NEW
+    graph_session,
+    graph_sessions,
     feedback,         # NEW
+    metrics_view,
 )
 
+# Under ASGI (task_analyzer/asgi.py) the main routes use the async views
+if settings.TASK_ASYNC_VIEWS:
+    analyze_view, suggest_view, graph_view, feedback_view = (
+        async_views.analyze, async_views.suggest, async_views.graph, async_views.feedback)
+else:
+    analyze_view, suggest_view, graph_view, feedback_view = (
+        AnalyzeTasksView.as_view(), suggest_tasks, task_graph, feedback)
+
 urlpatterns = [
-    path('analyze/', AnalyzeTasksView.as_view(), name='analyze'),
-    path('suggest/', suggest_tasks, name='suggest'),
+    path('analyze/', analyze_view, name='analyze'),
+    path('analyze/stream/', analyze_stream, name='analyze-stream'),
+    path('suggest/', suggest_view, name='suggest'),
+    path('backlogs/', upload_backlog, name='backlogs'),
+    path('schedule/', schedule_tasks, name='schedule'),
+    path('store/sync/', store_sync, name='store-sync'),
+    path('store/tasks/', store_tasks, name='store-tasks'),
+    path('whatif/', whatif_sessions, name='whatif'),
+    path('whatif/<str:session>/', whatif_session, name='whatif-session'),
 
     # NEW BONUS ENDPOINTS
-    path('graph/', task_graph, name='graph'),
-    path('feedback/', feedback, name='feedback'),
-]
\ No newline at end of file
+    path('graph/', graph_view, name='graph'),
+    path('graph/sessions/', graph_sessions, name='graph-sessions'),
+    path('graph/sessions/<str:session>/', graph_session, name='graph-session'),
+    path('feedback/', feedback_view, name='feedback'),
+    path('metrics/', metrics_view, name='metrics'),
+
+    # Async implementations, always reachable (e.g. for side-by-side load tests)
+    path('async/analyze/', async_views.analyze, name='async-analyze'),
+    path('async/suggest/', async_views.suggest, name='async-suggest'),
+    path('async/graph/', async_views.graph, name='async-graph'),
+    path('async/feedback/', async_views.feedback, name='async-feedback'),
+]
@@ -0,0 +1,172 @@
+"""
+Columnar NumPy scoring engine used by calculate_scores for large task lists.
+
+Tasks are parsed once into arrays (due-date ordinals, hours, importance),
+urgency / importance / effort / final score / Eisenhower quadrant are
+computed as array operations, and the result is bit-identical to
+scoring.score_task applied task by task.
+"""
+import datetime
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; calculate_scores falls back to the scalar loop
+    np = None
+
+from .records import TaskRecord, to_dicts
+from .scoring import get_calendar
+
+HAS_NUMPY = np is not None
+
+# Indexed by important * 2 + urgent
+QUADRANTS = ("Eliminate", "Delegate", "Schedule", "Do First")
+
+
+class TaskColumns:
+    """Struct-of-arrays view of a task list, parsed in a single pass."""
+
+    def __init__(self, tasks):
+        self.ids = []
+        self.titles = []
+        self.due_dates = []  # due_date exactly as emitted in the output
+        self.deps = []
+        due = []  # date ordinal, 0 when no due date
+        hours = []
+        importance = []
+
+        parsed = {}  # many tasks share a due date; parse each value once
+        for t in tasks:
+            self.ids.append(t["id"])
+            self.titles.append(t["title"])
+            due_date = t.get("due_date")
+            if due_date:
+                hit = parsed.get(due_date)
+                if hit is None:
+                    d = datetime.date.fromisoformat(due_date) if isinstance(due_date, str) else due_date
+                    hit = parsed[due_date] = (d.toordinal(), d.isoformat())
+                due.append(hit[0])
+                self.due_dates.append(hit[1])
+            else:
+                due.append(0)
+                self.due_dates.append(due_date)
+            hours.append(float(t.get("estimated_hours") or 1.0))
+            importance.append(int(t.get("importance") or 5))
+            self.deps.append(t.get("dependencies") or [])
+
+        self.due = np.array(due, dtype=np.int64)
+        self.has_due = self.due > 0
+        self.hours = np.array(hours, dtype=np.float64)
+        self.importance = np.array(importance, dtype=np.int64)
+
+
+def working_days_through(ordinals, calendar):
+    """Vector form of BusinessCalendar.working_days_through."""
+    table = np.array(calendar.week_table, dtype=np.int64)
+    prefix = np.array(calendar.holiday_prefix, dtype=np.int64)
+    weeks, rest = np.divmod(ordinals, 7)
+    k = np.clip(ordinals - calendar.base + 1, 0, calendar.span)
+    return weeks * table[7] + table[rest] - prefix[k]
+
+
+def holiday_flags(ordinals, calendar):
+    """Vector form of BusinessCalendar.is_holiday."""
+    if not calendar.span:
+        return np.zeros(len(ordinals), dtype=bool)
+    bitmap = np.frombuffer(calendar.holiday_bitmap, dtype=np.uint8)
+    k = ordinals - calendar.base
+    inside = (k >= 0) & (k < calendar.span)
+    return inside & (bitmap[np.clip(k, 0, calendar.span - 1)] == 1)
+
+
+def urgency_scores(cols, now, calendar):
+    """Vector form of the urgency block in scoring.score_task."""
+    now_ord = now.toordinal()
+    due = cols.due
+    overdue = cols.has_due & (due < now_ord)
+
+    # business_days_between(now, due) for due > now, else 0
+    through_now = calendar.working_days_through(now_ord)
+    days_left = np.where(due > now_ord, working_days_through(due, calendar) - through_now, 0)
+
+    urgency = np.maximum(0.0, np.minimum(1.0, 1.0 - (days_left / 10.0)))
+    weekend_days = np.array([d in calendar.weekend for d in range(7)])
+    weekend = weekend_days[(due - 1) % 7]
+    holiday = holiday_flags(due, calendar)
+    urgency = urgency + np.where(weekend, 0.1, 0.0)
+    urgency = urgency + np.where(holiday, 0.15, 0.0)
+    urgency = np.where(overdue, 1.0, urgency)
+    urgency = np.where(cols.has_due, urgency, 0.2)
+    return np.maximum(0.0, np.minimum(1.0, urgency))
+
+
+def round3(values):
+    """
+    Elementwise round(x, 3) with Python's exact semantics.
+
+    rint(x * 1000) / 1000 agrees with round() except when x * 1000 lands
+    within rounding error of a .5 boundary (or is huge / non-finite); those
+    few elements are re-rounded in Python.
+    """
+    scaled = values * 1000.0
+    out = np.rint(scaled) / 1000.0
+    tol = np.maximum(np.abs(scaled), 1.0) * 1e-12
+    suspect = ~(np.abs(scaled) < 2.0 ** 52) | (np.abs(scaled - np.floor(scaled) - 0.5) <= tol)
+    for i in np.flatnonzero(suspect).tolist():
+        out[i] = round(float(values[i]), 3)
+    return out
+
+
+def component_scores(cols, now, calendar=None):
+    """returns: (urgency, importance_score, effort_score) arrays"""
+    urgency = urgency_scores(cols, now, calendar or get_calendar())
+    importance_score = np.clip(cols.importance, 1, 10) / 10.0
+    effort = 1.0 - (np.minimum(cols.hours, 12.0) / 12.0)
+    return urgency, importance_score, effort
+
+
+def combine_scores(urgency, importance_score, effort, uw, iw, ew):
+    """Weighted, normalized and rounded final score array."""
+    denom = uw + iw + ew if (uw + iw + ew) > 0 else 1.0
+    return round3((uw * urgency + iw * importance_score + ew * effort) / denom)
+
+
+def quadrants(importance, urgency):
+    index = (importance >= 6).astype(np.int64) * 2 + (urgency >= 0.6)
+    return [QUADRANTS[q] for q in index.tolist()]
+
+
+def score_records_vectorized(tasks, uw, iw, ew, now, calendar=None):
+    """Batch equivalent of [score_record(t, uw, iw, ew, now, calendar) for t in tasks]."""
+    cols = TaskColumns(tasks)
+    urgency, importance_score, effort = component_scores(cols, now, calendar)
+    scores = combine_scores(urgency, importance_score, effort, uw, iw, ew)
+    matrix = quadrants(cols.importance, urgency)
+
+    return list(map(
+        TaskRecord, cols.ids, cols.titles, cols.due_dates, cols.hours.tolist(), cols.importance.tolist(),
+        cols.deps, scores.tolist(), matrix, urgency.tolist(), effort.tolist(),
+    ))
+
+
+def score_tasks_vectorized(tasks, uw, iw, ew, now, calendar=None):
+    """Batch equivalent of [score_task(t, uw, iw, ew, now, calendar) for t in tasks]."""
+    return to_dicts(score_records_vectorized(tasks, uw, iw, ew, now, calendar))
+
+
+def top_k_indices(tasks, k, uw, iw, ew, now, calendar=None):
+    """
+    Indices of the k best tasks, in the order a stable descending sort by
+    score would put them. A partial selection finds the k-th best score;
+    only the tasks at or above it are sorted.
+    """
+    cols = TaskColumns(tasks)
+    scores = combine_scores(*component_scores(cols, now, calendar), uw, iw, ew)
+    if k <= 0:
+        return []
+    if k < len(scores):
+        threshold = -np.partition(-scores, k - 1)[k - 1]
+        candidates = np.flatnonzero(scores >= threshold)
+    else:
+        candidates = np.arange(len(scores))
+    order = candidates[np.argsort(-scores[candidates], kind="stable")]
+    return order[:k].tolist()
@@ -1,11 +1,48 @@
-from rest_framework.views import APIView
-from rest_framework.response import Response
-from rest_framework import status
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
 from rest_framework.decorators import api_view
-from .serializers import TaskInputSerializer
-from .scoring import calculate_scores, load_user_weights, WEIGHTS_FILE
-import json
-import os
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from . import precompute, services
+from .cache import get_result_cache
+from .instrumentation import metrics
+from .renderers import loads
+from .scoring import resolve_weights
+from .services import flag, resolve_calendar
+from .streaming import stream_scores
+from .tenants import TENANT_HEADER, get_tenant_store
+from .weights import weights_provider
+
+###############################################################################
+# INSTRUMENTATION
+###############################################################################
+
+def metrics_view(request):
+    """
+    GET /api/tasks/metrics/
+    Prometheus text: per-stage latency histograms, request / task / edge
+    counters, and weights-, tenant-weights- and result-cache hit counters.
+    """
+    weights = weights_provider.stats()
+    tenants = get_tenant_store().stats()
+    results = get_result_cache().stats()
+    worker = precompute.worker
+    text = metrics.render([
+        ("task_analyzer_weights_cache_hits_total", "Learned-weights reads served from memory.", weights["hits"]),
+        ("task_analyzer_weights_cache_misses_total", "Learned-weights reads that parsed the file.", weights["misses"]),
+        ("task_analyzer_tenant_weights_cache_hits_total", "Tenant-weights reads served from memory.", tenants["hits"]),
+        ("task_analyzer_tenant_weights_cache_misses_total", "Tenant-weights reads that queried the database.",
+         tenants["misses"]),
+        ("task_analyzer_result_cache_hits_total", "analyze/suggest responses served from the result cache.", results["hits"]),
+        ("task_analyzer_result_cache_misses_total", "analyze/suggest requests computed in full.", results["misses"]),
+        ("task_analyzer_precompute_runs_total", "Background precompute runs.", worker.runs if worker else 0),
+        ("task_analyzer_precompute_seconds_total", "Time spent in background precompute runs.",
+         worker.seconds if worker else 0),
+    ])
+    return HttpResponse(text, content_type="text/plain; version=0.0.4")
+
 
 ###############################################################################
 # ANALYZE VIEW
@@ -14,42 +51,58 @@ import os
 class AnalyzeTasksView(APIView):
     """
     POST /api/tasks/analyze/
-    Body: { "tasks": [ ... ], "weights": {...} (optional), "strategy": "fastest|impact|deadline|smart" (optional) }
-    Returns sorted tasks with scores and explanation, plus cycle detection info.
+    Body: { "tasks": [ ... ], "weights": {...} (optional), "strategy": "fastest|impact|deadline|smart" (optional),
+            "calendar": "IN|US|GB" (optional, holiday calendar region), "explain": true (optional) }
+    Header: X-Tenant-ID (optional, or ?tenant=) scores with that tenant's learned weights
+    Params (optional): matrix=Do First|Schedule|Delegate|Eliminate, min_score, max_score,
+            due_after, due_before (YYYY-MM-DD), limit (default 50), cursor
+    Returns sorted tasks with scores (and, with explain, the reason for each
+    score), plus cycle detection info. With any of the params, only one page
+    of the matching tasks, with "count" and the "next_cursor" to pass back.
     """
     def post(self, request):
-        payload = request.data or {}
-        tasks = payload.get('tasks') or []
-        weights = payload.get('weights')
-        strategy = payload.get('strategy')
-
-        if not isinstance(tasks, list):
-            return Response({"detail": "tasks must be a list"}, status=status.HTTP_400_BAD_REQUEST)
+        tenant, error = services.resolve_tenant(request.headers.get(TENANT_HEADER), request.GET.get('tenant'))
+        if error:
+            return Response(*error)
+        view, error = services.resolve_view(request.query_params)
+        if error:
+            return Response(*error)
+        body, code = services.analyze(request.content_type.encode() + b'\n' + request.body,
+                                      lambda: request.data, tenant, view)
+        return Response(body, status=code)
 
-        # Validate tasks
-        validated = []
-        errors = []
-        for i, t in enumerate(tasks):
-            s = TaskInputSerializer(data=t)
-            if s.is_valid():
-                validated.append(s.validated_data)
-            else:
-                errors.append({'index': i, 'errors': s.errors})
 
-        if errors:
-            return Response({'detail': 'validation_error', 'errors': errors},
-                            status=status.HTTP_400_BAD_REQUEST)
+###############################################################################
+# STREAMING ANALYZE VIEW (NDJSON)
+###############################################################################
 
-        result = calculate_scores(validated, weights=weights, strategy=strategy)
+@csrf_exempt
+@require_POST
+def analyze_stream(request):
+    """
+    POST /api/tasks/analyze/stream/?strategy=...&weights={...}&calendar=...&explain=1
+    Body: one task JSON object per line (application/x-ndjson)
+    Streams one scored task (or validation error) per line in input order,
+    then a summary line with the ranking and detected cycles.
+    Plain Django view so the body is read line by line, never parsed whole.
+    """
+    weights_param = request.GET.get('weights')
+    try:
+        weights = loads(weights_param) if weights_param else None
+    except ValueError:
+        return JsonResponse({'detail': 'invalid weights JSON'}, status=400)
+    error = services.weights_error(weights)
+    if error:
+        return JsonResponse(error[0], status=error[1])
 
-        if result['cycles']:
-            return Response({
-                'warning': 'circular_dependencies_detected',
-                'cycles': result['cycles'],
-                'result': result
-            }, status=status.HTTP_200_OK)
+    calendar, error = resolve_calendar(request.GET.get('calendar'))
+    if error:
+        return JsonResponse(error[0], status=error[1])
 
-        return Response(result, status=status.HTTP_200_OK)
+    uw, iw, ew = resolve_weights(weights, request.GET.get('strategy'))
+    return StreamingHttpResponse(stream_scores(request, uw, iw, ew, calendar=calendar,
+                                               explain=flag(request.GET.get('explain'))),
+                                 content_type='application/x-ndjson')
 
 
 ###############################################################################
@@ -60,53 +113,111 @@ class AnalyzeTasksView(APIView):
 def suggest_tasks(request):
     """
     GET /api/tasks/suggest/
-    Params: tasks=[...] (JSON), strategy=str, weights={}
-    Returns top 3 suggestion tasks.
+    Params: tasks=[...] (JSON) or backlog=handle (see /backlogs/), strategy=str, weights={},
+            k=int (default 3), calendar=str, tenant=str (or X-Tenant-ID header)
+    Returns top k suggestion tasks, with an ETag; polls sending it back in
+    If-None-Match get 304 Not Modified while the result is unchanged.
     """
-    tasks_param = request.query_params.get('tasks')
-    strategy = request.query_params.get('strategy')
-    weights_param = request.query_params.get('weights')
+    tenant, error = services.resolve_tenant(request.headers.get(TENANT_HEADER), request.GET.get('tenant'))
+    if error:
+        return Response(*error)
+    body, code, etag = services.suggest(request.META.get('QUERY_STRING', ''), request.query_params,
+                                        request.headers.get('If-None-Match'), tenant)
+    return services.conditional(Response(body, status=code), etag)
 
-    # Parse tasks
-    try:
-        tasks = json.loads(tasks_param) if tasks_param else []
-    except Exception:
-        return Response({'detail': 'invalid tasks JSON'}, status=status.HTTP_400_BAD_REQUEST)
 
-    # Parse weights
-    try:
-        weights = json.loads(weights_param) if weights_param else None
-    except Exception:
-        weights = None
+@api_view(['POST'])
+def upload_backlog(request):
+    """
+    POST /api/tasks/backlogs/
+    Body: { "tasks": [ ... ] } (or a bare list)
+    Validates and stores the tasks; returns { "backlog": handle, "count": n },
+    201 when new, 200 when the same backlog was already stored.
+    """
+    body, code = services.upload_backlog(request.data)
+    return Response(body, status=code)
+
+
+###############################################################################
+# DEPENDENCY-AWARE SCHEDULE
+###############################################################################
+
+@api_view(["POST"])
+def schedule_tasks(request):
+    """
+    POST /api/tasks/schedule/
+    Body: { "tasks": [ ... ], "hours_per_day": 8 (optional), "start_date": "YYYY-MM-DD" (optional),
+            "weights": {...} (optional), "strategy": "..." (optional), "calendar": "US" (optional) }
+    Every task needs a unique id.
+    Returns a day-by-day plan: blockers always come before the tasks that
+    depend on them, otherwise higher scores go first. Tasks on (or behind)
+    a dependency cycle are listed as unscheduled.
+    """
+    body, code = services.schedule(request.data)
+    return Response(body, status=code)
+
+
+###############################################################################
+# WHAT-IF SESSIONS
+###############################################################################
 
-    # Validate tasks
-    validated = []
-    errors = []
-    for i, t in enumerate(tasks):
-        s = TaskInputSerializer(data=t)
-        if s.is_valid():
-            validated.append(s.validated_data)
-        else:
-            errors.append({'index': i, 'errors': s.errors})
+@api_view(["POST"])
+def whatif_sessions(request):
+    """
+    POST /api/tasks/whatif/
+    Body: { "tasks": [ ... ], "calendar": "US" (optional), plus the re-rank fields below }
+    Validates and scores the backlog once and opens a session for it.
+    Returns { "session": "...", "tasks": [...], "cycles": [...], "total", "offset", "limit" }.
+    """
+    body, code = services.whatif_open(request.data)
+    return Response(body, status=code)
 
-    if errors:
-        return Response({'detail': 'validation_error', 'errors': errors},
-                        status=status.HTTP_400_BAD_REQUEST)
 
-    result = calculate_scores(validated, weights=weights, strategy=strategy)
-    top3 = result['tasks'][:3]
+@api_view(["POST", "DELETE"])
+def whatif_session(request, session):
+    """
+    POST /api/tasks/whatif/<session>/
+    Body: { "weights": {...} (optional), "strategy": "..." (optional), "explain": true (optional),
+            "offset": 0, "limit": n (optional, default all) }
+    Re-ranks the session's tasks for new weights without revalidating or
+    re-scoring them; same order and scores as /analyze/.
+    DELETE closes the session.
+    """
+    if request.method == "DELETE":
+        body, code = services.whatif_close(session)
+    else:
+        body, code = services.whatif_rank(session, request.data)
+    return Response(body, status=code)
 
-    suggestions = [{
-        'id': t['id'],
-        'title': t['title'],
-        'score': t['score'],
-        'explanation': t['reason'],
-    } for t in top3]
 
-    return Response({
-        'suggestions': suggestions,
-        'cycles': result['cycles'],
-    }, status=200)
+###############################################################################
+# PERSISTENT TASK STORE
+###############################################################################
+
+
+@api_view(["POST"])
+def store_sync(request):
+    """
+    POST /api/tasks/store/sync/
+    Body: { "tasks": [ ... ], "replace": false }
+    Upserts tasks by id into the persistent store. Only new or changed tasks
+    (and tasks scored under outdated weights/date) are re-scored.
+    With "replace": true, stored tasks missing from the body are deleted.
+    Every task needs a unique id.
+    """
+    body, code = services.store_sync(request.data)
+    return Response(body, status=code)
+
+
+@api_view(["GET"])
+def store_tasks(request):
+    """
+    GET /api/tasks/store/tasks/
+    Params: matrix=str, due_before=YYYY-MM-DD, due_after=YYYY-MM-DD, offset=int, limit=int (default 20)
+    Returns stored tasks by descending score, read from the score indexes.
+    """
+    body, code = services.store_tasks(request.query_params)
+    return Response(body, status=code)
 
 
 ###############################################################################
@@ -117,60 +228,63 @@ def suggest_tasks(request):
 def task_graph(request):
     """
     POST /api/tasks/graph/
-    Body: { "tasks": [...] }
-    Returns a dependency graph for visualization.
+    Body: { "tasks": [...], "focus": "id" (optional), "depth": 2, "offset": 0, "limit": 2000 }
+    Returns a dependency graph for visualization, annotated with the
+    hours-weighted critical path, per-task slack and transitive dependent
+    counts (with a 0..1 blocker_hint for tasks holding up many others).
+    Edges to unknown ids are dropped and reported in missing_dependencies.
+    With "focus", only tasks within "depth" hops of that task are returned;
+    otherwise nodes are paged by offset/limit along with their incoming edges.
     """
-    tasks = request.data.get("tasks", [])
+    body, code = services.graph(request.data)
+    return Response(body, status=code)
+
 
-    nodes = []
-    edges = []
+@api_view(["POST"])
+def graph_sessions(request):
+    """
+    POST /api/tasks/graph/sessions/
+    Body: { "tasks": [ ... ], "mode": "reject|flag" (optional, default reject) }
+    Builds the dependency graph once and opens a session for editing its edges.
+    Returns { "session": "...", "mode", "tasks", "edges", "cycles": [...] }.
+    """
+    body, code = services.graph_session_open(request.data)
+    return Response(body, status=code)
 
-    for t in tasks:
-        nodes.append({"id": t["id"], "label": t["title"]})
-        for dep in t.get("dependencies", []):
-            edges.append({"from": dep, "to": t["id"]})
 
-    return Response({"nodes": nodes, "edges": edges})
+@api_view(["GET", "POST", "DELETE"])
+def graph_session(request, session):
+    """
+    POST /api/tasks/graph/sessions/<session>/
+    Body: { "remove": [{"from": dependency id, "to": task id}, ...], "add": [...] }
+    Updates the topological order and cycles incrementally; an edge that
+    would close a cycle is rejected, or (mode "flag") added and its cycle
+    reported. Returns per-edge "results", "edges" and "cycles".
+    GET returns the current "order" and "cycles"; DELETE closes the session.
+    """
+    if request.method == "DELETE":
+        body, code = services.graph_session_close(session)
+    elif request.method == "GET":
+        body, code = services.graph_session_state(session)
+    else:
+        body, code = services.graph_session_edit(session, request.data)
+    return Response(body, status=code)
 
 
 ###############################################################################
 # BONUS: LEARNING SYSTEM FEEDBACK
 ###############################################################################
 
-def save_user_weights(w):
-    with open(WEIGHTS_FILE, "w") as f:
-        json.dump(w, f)
-
-
 @api_view(["POST"])
 def feedback(request):
     """
     POST /api/tasks/feedback/
-    Body: { "selected": ["id1","id2"], "helpful": true/false }
-    Adjusts scoring weights based on whether suggestions were helpful.
+    Body: { "selected": ["id1","id2"], "helpful": true/false, "tenant": str (optional) }
+    Adjusts scoring weights based on whether suggestions were helpful; with a
+    tenant (body, X-Tenant-ID header or ?tenant=) only that tenant's weights.
     """
-    selected = request.data.get("selected", [])
-    helpful = request.data.get("helpful", True)
-
-    weights = load_user_weights()
-
-    # Simple learning logic:
-    # If user says helpful -> boost urgency & importance slightly
-    # If not helpful       -> reduce them slightly (down to a floor)
-    delta = 0.02 * len(selected) if selected else 0.02
-
-    if helpful:
-        weights["urgency_weight"] += delta
-        weights["importance_weight"] += delta
-    else:
-        weights["urgency_weight"] = max(0.1, weights["urgency_weight"] - delta)
-        weights["importance_weight"] = max(0.1, weights["importance_weight"] - delta)
-
-    save_user_weights(weights)
-
-    return Response({
-        "message": "Feedback applied",
-        "weights": weights,
-        "helpful": helpful,
-        "selected": selected,
-    })
+    tenant, error = services.resolve_tenant(request.headers.get(TENANT_HEADER), request.GET.get('tenant'))
+    if error:
+        return Response(*error)
+    body, code = services.feedback(request.data, tenant)
+    return Response(body, status=code)
@@ -0,0 +1,245 @@
+import atexit
+import json
+import os
+import tempfile
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows: writes are only serialized within one process
+    fcntl = None
+
+# --------------------------------------------------------------------
+# Weights file for learning system
+# --------------------------------------------------------------------
+WEIGHTS_FILE = os.path.join(os.path.dirname(__file__), "user_weights.json")
+
+DEFAULT_WEIGHTS = {
+    "urgency_weight": 1.0,
+    "importance_weight": 1.0,
+    "effort_weight": 1.0,
+}
+
+
+def read_weights_file(path):
+    """Parse a weights file, or fall back to defaults."""
+    if os.path.exists(path):
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+                return {
+                    "urgency_weight": float(data.get("urgency_weight", 1.0)),
+                    "importance_weight": float(data.get("importance_weight", 1.0)),
+                    "effort_weight": float(data.get("effort_weight", 1.0)),
+                }
+        except Exception:
+            pass
+    return dict(DEFAULT_WEIGHTS)
+
+
+# --------------------------------------------------------------------
+# In-process cache
+# --------------------------------------------------------------------
+class WeightsProvider:
+    """
+    Keeps the parsed weights file in memory.
+
+    Every get() does a single stat() and only re-reads the file when its
+    (mtime, size, inode) signature changed. Writers in this process call
+    invalidate() so the next read never waits for mtime granularity.
+    """
+
+    def __init__(self, path=WEIGHTS_FILE):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._weights = None
+        self._signature = None
+
+    def _stat_signature(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def get(self):
+        signature = self._stat_signature()
+        with self._lock:
+            if self._weights is not None and signature == self._signature:
+                self.hits += 1
+                return dict(self._weights)
+            self.misses += 1
+
+        # Signature is taken before reading, so a concurrent write can only
+        # cause one extra reload, never a stale cache entry.
+        weights = read_weights_file(self.path)
+        with self._lock:
+            self._weights = weights
+            self._signature = signature
+        return dict(weights)
+
+    def invalidate(self):
+        with self._lock:
+            self._weights = None
+            self._signature = None
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+
+weights_provider = WeightsProvider()
+
+
+def load_user_weights():
+    """Load user-tuned weights, or fall back to defaults."""
+    return weights_provider.get()
+
+
+# --------------------------------------------------------------------
+# Concurrent-safe writes with batched write-behind
+# --------------------------------------------------------------------
+FEEDBACK_STEP = 0.02
+WEIGHT_FLOOR = 0.1
+
+
+def feedback_delta(selected_count):
+    return FEEDBACK_STEP * selected_count if selected_count else FEEDBACK_STEP
+
+
+def apply_feedback(weights, selected_count, helpful):
+    """
+    Simple learning logic:
+    If user says helpful -> boost urgency & importance slightly
+    If not helpful       -> reduce them slightly (down to a floor)
+    """
+    delta = feedback_delta(selected_count)
+
+    if helpful:
+        weights["urgency_weight"] += delta
+        weights["importance_weight"] += delta
+    else:
+        weights["urgency_weight"] = max(WEIGHT_FLOOR, weights["urgency_weight"] - delta)
+        weights["importance_weight"] = max(WEIGHT_FLOOR, weights["importance_weight"] - delta)
+    return weights
+
+
+class _FileLock:
+    """Exclusive flock on a sidecar file, shared by every worker process."""
+
+    _local = threading.Lock()
+
+    def __init__(self, path):
+        self.path = path
+        self._fd = None
+
+    def __enter__(self):
+        self._local.acquire()
+        if fcntl is not None:
+            self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
+        self._local.release()
+
+
+def write_weights_file(path, weights):
+    """Write to a temp file in the same directory, fsync, then rename over path."""
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=".weights-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(weights, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+class WeightStore:
+    """
+    Process- and thread-safe writer for the weights file.
+
+    Feedback is queued in memory and flushed in batches: once `batch_size`
+    deltas are pending, or `flush_interval` seconds after the first one.
+    A flush takes an exclusive lock, re-reads the file, applies the deltas
+    in order and atomically replaces the file, so concurrent workers never
+    lose updates and readers never see a half-written file. Anything still
+    pending is flushed at interpreter exit.
+    """
+
+    def __init__(self, path=WEIGHTS_FILE, provider=weights_provider, batch_size=32, flush_interval=1.0):
+        self.path = path
+        self.provider = provider
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.flushes = 0
+        self.flushed_deltas = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending = []
+        self._inflight = []
+        self._timer = None
+
+    def record_feedback(self, selected_count, helpful):
+        """Queue one feedback delta; returns the weights as they will be after it is flushed."""
+        with self._lock:
+            self._pending.append((selected_count, helpful))
+            flush_now = len(self._pending) >= self.batch_size
+            if not flush_now and self._timer is None:
+                self._timer = threading.Timer(self.flush_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+            projected = self.provider.get()
+            for delta in self._inflight + self._pending:
+                apply_feedback(projected, *delta)
+        if flush_now:
+            self.flush()
+        return projected
+
+    def flush(self):
+        """Write all pending deltas; returns how many were applied."""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, []
+                self._inflight = batch
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+            if not batch:
+                return 0
+
+            try:
+                with _FileLock(self.path + ".lock"):
+                    weights = read_weights_file(self.path)
+                    for delta in batch:
+                        apply_feedback(weights, *delta)
+                    write_weights_file(self.path, weights)
+            finally:
+                self.provider.invalidate()
+                with self._lock:
+                    self._inflight = []
+
+            self.flushes += 1
+            self.flushed_deltas += len(batch)
+            return len(batch)
+
+    def save(self, weights):
+        """Replace the stored weights, after flushing anything queued."""
+        self.flush()
+        with _FileLock(self.path + ".lock"):
+            write_weights_file(self.path, weights)
+        self.provider.invalidate()
+
+
+weight_store = WeightStore()
+atexit.register(weight_store.flush)
@@ -0,0 +1,201 @@
+"""
+What-if sessions: re-rank one backlog under changing weights / strategy.
+
+Only the final weighted sum depends on the weights; urgency, importance,
+effort, the Eisenhower quadrant and the dependency cycles do not. A
+WhatIfSession validates and scores a backlog once, keeps those
+components as arrays, and answers each rank() with a single
+combine_scores pass and a sort, so dragging a weight slider never
+revalidates the tasks or redoes any date math. The components are
+recomputed only when the date changes.
+
+Sessions live in an in-process LRU (settings.TASK_WHATIF_SESSIONS):
+    {"MAX_SESSIONS": 64, "MAX_TASKS": 1_000_000, "TIMEOUT": 1800}
+bounded by session count, total tasks held, and idle seconds.
+"""
+import datetime
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from types import SimpleNamespace
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+from .instrumentation import stage
+from .records import TaskRecord
+from .scoring import detect_cycles, eisenhower_category, get_calendar, resolve_weights, task_components, weighted_score
+from .vectorized import HAS_NUMPY
+
+if HAS_NUMPY:
+    import numpy as np
+
+    from .vectorized import TaskColumns, combine_scores, component_scores, quadrants
+
+DEFAULT_CONFIG = {
+    "MAX_SESSIONS": 64,
+    "MAX_TASKS": 1_000_000,
+    "TIMEOUT": 30 * 60,
+}
+
+
+def components(tasks, now, calendar):
+    """Weight-independent per-task state (columns) for one day."""
+    with stage("score"):
+        if HAS_NUMPY:
+            cols = TaskColumns(tasks)
+            urgency, importance_score, effort = component_scores(cols, now, calendar)
+            return SimpleNamespace(
+                day=now, vectorized=True, due_dates=cols.due_dates, hours=cols.hours.tolist(), importance=cols.importance.tolist(),
+                urgency=urgency, importance_score=importance_score, effort=effort,
+                matrix=quadrants(cols.importance, urgency),
+            )
+        parts = [task_components(t, now, calendar) for t in tasks]
+        return SimpleNamespace(
+            day=now,
+            vectorized=False,
+            due_dates=[d.isoformat() if isinstance(d, datetime.date) else d for d, *_ in parts],
+            hours=[p[1] for p in parts],
+            importance=[p[2] for p in parts],
+            urgency=[p[3] for p in parts],
+            importance_score=[p[4] for p in parts],
+            effort=[p[5] for p in parts],
+            matrix=[eisenhower_category(p[2], p[3]) for p in parts],
+        )
+
+
+class WhatIfSession:
+    def __init__(self, tasks, calendar=None):
+        """tasks: validated task dicts; calendar: region code or BusinessCalendar"""
+        self.tasks = tasks
+        self.calendar = get_calendar(calendar)
+        with stage("cycles"):
+            self.cycles = detect_cycles(tasks)
+        self.columns = components(tasks, datetime.date.today(), self.calendar)
+
+    def __len__(self):
+        return len(self.tasks)
+
+    def refresh(self):
+        """Recompute the components if the date changed (rank() would do it on first use)."""
+        today = datetime.date.today()
+        if self.columns.day != today:
+            self.columns = components(self.tasks, today, self.calendar)
+
+    def rank(self, weights=None, strategy=None, offset=0, limit=None):
+        """
+        Same ranking as calculate_scores(tasks, weights, strategy, calendar).
+        returns: (TaskRecords for ranks [offset, offset + limit), total)
+        """
+        c = self.columns
+        today = datetime.date.today()
+        if c.day != today:
+            c = self.columns = components(self.tasks, today, self.calendar)
+        uw, iw, ew = resolve_weights(weights, strategy)
+        end = len(self.tasks) if limit is None else offset + limit
+
+        with stage("rank"):
+            if c.vectorized:
+                scores = combine_scores(c.urgency, c.importance_score, c.effort, uw, iw, ew)
+                # Stable, like calculate_scores' list.sort(reverse=True)
+                order = np.argsort(-scores, kind="stable")[offset:end]
+                page = order.tolist()
+                picked = (scores[order].tolist(), c.urgency[order].tolist(), c.effort[order].tolist())
+            else:
+                scores = [weighted_score(u, i, e, uw, iw, ew)
+                          for u, i, e in zip(c.urgency, c.importance_score, c.effort)]
+                page = sorted(range(len(scores)), key=lambda k: -scores[k])[offset:end]
+                picked = ([scores[k] for k in page], [c.urgency[k] for k in page], [c.effort[k] for k in page])
+
+        tasks = self.tasks
+        records = [TaskRecord(tasks[k]["id"], tasks[k]["title"], c.due_dates[k], c.hours[k], c.importance[k],
+                              tasks[k].get("dependencies") or [], score, c.matrix[k], urgency, effort)
+                   for k, score, urgency, effort in zip(page, *picked)]
+        return records, len(tasks)
+
+
+class SessionRegistry:
+    """In-process LRU of WhatIfSessions, keyed by an unguessable token."""
+
+    def __init__(self, max_sessions=64, max_tasks=1_000_000, timeout=30 * 60):
+        self.max_sessions = max_sessions
+        self.max_tasks = max_tasks
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._sessions = OrderedDict()  # token -> (session, last used)
+        self._tasks = 0
+
+    def _expire(self, now):
+        while self._sessions:
+            token, (session, used) = next(iter(self._sessions.items()))
+            if now - used <= self.timeout:
+                break
+            del self._sessions[token]
+            self._tasks -= len(session)
+
+    def add(self, session):
+        """returns: the new session's token, or None if it is too large to keep"""
+        if len(session) > self.max_tasks:
+            return None
+        token = secrets.token_urlsafe(16)
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            self._sessions[token] = (session, now)
+            self._tasks += len(session)
+            while len(self._sessions) > self.max_sessions or self._tasks > self.max_tasks:
+                _, (evicted, _) = self._sessions.popitem(last=False)
+                self._tasks -= len(evicted)
+        return token
+
+    def get(self, token):
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            entry = self._sessions.get(token)
+            if entry is None:
+                return None
+            self._sessions[token] = (entry[0], now)
+            self._sessions.move_to_end(token)
+            return entry[0]
+
+    def discard(self, token):
+        """returns: whether the session existed"""
+        with self._lock:
+            entry = self._sessions.pop(token, None)
+            if entry is not None:
+                self._tasks -= len(entry[0])
+            return entry is not None
+
+    def clear(self):
+        with self._lock:
+            self._sessions.clear()
+            self._tasks = 0
+
+    def sessions(self):
+        with self._lock:
+            return [session for session, _ in self._sessions.values()]
+
+    def stats(self):
+        with self._lock:
+            return {"sessions": len(self._sessions), "tasks": self._tasks}
+
+
+_registry = None
+
+
+def get_registry():
+    global _registry
+    if _registry is None:
+        config = {**DEFAULT_CONFIG, **getattr(settings, "TASK_WHATIF_SESSIONS", {})}
+        _registry = SessionRegistry(config["MAX_SESSIONS"], config["MAX_TASKS"], config["TIMEOUT"])
+    return _registry
+
+
+@receiver(setting_changed)
+def _reset_registry(setting, **kwargs):
+    global _registry
+    if setting == "TASK_WHATIF_SESSIONS":
+        _registry = None
@@ -5,6 +5,8 @@ const API_BASE = 'http://127.0.0.1:8000/api/tasks/';
 
 let tasks = [];
 let lastSuggestions = []; // ⬅️ NEW: store last suggestions for feedback
+let analyzedTasks = null;  // tasks from the last Analyze, re-ranked on strategy change
+let whatifSession = null;
 
 
 // UI HELPERS
@@ -80,14 +82,48 @@ async function analyzeTasks() {
         const res = await fetch(API_BASE + "analyze/", {
             method: "POST",
             headers: { "Content-Type": "application/json" },
-            body: JSON.stringify({ tasks: payloadTasks, strategy })
+            body: JSON.stringify({ tasks: payloadTasks, strategy, explain: true })
         });
 
         const data = await res.json();
         if (!res.ok) return setFeedback("Error: " + (data.detail || "unknown"), true);
 
         setFeedback(data.warning ? "Circular dependencies detected." : "Analysis complete.");
-        renderResults(data.result || data);
+        renderResults(data);
+        analyzedTasks = payloadTasks;
+        whatifSession = null;
+
+    } catch (e) {
+        setFeedback("Network error: " + e.message, true);
+    }
+}
+
+// RE-RANK ON STRATEGY CHANGE (what-if session: tasks are scored once, then only re-ranked)
+
+async function rerankTasks() {
+    if (!analyzedTasks) return;
+    const strategy = document.getElementById('strategy').value;
+
+    try {
+        let res = whatifSession && await fetch(API_BASE + "whatif/" + whatifSession + "/", {
+            method: "POST",
+            headers: { "Content-Type": "application/json" },
+            body: JSON.stringify({ strategy, explain: true })
+        });
+        if (!res || res.status === 404) {
+            res = await fetch(API_BASE + "whatif/", {
+                method: "POST",
+                headers: { "Content-Type": "application/json" },
+                body: JSON.stringify({ tasks: analyzedTasks, strategy, explain: true })
+            });
+        }
+
+        const data = await res.json();
+        if (!res.ok) return setFeedback("Error: " + (data.detail || "unknown"), true);
+
+        whatifSession = data.session;
+        setFeedback("Re-ranked for " + strategy + ".");
+        renderResults(data);
 
     } catch (e) {
         setFeedback("Network error: " + e.message, true);
@@ -177,13 +213,27 @@ async function suggestTop3() {
     const strategy = document.getElementById('strategy').value;
 
     try {
-        const url =
-            API_BASE + "suggest/?tasks=" +
-            encodeURIComponent(JSON.stringify(payloadTasks)) +
-            "&strategy=" + encodeURIComponent(strategy);
-
-        const res = await fetch(url);
-        const data = await res.json();
+        // Upload the backlog; suggest refers to it by handle instead of packing it into the URL.
+        // A handle can be unknown to the process answering suggest (several workers, or
+        // evicted), which answers 404: upload again and retry once.
+        let res, data;
+        for (let attempt = 0; attempt < 2; attempt++) {
+            const upload = await fetch(API_BASE + "backlogs/", {
+                method: "POST",
+                headers: { "Content-Type": "application/json" },
+                body: JSON.stringify({ tasks: payloadTasks })
+            });
+            const stored = await upload.json();
+            if (!upload.ok) return setFeedback("Error: " + (stored.detail || "unknown"), true);
+
+            const url =
+                API_BASE + "suggest/?backlog=" + stored.backlog +
+                "&strategy=" + encodeURIComponent(strategy);
+
+            res = await fetch(url);
+            data = await res.json();
+            if (res.status !== 404) break;
+        }
 
         if (!res.ok) return setFeedback("Error: " + (data.detail || "unknown"), true);
 
@@ -275,6 +325,7 @@ document.getElementById("task-form").addEventListener("submit", addTaskFromForm)
 document.getElementById("analyze-btn").addEventListener("click", analyzeTasks);
 document.getElementById("suggest-btn").addEventListener("click", suggestTop3);
 document.getElementById("graph-btn").addEventListener("click", showGraph);
+document.getElementById("strategy").addEventListener("change", rerankTasks);
 
 // NEW feedback buttons
 document.getElementById("feedback-yes-btn")?.addEventListener("click", () => sendFeedback(true));